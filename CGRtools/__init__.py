@@ -17,7 +17,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from importlib.util import find_spec
+from ._cache import cache_stats, collect_cache_stats
+from .algorithms.isomorphism import screen_stats, reset_screen_stats, rules_stats, reset_rules_stats
 from .containers import *
+from .containers.bonds import intern_bonds
 from .files import *
 from .preparer import *
 from .reactor import *
@@ -28,7 +32,12 @@ smiles = SMILESRead.create_parser(ignore=True)
 xyz = XYZRead.create_parser()
 
 
-__all__ = ['smiles', 'xyz']
+__all__ = ['smiles', 'xyz', 'cache_stats', 'collect_cache_stats', 'intern_bonds', 'screen_stats',
+           'reset_screen_stats', 'rules_stats', 'reset_rules_stats']
+
+if find_spec('numpy'):
+    from .search import *
+    __all__.append('SubstructureIndex')
 
 if 'INCHIRead' in locals():
     inchi = INCHIRead.create_parser()
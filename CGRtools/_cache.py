@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2020 Ramil Nugmanov <nougmanoff@protonmail.com>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from CachedMethods import cached_property
+from collections import defaultdict, namedtuple
+from functools import wraps
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+
+# state parts of containers. charges scope also covers radicals and implicit hydrogens.
+scopes = frozenset(('topology', 'charges', 'coordinates', 'stereo'))
+dependencies: Dict[str, FrozenSet[str]] = {}  # instance __dict__ key to scopes
+labels: Dict[str, str] = {}  # instance __dict__ key to Class.attribute name
+immediate: Set[str] = set()  # instance __dict__ keys not deferred by MoleculeContainer.batch_edit
+tracked: List[Tuple[type, str, object]] = []
+counters = defaultdict(lambda: [0, 0, 0])
+CacheStats = namedtuple('CacheStats', ('hits', 'misses', 'invalidations'))
+collect = False
+
+
+class depends_on:
+    """
+    Declare container state scopes used by cached attribute. Should be applied over CachedMethods decorators:
+
+        @depends_on('topology', 'charges')
+        @cached_property
+        def atoms_order(self): ...
+
+    `Graph.flush_cache(*scopes)` drops only cached values depending on given scopes.
+    Undeclared cached values dropped always.
+
+    Values marked as `immediate` dropped at once inside `MoleculeContainer.batch_edit` block.
+    Substructure matching inside block relies on them.
+    """
+    __slots__ = ('scopes', 'attr', 'immediate')
+
+    def __init__(self, *scope: str, immediate: bool = False):
+        if not scope or not scopes.issuperset(scope):
+            raise ValueError(f'scopes from {set(scopes)} expected')
+        self.scopes = frozenset(scope)
+        self.immediate = immediate
+
+    def __call__(self, attr):
+        self.attr = attr
+        return self
+
+    def __set_name__(self, owner, name):
+        attr = self.attr
+        setattr(owner, name, attr)  # replace itself by real attribute
+        label = f'{owner.__name__}.{name}'
+        for key in cache_keys(attr):
+            dependencies[key] = dependencies.get(key, frozenset()) | self.scopes
+            labels[key] = label
+            if self.immediate:
+                immediate.add(key)
+        tracked.append((owner, name, attr))
+        if collect:
+            setattr(owner, name, counted(attr))
+
+
+def cache_keys(attr) -> Tuple[str, ...]:
+    """
+    Names of instance __dict__ keys used by CachedMethods decorators.
+    """
+    if isinstance(attr, cached_property):
+        return attr.name,
+    return f'__cached_method_{attr.__name__}', f'__cached_args_method_{attr.__name__}'
+
+
+class CountedProperty:
+    """
+    Data descriptor wrapper of cached_property. Counts hits and misses.
+    """
+    __slots__ = ('property',)
+
+    def __init__(self, prop):
+        self.property = prop
+
+    def __get__(self, obj, cls):
+        prop = self.property
+        if obj is None:
+            return prop
+        try:
+            value = obj.__dict__[prop.name]
+        except KeyError:
+            counters[labels[prop.name]][1] += 1
+            return prop.__get__(obj, cls)
+        counters[labels[prop.name]][0] += 1
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.property.name] = value
+
+    def __delete__(self, obj):
+        del obj.__dict__[self.property.name]
+
+
+def counted(attr):
+    if isinstance(attr, cached_property):
+        return CountedProperty(attr)
+    method_key, args_key = cache_keys(attr)
+    label = labels[method_key]
+
+    @wraps(attr)
+    def wrapper(self, *args):
+        cache = self.__dict__
+        if method_key in cache or args_key in cache and args in cache[args_key]:
+            counters[label][0] += 1
+        else:
+            counters[label][1] += 1
+        return attr(self, *args)
+    return wrapper
+
+
+def collect_cache_stats(enable: bool = True):
+    """
+    Switch on or off collection of cached attributes usage statistics. Counters are reset.
+
+    Collection makes cached properties access slower. Use it for profiling only.
+    """
+    global collect
+    counters.clear()
+    if enable == collect:
+        return
+    collect = enable
+    for owner, name, attr in tracked:
+        setattr(owner, name, counted(attr) if enable else attr)
+
+
+def cache_stats() -> Dict[str, CacheStats]:
+    """
+    Hits, misses and invalidations counts of cached attributes collected after `collect_cache_stats` call.
+    """
+    return {k: CacheStats(*v) for k, v in counters.items()}
+
+
+__all__ = ['depends_on', 'collect_cache_stats', 'cache_stats']
@@ -19,6 +19,7 @@
 from collections import defaultdict, deque
 from typing import List, Optional, Tuple
 from .._functions import lazy_product
+from ..containers.bonds import Bond
 from ..exceptions import InvalidAromaticRing
 
 
@@ -73,9 +74,9 @@ class Aromatize:
         for ring in rings:
             seen.update(ring)
             n, *_, m = ring
-            bonds[n][m]._Bond__order = 4
+            bonds[n][m] = bonds[m][n] = Bond(4)  # bonds can be shared with copies. don't modify in place
             for n, m in zip(ring, ring[1:]):
-                bonds[n][m]._Bond__order = 4
+                bonds[n][m] = bonds[m][n] = Bond(4)
         for n in seen:
             sh[n] = 4
 
@@ -279,7 +280,7 @@ class Aromatize:
         bonds = self._bonds
         atoms = set()
         for n, m, b in patch:
-            bonds[n][m]._Bond__order = b
+            bonds[n][m] = bonds[m][n] = Bond(b)
             atoms.add(n)
             atoms.add(m)
         for n in atoms:
@@ -308,10 +309,23 @@ class Aromatize:
                                    for c in components)):
             yield [x for x in keks for x in x]
 
-    @staticmethod
-    def __kekule_component(rings, double_bonded, pyroles):
+    @classmethod
+    def __kekule_component(cls, rings, double_bonded, pyroles):
+        """
+        Kekule forms of aromatic component.
+
+        Forms searched by depth-first walk over ring paths. Every path branch is checked by witness matching:
+        branch is skipped if no matching with already chosen bonds covers all atoms except double bonded
+        and pyroles. Pyroles left uncovered by the walk keep implicit hydrogen.
+        """
         # (current atom, previous atom, bond between cp atoms, path deep for cutting [None if cut impossible])
         stack: List[List[Tuple[int, int, int, Optional[int]]]]
+        if double_bonded:
+            adjacency = {n: ms - double_bonded for n, ms in rings.items() if n not in double_bonded}
+        else:
+            adjacency = rings
+        required = adjacency.keys() - pyroles
+
         if double_bonded:  # start from double bonded if exists
             start = next(iter(double_bonded))
             stack = [[(next(iter(rings[start])), start, 1, 0)]]
@@ -329,6 +343,29 @@ class Aromatize:
                     stack = [[(next_atom, start, 1, 0)] for next_atom in rings[start]]
             else:
                 stack = [[(next_atom, start, 1, 0)] for next_atom in rings[start]]
+            required.add(start)  # walk always starts from covered atom
+
+        # witness matching of each branch: (matching, atoms of chosen double bonds, chosen single bonds)
+        matching = {}
+        for n, ms in adjacency.items():  # greedy initial matching
+            if n not in matching:
+                for m in ms:
+                    if m not in matching:
+                        matching[n] = m
+                        matching[m] = n
+                        break
+        released = adjacency.keys() - required
+        for n in required:
+            if n not in matching and not cls.__augment(adjacency, matching, n, released):
+                raise InvalidAromaticRing(f'kekule form not found for: {list(rings)}')
+        states = []
+        branches = []
+        for branch in stack:
+            state = (matching.copy(), set(), set())
+            if cls.__choose(adjacency, required, released, state, *branch[0][:3]):
+                states.append(state)
+                branches.append(branch)
+        stack = branches
 
         size = sum(len(x) for x in rings.values()) // 2
         path = []
@@ -344,11 +381,12 @@ class Aromatize:
                 yield path
                 if nether_yielded:
                     nether_yielded = False
-                del stack[-1]
+                del stack[-1], states[-1]
                 if stack:
                     path = path[:stack[-1][-1][-1]]
                     hashed_path = {x for x, *_ in path}
             elif atom != start:
+                state = states[-1]
                 for_stack = []
                 closures = []
                 loop = 0
@@ -364,25 +402,32 @@ class Aromatize:
 
                 if loop:  # we found starting point.
                     if bond == 2:  # finish should be single bonded
-                        if double_bonded:  # ok
-                            stack[-1].insert(0, (loop, atom, 1, None))
+                        if double_bonded and cls.__choose(adjacency, required, released, state, loop, atom, 1):
+                            stack[-1].insert(0, (loop, atom, 1, None))  # ok
                         else:
-                            del stack[-1]
+                            del stack[-1], states[-1]
                             if stack:
                                 path = path[:stack[-1][-1][-1]]
                                 hashed_path = {x for x, *_ in path}
                             continue
                     elif double_bonded:  # we in quinone ring. finish should be single bonded
                         # side-path for storing double bond or atom is quinone or pyrole
-                        if for_stack or atom in double_bonded or atom in pyroles:
+                        if (for_stack or atom in double_bonded or atom in pyroles) and \
+                                cls.__choose(adjacency, required, released, state, loop, atom, 1):
                             stack[-1].insert(0, (loop, atom, 1, None))
                         else:
-                            del stack[-1]
+                            del stack[-1], states[-1]
                             if stack:
                                 path = path[:stack[-1][-1][-1]]
                                 hashed_path = {x for x, *_ in path}
                             continue
                     else:  # finish should be double bonded
+                        if not cls.__choose(adjacency, required, released, state, loop, atom, 2):
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
+                            continue
                         stack[-1].insert(0, (loop, atom, 2, None))
                         bond = 2  # grow should be single bonded
 
@@ -392,51 +437,99 @@ class Aromatize:
                         stack[-1].remove((atom, next_atom, 1, None))  # remove fork from stack
                     for next_atom in for_stack:
                         stack[-1].append((next_atom, atom, 1, None))
+                        if not cls.__choose(adjacency, required, released, state, next_atom, atom, 1):
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
+                            break
                 elif len(for_stack) == 1:  # easy path grow. next bond double or include single for pyroles
                     next_atom = for_stack[0]
                     if next_atom in double_bonded:  # need double bond, but next atom quinone
                         if atom in pyroles:
                             stack[-1].append((next_atom, atom, 1, None))
                         else:
-                            del stack[-1]
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
+                    elif atom in pyroles:  # try pyrole and pyridine
+                        opposite = stack[-1].copy()
+                        opposite.append((next_atom, atom, 2, None))
+                        stack[-1].append((next_atom, atom, 1, len(path)))
+                        opposite_state = cls.__branch(state)
+                        if cls.__choose(adjacency, required, released, opposite_state, next_atom, atom, 2):
+                            if cls.__choose(adjacency, required, released, state, next_atom, atom, 1):
+                                stack.append(opposite)
+                                states.append(opposite_state)
+                            else:  # pyrole impossible
+                                stack[-1] = opposite
+                                states[-1] = opposite_state
+                        elif not cls.__choose(adjacency, required, released, state, next_atom, atom, 1):
+                            del stack[-1], states[-1]
                             if stack:
                                 path = path[:stack[-1][-1][-1]]
                                 hashed_path = {x for x, *_ in path}
                     else:
-                        if atom in pyroles:  # try pyrole and pyridine
-                            opposite = stack[-1].copy()
-                            opposite.append((next_atom, atom, 2, None))
-                            stack[-1].append((next_atom, atom, 1, len(path)))
-                            stack.append(opposite)
-                        else:
-                            stack[-1].append((next_atom, atom, 2, None))
+                        stack[-1].append((next_atom, atom, 2, None))
+                        if cls.__choose(adjacency, required, released, state, next_atom, atom, 2):
                             if closures:
                                 next_atom = closures[0]
                                 path.append((next_atom, atom, 1))  # closures always single-bonded
                                 stack[-1].remove((atom, next_atom, 1, None))  # remove fork from stack
+                        else:
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
                 elif for_stack:  # fork
                     next_atom1, next_atom2 = for_stack
                     if next_atom1 in double_bonded:  # quinone next from fork
                         if next_atom2 in double_bonded:  # bad path
-                            del stack[-1]
+                            del stack[-1], states[-1]
                             if stack:
                                 path = path[:stack[-1][-1][-1]]
                                 hashed_path = {x for x, *_ in path}
                         else:
                             stack[-1].append((next_atom1, atom, 1, None))
                             stack[-1].append((next_atom2, atom, 2, None))
+                            if not cls.__choose(adjacency, required, released, state, next_atom2, atom, 2):
+                                del stack[-1], states[-1]
+                                if stack:
+                                    path = path[:stack[-1][-1][-1]]
+                                    hashed_path = {x for x, *_ in path}
                     elif next_atom2 in double_bonded:  # quinone next from fork
                         stack[-1].append((next_atom2, atom, 1, None))
                         stack[-1].append((next_atom1, atom, 2, None))
+                        if not cls.__choose(adjacency, required, released, state, next_atom1, atom, 2):
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
                     else:  # new path
                         opposite = stack[-1].copy()
                         stack[-1].append((next_atom1, atom, 1, None))
                         stack[-1].append((next_atom2, atom, 2, len(path)))
                         opposite.append((next_atom2, atom, 1, None))
                         opposite.append((next_atom1, atom, 2, None))
-                        stack.append(opposite)
+                        opposite_state = cls.__branch(state)
+                        if cls.__choose(adjacency, required, released, opposite_state, next_atom2, atom, 1) and \
+                                cls.__choose(adjacency, required, released, opposite_state, next_atom1, atom, 2):
+                            if cls.__choose(adjacency, required, released, state, next_atom1, atom, 1) and \
+                                    cls.__choose(adjacency, required, released, state, next_atom2, atom, 2):
+                                stack.append(opposite)
+                                states.append(opposite_state)
+                            else:
+                                stack[-1] = opposite
+                                states[-1] = opposite_state
+                        elif not (cls.__choose(adjacency, required, released, state, next_atom1, atom, 1) and
+                                  cls.__choose(adjacency, required, released, state, next_atom2, atom, 2)):
+                            del stack[-1], states[-1]
+                            if stack:
+                                path = path[:stack[-1][-1][-1]]
+                                hashed_path = {x for x, *_ in path}
                 elif closures and atom not in pyroles:  # need double bond, but closure should be single bonded
-                    del stack[-1]
+                    del stack[-1], states[-1]
                     if stack:
                         path = path[:stack[-1][-1][-1]]
                         hashed_path = {x for x, *_ in path}
@@ -444,5 +537,118 @@ class Aromatize:
         if nether_yielded:
             raise InvalidAromaticRing(f'kekule form not found for: {list(rings)}')
 
+    @staticmethod
+    def __branch(state):
+        matching, fixed, forbidden = state
+        return matching.copy(), fixed.copy(), forbidden.copy()
+
+    @classmethod
+    def __choose(cls, adjacency, required, released, state, n, m, bond) -> bool:
+        """
+        Fix bond in branch witness matching. Return False if no matching with all fixed bonds covers required atoms.
+        """
+        matching, fixed, forbidden = state
+        if bond == 2:
+            if matching.get(n) == m:
+                fixed.add(n)
+                fixed.add(m)
+                return True
+            elif n in fixed or m in fixed or (n, m) in forbidden or n not in adjacency or m not in adjacency:
+                return False
+            exposed = [x for x in (matching.pop(n, None), matching.pop(m, None)) if x is not None]
+            for x in exposed:
+                del matching[x]
+            matching[n] = m
+            matching[m] = n
+            fixed.add(n)
+            fixed.add(m)
+        elif (n, m) in forbidden:
+            return True
+        else:
+            forbidden.add((n, m))
+            forbidden.add((m, n))
+            if matching.get(n) != m:
+                return True
+            elif n in fixed:
+                return False
+            del matching[n], matching[m]
+            exposed = (n, m)
+        for x in exposed:
+            if x in required and x not in matching and \
+                    not cls.__augment(adjacency, matching, x, released, fixed, forbidden):
+                return False
+        return True
+
+    @staticmethod
+    def __augment(adjacency, matching, root, released, fixed=(), forbidden=()) -> bool:
+        """
+        Edmonds blossom algorithm search of augmenting path from exposed root.
+        Path to matched released atom also used: released atom becomes exposed.
+        Fixed atoms and forbidden bonds ignored.
+        """
+        parent = {}
+        base = {}
+        used = {root}
+        queue = deque([root])
+        while queue:
+            n = queue.popleft()
+            if n != root and n in released:  # release atom. outer atoms always matched
+                m = matching.pop(n)
+                while m is not None:
+                    pm = parent[m]
+                    ppm = matching.get(pm)
+                    matching[m] = pm
+                    matching[pm] = m
+                    m = ppm
+                return True
+            for m in adjacency[n]:
+                if m in fixed or (n, m) in forbidden or base.get(n, n) == base.get(m, m) or matching.get(n) == m:
+                    continue
+                elif m == root or m in matching and matching[m] in parent:  # odd cycle. contract blossom
+                    # lowest common ancestor
+                    path = set()
+                    a = n
+                    while True:
+                        a = base.get(a, a)
+                        path.add(a)
+                        if a not in matching:
+                            break
+                        a = parent[matching[a]]
+                    b = m
+                    while True:
+                        b = base.get(b, b)
+                        if b in path:
+                            break
+                        b = parent[matching[b]]
+
+                    blossom = set()
+                    for a, child in ((n, m), (m, n)):
+                        while base.get(a, a) != b:
+                            blossom.add(base.get(a, a))
+                            blossom.add(base.get(matching[a], matching[a]))
+                            parent[a] = child
+                            child = matching[a]
+                            a = parent[child]
+                    for a in [*used, *parent]:
+                        if base.get(a, a) in blossom:
+                            base[a] = b
+                            if a not in used:
+                                used.add(a)
+                                queue.append(a)
+                elif m not in parent:
+                    parent[m] = n
+                    if m not in matching:  # augmenting path found
+                        while m is not None:
+                            pm = parent[m]
+                            ppm = matching.get(pm)
+                            matching[m] = pm
+                            matching[pm] = m
+                            m = ppm
+                        return True
+                    m = matching[m]
+                    used.add(m)
+                    queue.append(m)
+        return False
+
 
 __all__ = ['Aromatize']
@@ -476,7 +476,7 @@ class Calculate2D:
                 xy, shift_x = self.__finish_xyz(xyz, springs, atoms_count, bonds_count, shift_x)
                 for i, n in enumerate(component):
                     plane[n] = tuple(xy[i])
-        self.__dict__.pop('__cached_method__repr_svg_', None)
+        self.flush_cache('coordinates')
 
 
 class Calculate2DMolecule(Calculate2D):
@@ -21,6 +21,7 @@ from CachedMethods import cached_property, FrozenDict
 from collections import defaultdict, deque, ChainMap
 from itertools import chain, product
 from typing import List, Tuple, Dict, Set, Any, Union, TYPE_CHECKING, Iterator
+from .._cache import depends_on
 from ..containers import molecule  # cyclic imports resolve
 from ..exceptions import ValenceError
 
@@ -32,6 +33,7 @@ if TYPE_CHECKING:
 class GraphComponents:
     __slots__ = ()
 
+    @depends_on('topology')
     @cached_property
     def connected_components(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -66,6 +68,7 @@ class GraphComponents:
         """
         return len(self.connected_components)
 
+    @depends_on('topology')
     @cached_property
     def skin_atoms(self) -> Tuple[int, ...]:
         """
@@ -73,6 +76,7 @@ class GraphComponents:
         """
         return tuple(self._skin_graph(self._bonds))
 
+    @depends_on('topology')
     @cached_property
     def skin_graph(self):
         """
@@ -95,6 +99,7 @@ class GraphComponents:
                 bonds[m].discard(n)
         return bonds
 
+    @depends_on('topology')
     @cached_property
     def connected_rings(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -116,6 +121,7 @@ class GraphComponents:
                 out.append(tuple(r))
         return tuple(out)
 
+    @depends_on('topology')
     @cached_property
     def ring_atoms(self):
         """
@@ -123,6 +129,7 @@ class GraphComponents:
         """
         return tuple({x for x in self.sssr for x in x})
 
+    @depends_on('topology')
     @cached_property
     def rings_count(self):
         """
@@ -131,6 +138,7 @@ class GraphComponents:
         bonds = self._bonds
         return sum(len(x) for x in bonds.values()) // 2 - len(bonds) + self.connected_components_count
 
+    @depends_on('topology')
     @cached_property
     def atoms_rings(self) -> Dict[int, Tuple[Tuple[int, ...]]]:
         """
@@ -159,6 +167,7 @@ class GraphComponents:
 class StructureComponents:
     __slots__ = ()
 
+    @depends_on('topology')
     @cached_property
     def aromatic_rings(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -168,6 +177,7 @@ class StructureComponents:
         return tuple(ring for ring in self.sssr if bonds[ring[0]][ring[-1]].order == 4
                      and all(bonds[n][m].order == 4 for n, m in zip(ring, ring[1:])))
 
+    @depends_on('topology')
     @cached_property
     def cumulenes(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -175,6 +185,7 @@ class StructureComponents:
         """
         return self._cumulenes()
 
+    @depends_on('topology')
     @cached_property
     def connected_rings_cumulenes(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -198,6 +209,7 @@ class StructureComponents:
                 out.append(tuple(c))
         return tuple(out)
 
+    @depends_on('topology', 'charges')
     @cached_property
     def tetrahedrons(self) -> Tuple[int, ...]:
         """
@@ -266,6 +278,7 @@ class StructureComponents:
 class CGRComponents:
     __slots__ = ()
 
+    @depends_on('topology', 'charges')
     @cached_property
     def centers_list(self) -> Tuple[Tuple[int, ...], ...]:
         """ Get a list of lists of atoms of reaction centers
@@ -327,6 +340,7 @@ class CGRComponents:
                 out.append((n,))
         return tuple(out)
 
+    @depends_on('topology', 'charges')
     @cached_property
     def center_atoms(self) -> Tuple[int, ...]:
         """ Get list of atoms of reaction center (atoms with dynamic: bonds, charges, radicals).
@@ -346,12 +360,14 @@ class CGRComponents:
 
         return tuple(center)
 
+    @depends_on('topology', 'charges')
     @cached_property
     def center_bonds(self) -> Tuple[Tuple[int, int], ...]:
         """ Get list of bonds of reaction center (bonds with dynamic orders).
         """
         return tuple((n, m) for n, m, bond in self.bonds() if bond.order != bond.p_order)
 
+    @depends_on('topology')
     @cached_property
     def aromatic_rings(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -367,6 +383,7 @@ class CGRComponents:
 class ReactionComponents:
     __slots__ = ()
 
+    @depends_on('topology', 'charges')
     @cached_property
     def centers_list(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -394,6 +411,7 @@ class ReactionComponents:
                 centers_list.append(x)
         return tuple(tuple(x) for x in centers_list)
 
+    @depends_on('topology', 'charges')
     @cached_property
     def extended_centers_list(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -23,6 +23,7 @@ from functools import partial
 from math import atan2, sin, cos, hypot
 from uuid import uuid4
 from typing import Tuple
+from .._cache import depends_on
 
 
 cpk = tuple('''
@@ -237,6 +238,7 @@ class Depict:
         config['cgr_aromatic_space'] = cgr_aromatic_space
         config['symbols_font_style'] = symbols_font_style
 
+    @depends_on('topology', 'charges', 'coordinates', 'stereo')
     @cached_method
     def _repr_svg_(self):
         return self.depict()
@@ -540,6 +542,7 @@ class DepictReaction:
         """Settings for depict of chemical structures"""
         Depict.depict_settings(**kwargs)
 
+    @depends_on('topology', 'charges', 'coordinates', 'stereo')
     @cached_method
     def _repr_svg_(self):
         return self.depict()
@@ -18,6 +18,7 @@
 #
 from CachedMethods import cached_property
 from importlib.util import find_spec
+from .._cache import depends_on
 
 # atom, charge, radical, non sp3 : h, k, ne
 basis = {(5, 0, False, False): (-1., .75, 0),  # X3B
@@ -37,6 +38,7 @@ basis = {(5, 0, False, False): (-1., .75, 0),  # X3B
 class Huckel:
     __slots__ = ()
 
+    @depends_on('topology', 'charges')
     @cached_property
     def huckel_pi_electrons_energy(self) -> float:
         """
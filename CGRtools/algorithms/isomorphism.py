@@ -18,10 +18,13 @@
 #
 from abc import abstractmethod
 from CachedMethods import cached_property
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from itertools import permutations
-from typing import Dict, Iterator, Any
+from typing import Dict, Iterator, Any, List, Optional, Sequence, Tuple
+from .morgan import automorphism_generators
+from .._cache import depends_on
 from .._functions import lazy_product
+from ..periodictable import Element, QueryElement, AnyElement, ListElement, DynamicElement, DynamicQueryElement
 
 
 frequency = {1: 10,  # H
@@ -40,6 +43,194 @@ def atom_frequency(x):
     return frequency.get(x.atomic_number, 0)
 
 
+# integer codes of molecule atoms:
+# 16bit neighbors one-hot | 4bit hybridization one-hot | 1bit radical | 4bit charge | 9bit isotope | element one-hot
+code_neighbors = 0xffff
+code_hybridization = 0xf << 16
+code_radical = 1 << 20
+code_charge = 0xf << 21
+code_isotope = 0x1ff << 25
+code_element = -1 << 34  # any element
+
+
+def atom_code(atomic_number: int, isotope: Optional[int], charge: int, is_radical: bool, neighbors: int,
+              hybridization: int) -> int:
+    """
+    Integer code of molecule atom state used in substructure search.
+    """
+    return 1 << 33 + atomic_number | (isotope or 0) << 25 | charge + 4 << 21 | is_radical << 20 | \
+        1 << 15 + hybridization | 1 << min(neighbors, 15)
+
+
+def atom_predicate(atom) -> Optional[Tuple[int, int, int, int, int]]:
+    """
+    Compile query atom into (mask, value, neighbors, hybridization, elements) integers.
+    Molecule atom with code `c` is equal to query atom if
+    `c & mask == value and c & neighbors and c & hybridization and c & elements`.
+
+    None returned for atoms without code representation.
+    """
+    if isinstance(atom, Element):
+        return (code_isotope | code_charge | code_radical, (atom.isotope or 0) << 25 | atom.charge + 4 << 21 |
+                atom.is_radical << 20, code_neighbors, code_hybridization, 1 << 33 + atom.atomic_number)
+    elif isinstance(atom, (QueryElement, AnyElement)):
+        mask = code_charge | code_radical
+        value = atom.charge + 4 << 21 | atom.is_radical << 20
+        if isinstance(atom, QueryElement):
+            elements = 1 << 33 + atom.atomic_number
+            if atom.isotope:
+                mask |= code_isotope
+                value |= atom.isotope << 25
+        elif isinstance(atom, ListElement):
+            elements = 0
+            for n in atom._numbers:
+                elements |= 1 << 33 + n
+        else:
+            elements = code_element
+        neighbors = 0
+        for n in atom.neighbors:
+            neighbors |= 1 << n
+        hybridization = 0
+        for h in atom.hybridization:
+            hybridization |= 1 << 15 + h
+        return mask, value, neighbors or code_neighbors, hybridization or code_hybridization, elements
+
+
+# substructure screening fingerprint settings
+screen_size = 1024  # bits
+screen_length = 4  # max atoms count in linear paths
+screen_counts = 4  # max counted equal atoms or bonds
+screen_counters = [0, 0, 0]
+ScreenStats = namedtuple('ScreenStats', ('screened', 'rejected', 'matched'))
+
+
+def screen_fingerprint(features: Dict[int, Optional[int]], bonds: Dict[int, Dict[int, int]]) -> int:
+    """
+    Hashed substructure screening fingerprint.
+
+    Contains counts of atoms features and bonds orders and linear paths up to `screen_length` atoms.
+    Atoms with None feature are skipped. Fingerprint of substructure is subset of fingerprint of structure.
+
+    :param features: atoms features: atomic number, charge and radical state packed into int
+    :param bonds: bonds orders adjacency
+    """
+    counts = defaultdict(int)
+    for f in features.values():
+        if f is not None:
+            counts[(0, f)] += 1
+    for n, mb in bonds.items():
+        for m, b in mb.items():
+            if n < m:
+                counts[(1, b)] += 1
+
+    fingerprint = 0
+    for k, c in counts.items():
+        for x in range(1, min(c, screen_counts) + 1):
+            fingerprint |= 1 << hash((*k, x)) % screen_size
+
+    for n, f in features.items():
+        if f is None:
+            continue
+        stack = [(n, (n,), (f,))]
+        while stack:
+            n, path, labels = stack.pop()
+            for m, b in bonds[n].items():
+                f = features[m]
+                if f is None or m in path:
+                    continue
+                lm = (*labels, b, f)
+                rl = lm[::-1]
+                fingerprint |= 1 << hash(lm if lm < rl else rl) % screen_size
+                if len(path) + 1 < screen_length:
+                    stack.append((m, (*path, m), lm))
+    return fingerprint
+
+
+def screen_stats() -> ScreenStats:
+    """
+    Counts of substructure searches screened by fingerprints, rejected by fingerprints and matched.
+    Screened but not rejected and not matched searches are fingerprint false positives.
+    """
+    return ScreenStats(*screen_counters)
+
+
+def reset_screen_stats():
+    """
+    Reset substructure screening statistics.
+    """
+    screen_counters[:] = (0, 0, 0)
+
+
+# rules prefiltering by atoms composition
+rules_filters = {}  # named filters
+RuleStats = namedtuple('RuleStats', ('skipped', 'searched', 'matched'))
+
+
+def atoms_composition(structure) -> Optional[Dict[tuple, int]]:
+    """
+    Atoms composition of molecule or CGR: total atoms count, counts of atoms with equal element and charge and
+    counts of atoms with equal element, charge and hybridization (molecules) or product charge (CGRs).
+    Composition of rule is multiset of the same keys. Rule with composition not included in structure composition
+    can't be matched. Queries have no composition.
+
+    :return: key-count dict. Empty tuple key is total atoms count.
+    """
+    atoms = structure._atoms
+    if not atoms:
+        return None
+    atom = next(iter(atoms.values()))
+    if isinstance(atom, Element):
+        states = structure._hybridizations
+    elif isinstance(atom, DynamicElement):
+        states = structure._p_charges
+    else:
+        return None
+
+    charges = structure._charges
+    composition = defaultdict(int)
+    composition[()] = len(atoms)
+    for n, a in atoms.items():
+        key = (a.atomic_number, charges[n])
+        composition[key] += 1
+        composition[(*key, states[n])] += 1
+    return composition
+
+
+def rule_composition(query) -> Dict[tuple, int]:
+    """
+    Atoms composition required for query matching. Query elements with one allowed hybridization also counted by
+    hybridization. Elements lists and any elements counted only in total atoms count.
+    """
+    composition = defaultdict(int)
+    composition[()] = len(query)
+    for n, a in query._atoms.items():
+        if isinstance(a, (Element, QueryElement)):
+            key = (a.atomic_number, a.charge)
+            composition[key] += 1
+            if isinstance(a, QueryElement) and len(a.hybridization) == 1:
+                composition[(*key, a.hybridization[0])] += 1
+        elif isinstance(a, (DynamicElement, DynamicQueryElement)):
+            key = (a.atomic_number, a.charge)
+            composition[key] += 1
+            composition[(*key, a.p_charge)] += 1
+    return composition
+
+
+def rules_stats() -> Dict[str, List[RuleStats]]:
+    """
+    Statistics of named rules sets prefilters: counts of structures skipped, searched and matched by each rule.
+    """
+    return {name: f.stats for name, f in rules_filters.items()}
+
+
+def reset_rules_stats():
+    """
+    Reset rules prefilters statistics.
+    """
+    for f in rules_filters.values():
+        f.reset_stats()
+
+
 class Isomorphism:
     __slots__ = ()
 
@@ -83,34 +274,57 @@ class Isomorphism:
 
     @abstractmethod
     def get_mapping(self, other, *, automorphism_filter: bool = True,
-                    optimize: bool = True, fallback: bool = False) -> Iterator[Dict[int, int]]:
+                    optimize: bool = True, fallback: bool = False, pruning: bool = False) -> Iterator[Dict[int, int]]:
         """
         Get self to other substructure mapping generator.
 
         :param automorphism_filter: Skip matches to same atoms.
         :param optimize: Morgan weights based automorphism preventing.
         :param fallback: Try without optimization then nothing matched.
+        :param pruning: Use candidate domains pruning matcher. Faster for queries with many similar atoms
+            and big targets. Produces same mappings in same order.
         """
+        required = self._screen_required
+        if required:
+            fingerprint = other._screen_fingerprint
+            screened = fingerprint is not None
+            if screened:
+                screen_counters[0] += 1
+                if required & fingerprint != required:
+                    screen_counters[1] += 1
+                    return
+        else:
+            screened = False
+
         if optimize:
-            g = self.__components_mapping(other, other.atoms_order, automorphism_filter)
+            g = self.__components_mapping(other, other.atoms_order.copy(), automorphism_filter, pruning)
             m = next(g, None)
-            if m is not None:
-                yield m
-                yield from g
-                return
-            elif not fallback:
-                return
-        yield from self.__components_mapping(other, {n: i for i, n in enumerate(other)}, automorphism_filter)
-
-    def __components_mapping(self, other, o_order, automorphism_filter):
-        components, closures = self._compiled_query
-        o_atoms = other._atoms
-        o_bonds = other._bonds
+        if not optimize or m is None and fallback:
+            g = self.__components_mapping(other, {n: i for i, n in enumerate(other)}, automorphism_filter, pruning)
+            m = next(g, None)
+        if m is not None:
+            if screened:
+                screen_counters[2] += 1
+            yield m
+            yield from g
+
+    def __components_mapping(self, other, o_order, automorphism_filter, pruning):
+        compiled = not pruning and self._compiled_query_codes
+        codes = compiled and other._molecule_codes
+        if codes:  # molecule atoms codes and query predicates
+            components, closures = compiled
+            o_atoms, o_bonds = codes
+            get_mapping = self._get_mapping_codes
+        else:
+            components, closures = self._compiled_query
+            o_atoms = other._atoms
+            o_bonds = other._bonds
+            get_mapping = self._get_mapping_pruned if pruning else self._get_mapping
 
         seen = set()
         if len(components) == 1:
             for candidate in other.connected_components:
-                for mapping in self._get_mapping(components[0], closures, o_atoms, o_bonds, set(candidate), o_order):
+                for mapping in get_mapping(components[0], closures, o_atoms, o_bonds, set(candidate), o_order):
                     if automorphism_filter:
                         atoms = frozenset(mapping.values())
                         if atoms in seen:
@@ -119,10 +333,10 @@ class Isomorphism:
                     yield mapping
         else:
             for candidates in permutations((set(x) for x in other.connected_components), len(components)):
-                mappers = [self._get_mapping(order, closures, o_atoms, o_bonds, component, o_order)
+                mappers = [get_mapping(order, closures, o_atoms, o_bonds, component, o_order)
                            for order, component in zip(components, candidates)]
                 for match in lazy_product(*mappers):
-                    mapping = match[0]
+                    mapping = match[0].copy()
                     for m in match[1:]:
                         mapping.update(m)
                     if automorphism_filter:
@@ -189,10 +403,260 @@ class Isomorphism:
                         else:
                             eqs[o_n] = False
 
+    @staticmethod
+    def _get_mapping_codes(linear_query, query_closures, o_codes, o_bonds, scope, groups):
+        """
+        Same as `_get_mapping` for compiled query atoms predicates and bonds orders and molecule atoms codes.
+        """
+        size = len(linear_query) - 1
+        order_depth = {v[0]: k for k, v in enumerate(linear_query)}
+
+        stack = []
+        path = []
+        mapping = {}
+        reversed_mapping = {}
+
+        s_n, (mask, value, s_neighbors, s_hybridization, s_elements) = linear_query[0]
+        for n, c in o_codes.items():
+            if n in scope and c & mask == value and c & s_neighbors and c & s_hybridization and c & s_elements:
+                stack.append((n, 0))
+
+        while stack:
+            n, depth = stack.pop()
+            current = linear_query[depth][0]
+            if depth == size:
+                yield {current: n, **mapping}
+            else:
+                if len(path) != depth:
+                    for x in path[depth:]:
+                        del mapping[reversed_mapping.pop(x)]
+                    path = path[:depth]
+
+                path.append(n)
+                mapping[current] = n
+                reversed_mapping[n] = current
+
+                depth += 1
+                s_n, back, (mask, value, s_neighbors, s_hybridization, s_elements), s_bond = linear_query[depth]
+                if back != current:
+                    n = path[order_depth[back]]
+
+                closures = query_closures[s_n]
+                uniq = set()
+                for o_n, o_bond in o_bonds[n].items():
+                    if o_n in scope and o_n not in reversed_mapping and s_bond == o_bond and groups[o_n] not in uniq:
+                        uniq.add(groups[o_n])
+                        c = o_codes[o_n]
+                        if c & mask == value and c & s_neighbors and c & s_hybridization and c & s_elements:
+                            for m, bond in closures:
+                                if bond != o_bonds[mapping[m]].get(o_n):
+                                    break
+                            else:
+                                stack.append((o_n, depth))
+
+    @staticmethod
+    def _get_mapping_pruned(linear_query, query_closures, o_atoms, o_bonds, scope, groups):
+        """
+        Same as `_get_mapping` with candidate domains pruning.
+
+        Domain of each query atom is a bitset over target atoms of scope. Domains are filtered by atoms equality and
+        bonds count of each type, then neighborhood consistency is enforced: target atom stays in domain only if for
+        each query neighbor it has neighbor from domain of that query neighbor by equal bond. Search visits only
+        domain atoms adjacent to mapped atoms by all query bonds.
+        """
+        targets = [n for n in o_atoms if n in scope]
+        bit = {n: 1 << i for i, n in enumerate(targets)}
+
+        # target neighbors bitsets and counts by bond type. int of bond is unique code of bond type.
+        o_neighbors = {}
+        o_counts = {}
+        for n in targets:
+            o_neighbors[n] = nn = {}
+            o_counts[n] = nc = defaultdict(int)
+            for m, b in o_bonds[n].items():
+                if m in bit:
+                    b = int(b)
+                    nn[b] = nn.get(b, 0) | bit[m]
+                    nc[b] += 1
+
+        s_atoms = [linear_query[0], *((s_n, s_atom) for s_n, _, s_atom, _ in linear_query[1:])]
+        q_bonds = {s_n: {} for s_n, _ in s_atoms}
+        q_closures = {}
+        for s_n, back, _, s_bond in linear_query[1:]:
+            q_bonds[s_n][back] = q_bonds[back][s_n] = int(s_bond)
+            q_closures[s_n] = cs = []
+            for m, s_bond in query_closures[s_n]:  # closures of component
+                q_bonds[s_n][m] = q_bonds[m][s_n] = s_bond = int(s_bond)
+                cs.append((m, s_bond))
+
+        # molecule atoms equality to any query atom depends only on hash (element, isotope, charge, radical),
+        # neighbors and hybridization. check each group of equal atoms once.
+        o_groups = defaultdict(list)
+        for n in targets:
+            a = o_atoms[n]
+            if isinstance(a, Element):
+                o_groups[(hash(a), a.neighbors, a.hybridization)].append(n)
+            else:
+                o_groups[n].append(n)
+        o_groups = [(o_atoms[ns[0]], ns) for ns in o_groups.values()]
+
+        domains = {}
+        for s_n, s_atom in s_atoms:
+            required = defaultdict(int)
+            for s_bond in q_bonds[s_n].values():
+                required[s_bond] += 1
+            d = 0
+            for o_atom, ns in o_groups:
+                if s_atom == o_atom:
+                    for n in ns:
+                        nc = o_counts[n]
+                        if all(nc[s_bond] >= c for s_bond, c in required.items()):
+                            d |= bit[n]
+            if not d:
+                return
+            domains[s_n] = d
+
+        # neighborhood consistency
+        changed = True
+        while changed:
+            changed = False
+            for s_n, s_bonds in q_bonds.items():
+                d = old = domains[s_n]
+                for m, s_bond in s_bonds.items():
+                    dm = domains[m]
+                    x = d
+                    while x:
+                        b = x & -x
+                        x ^= b
+                        if not o_neighbors[targets[b.bit_length() - 1]].get(s_bond, 0) & dm:
+                            d ^= b
+                if d != old:
+                    if not d:
+                        return
+                    domains[s_n] = d
+                    changed = True
+
+        size = len(linear_query) - 1
+        stack = []
+        path = []
+        used = [0]
+        mapping = {}
+
+        s_n = linear_query[0][0]
+        d = domains[s_n]
+        for n in targets:
+            if d & bit[n]:
+                stack.append((n, 0))
+
+        while stack:
+            n, depth = stack.pop()
+            current = linear_query[depth][0]
+            if depth == size:
+                yield {current: n, **mapping}
+            else:
+                if len(path) != depth:
+                    for x in range(depth, len(path)):
+                        del mapping[linear_query[x][0]]
+                    del path[depth:]
+                    del used[depth + 1:]
+
+                path.append(n)
+                mapping[current] = n
+                used.append(used[-1] | bit[n])
+
+                depth += 1
+                s_n, back, *_ = linear_query[depth]
+                if back != current:
+                    n = mapping[back]
+
+                bonded = o_neighbors[n].get(q_bonds[s_n][back], 0) & ~used[-1]
+                candidates = domains[s_n] & bonded
+                for m, bond in q_closures[s_n]:
+                    candidates &= o_neighbors[mapping[m]].get(bond, 0)
+                if not candidates:
+                    continue
+
+                uniq = set()
+                for o_n in o_bonds[n]:
+                    if o_n in bit:
+                        b = bit[o_n]
+                        # same as in `_get_mapping` only first bonded atom of each group checked
+                        if bonded & b and groups[o_n] not in uniq:
+                            uniq.add(groups[o_n])
+                            if candidates & b:
+                                stack.append((o_n, depth))
+
+    @depends_on('topology')
     @cached_property
     def _compiled_query(self):
         return self.__compile_query(self._atoms, self._bonds, {n: atom_frequency(a) for n, a in self._atoms.items()})
 
+    @depends_on('topology', 'charges')
+    @cached_property
+    def _compiled_query_codes(self):
+        """
+        Same as `_compiled_query` with atoms predicates and bonds orders.
+        None if query contains atoms without predicates.
+        """
+        predicates = {}
+        for n, a in self._atoms.items():
+            p = atom_predicate(a)
+            if p is None:
+                return
+            predicates[n] = p
+        components, closures = self._compiled_query
+        components = [[(order[0][0], predicates[order[0][0]]),
+                       *((n, m, predicates[n], int(b)) for n, m, _, b in order[1:])] for order in components]
+        closures = defaultdict(list, {n: [(m, int(b)) for m, b in c] for n, c in closures.items()})
+        return components, closures
+
+    @depends_on('topology', 'charges', immediate=True)
+    @cached_property
+    def _molecule_codes(self) -> Optional[Tuple[Dict[int, int], Dict[int, Dict[int, int]]]]:
+        """
+        Molecule atoms integer codes and bonds orders adjacency. None for not molecule containers.
+        """
+        atoms = self._atoms
+        if not all(isinstance(a, Element) for a in atoms.values()):
+            return
+        charges = self._charges
+        radicals = self._radicals
+        hybridizations = self._hybridizations
+        neighbors = self.neighbors
+        return ({n: atom_code(a.atomic_number, a.isotope, charges[n], radicals[n], neighbors(n), hybridizations[n])
+                 for n, a in atoms.items()},
+                {n: {m: int(b) for m, b in mb.items()} for n, mb in self._bonds.items()})
+
+    @depends_on('topology', 'charges', immediate=True)
+    @cached_property
+    def _screen_fingerprint(self) -> Optional[int]:
+        """
+        Substructure screening fingerprint of molecule. None for not molecule containers.
+        """
+        codes = self._molecule_codes
+        if codes is None:
+            return
+        charges = self._charges
+        radicals = self._radicals
+        return screen_fingerprint({n: a.atomic_number << 5 | charges[n] + 4 << 1 | radicals[n]
+                                   for n, a in self._atoms.items()}, codes[1])
+
+    @depends_on('topology', 'charges')
+    @cached_property
+    def _screen_required(self) -> int:
+        """
+        Screening fingerprint bits required in molecules containing this structure. Any and list atoms skipped.
+        """
+        features = {}
+        for n, a in self._atoms.items():
+            if isinstance(a, (Element, QueryElement)):
+                features[n] = a.atomic_number << 5 | a.charge + 4 << 1 | a.is_radical
+            elif isinstance(a, AnyElement):
+                features[n] = None
+            else:  # dynamic atoms can't be matched to molecules
+                return 0
+        return screen_fingerprint(features, {n: {m: int(b) for m, b in mb.items()} for n, mb in self._bonds.items()})
+
     @staticmethod
     def __compile_query(atoms, bonds, atoms_frequencies):
         closures = defaultdict(list)
@@ -229,6 +693,39 @@ class Isomorphism:
             return False
         return True
 
+    def get_automorphism_generators(self) -> List[Dict[int, int]]:
+        """
+        Generating set of automorphism group: each automorphism is product of generators.
+        Size of set is less than atoms count, whereas number of all automorphisms can grow exponentially.
+        Unlike `get_automorphism_mapping` group includes permutations of equal connected components.
+        """
+        return [x.copy() for x in self._automorphism_generators]
+
+    @depends_on('topology', 'charges')
+    @cached_property
+    def automorphism_orbits(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Orbits of atoms in automorphism group. Atoms of one orbit are symmetrically equivalent.
+        """
+        orbits = {n: {n} for n in self._atoms}
+        for mapping in self._automorphism_generators:
+            for n, m in mapping.items():
+                o, p = orbits[n], orbits[m]
+                if o is not p:
+                    o.update(p)
+                    for x in p:
+                        orbits[x] = o
+        return tuple(sorted({id(x): tuple(sorted(x)) for x in orbits.values()}.values()))
+
+    @depends_on('topology', 'charges')
+    @cached_property
+    def _automorphism_generators(self) -> Tuple[Dict[int, int], ...]:
+        atoms = self._atoms
+        if len(atoms) < 2:
+            return ()
+        return automorphism_generators({n: hash(a) for n, a in atoms.items()},
+                                       {n: [(m, int(b)) for m, b in ms.items()] for n, ms in self._bonds.items()})
+
     def get_automorphism_mapping(self) -> Iterator[Dict[int, int]]:
         """
         Iterator of all possible automorphism mappings.
@@ -251,11 +748,234 @@ class Isomorphism:
                 if any(k != v for k, v in mapping.items()):
                     yield mapping
         for match in lazy_product(*mappers):
-            mapping = match[0]
+            mapping = match[0].copy()
             for m in match[1:]:
                 mapping.update(m)
             if any(k != v for k, v in mapping.items()):
                 yield mapping
 
 
-__all__ = ['Isomorphism']
+class CompositionFilter:
+    """
+    Prefilter of rules set by atoms composition. Rules with equal compositions grouped and tested at once.
+    Skipped, searched and matched structures counted for each rule.
+    """
+    __slots__ = ('_groups', '_skipped', '_searched', '_matched')
+
+    def __init__(self, queries: Sequence[Isomorphism], name: Optional[str] = None):
+        """
+        :param queries: rules queries. Changes of queries after compilation are ignored.
+        :param name: name of filter in `rules_stats`.
+        """
+        groups = defaultdict(list)
+        for i, q in enumerate(queries):
+            groups[tuple(sorted(rule_composition(q).items()))].append(i)
+        self._groups = [(composition, sum(1 << i for i in rules), rules) for composition, rules in groups.items()]
+        self._skipped = [0] * len(queries)
+        self._searched = [0] * len(queries)
+        self._matched = [0] * len(queries)
+        if name is not None:
+            rules_filters[name] = self
+
+    def __len__(self):
+        return len(self._skipped)
+
+    def __call__(self, structure, start: int = 0, stop: Optional[int] = None) -> int:
+        """
+        Bits of rules possibly matched in structure. Rules out of start:stop range not tested and not counted.
+        All rules are possible for queries.
+        """
+        if stop is None:
+            stop = len(self._skipped)
+        composition = atoms_composition(structure)
+        if composition is None:
+            searched = self._searched
+            for i in range(start, stop):
+                searched[i] += 1
+            return (1 << stop) - (1 << start)
+
+        possible = 0
+        for required, bits, rules in self._groups:
+            for key, count in required:
+                if composition.get(key, 0) < count:
+                    counter = self._skipped
+                    break
+            else:
+                counter = self._searched
+                possible |= bits
+            for i in rules:
+                if start <= i < stop:
+                    counter[i] += 1
+        return possible & (1 << stop) - (1 << start)
+
+    def match(self, rule: int):
+        """
+        Count rule matched in structure.
+        """
+        self._matched[rule] += 1
+
+    @property
+    def stats(self) -> List[RuleStats]:
+        """
+        Counts of structures skipped, searched and matched by each rule.
+        Searched but not matched structures are prefilter false positives.
+        """
+        return [RuleStats(*x) for x in zip(self._skipped, self._searched, self._matched)]
+
+    def reset_stats(self):
+        """
+        Reset rules statistics.
+        """
+        for counter in (self._skipped, self._searched, self._matched):
+            counter[:] = [0] * len(counter)
+
+
+class MultiQuery:
+    """
+    Set of queries compiled into prefix trie of linearized queries indexed by root atom predicate.
+    Finds mappings of all queries in one traversal of molecule. Queries with equal beginnings share search work.
+
+    Queries with stereo marks or disconnected and queries without atoms predicates matched by own `get_mapping`.
+    Queries impossible by atoms composition skipped.
+    """
+    __slots__ = ('_queries', '_root', '_required', '_fallback', '_filter')
+
+    def __init__(self, queries: Sequence[Isomorphism], name: Optional[str] = None):
+        """
+        :param queries: molecules or queries. Changes of queries after compilation are ignored.
+        :param name: name of queries composition filter in `rules_stats`.
+        """
+        self._queries = queries = tuple(queries)
+        self._filter = CompositionFilter(queries, name)
+        # trie node: {(back atom depth, bond): {(atom predicate, closures): node}}, [(query index, atoms)], queries bits
+        self._root = root = {}
+        self._required = required = []
+        self._fallback = fallback = set()
+        for i, q in enumerate(queries):
+            required.append(q._screen_required)
+            compiled = q._compiled_query_codes
+            if compiled is None or len(compiled[0]) != 1 or q._atoms_stereo or q._allenes_stereo or \
+                    q._cis_trans_stereo:
+                fallback.add(i)
+                continue
+            (order,), closures = compiled
+            depth = {x[0]: k for k, x in enumerate(order)}
+            bit = 1 << i
+            node = root.get(order[0][1])
+            if node is None:
+                node = root[order[0][1]] = [{}, [], 0]
+            node[2] |= bit
+            for n, back, predicate, bond in order[1:]:
+                group = node[0].setdefault((depth[back], bond), {})
+                key = (predicate, tuple((depth[m], b) for m, b in closures[n]))
+                node = group.get(key)
+                if node is None:
+                    node = group[key] = [{}, [], 0]
+                node[2] |= bit
+            node[1].append((i, tuple(x[0] for x in order)))
+
+    def __len__(self):
+        return len(self._queries)
+
+    def get_mapping(self, other, *, start: int = 0, automorphism_filter: bool = True,
+                    optimize: bool = True) -> Iterator[Tuple[int, Dict[int, int]]]:
+        """
+        Get queries to other substructure mappings. Mappings of all queries found on first iteration.
+
+        :param start: skip queries with lower index.
+        :param automorphism_filter: Skip matches to same atoms.
+        :param optimize: Morgan weights based automorphism preventing.
+        :return: query index and mapping pairs ordered by queries. Mappings of each query are same as returned by
+            query `get_mapping`.
+        """
+        queries = self._queries
+        fallback = self._fallback
+        possible = self._filter(other, start)
+        codes = other._molecule_codes
+        if codes is None:  # not molecule
+            fallback = range(len(queries))
+            active = 0
+        else:
+            fingerprint = other._screen_fingerprint
+            active = 0
+            for i in range(start, len(queries)):
+                if i not in fallback and possible >> i & 1:
+                    r = self._required[i]
+                    if r & fingerprint == r:
+                        active |= 1 << i
+
+        found = defaultdict(list)
+        if active:
+            o_codes, o_bonds = codes
+            groups = other.atoms_order.copy() if optimize else {n: i for i, n in enumerate(other)}
+
+            def dfs(node, path, used):
+                for i, atoms in node[1]:
+                    if active >> i & 1:
+                        mapping = {atoms[-1]: path[-1]}
+                        mapping.update(zip(atoms, path[:-1]))
+                        found[i].append(mapping)
+                for (back, bond), children in node[0].items():
+                    n = path[back]
+                    uniq = set()
+                    candidates = []
+                    for o_n, o_bond in o_bonds[n].items():
+                        if o_n in scope and o_n not in used and bond == o_bond and groups[o_n] not in uniq:
+                            uniq.add(groups[o_n])
+                            candidates.append(o_n)
+                    if not candidates:
+                        continue
+                    for ((mask, value, s_neighbors, s_hybridization, s_elements), closures), child in children.items():
+                        if not child[2] & active:
+                            continue
+                        for o_n in reversed(candidates):  # same order as in stack based search
+                            c = o_codes[o_n]
+                            if c & mask == value and c & s_neighbors and c & s_hybridization and c & s_elements:
+                                for d, b in closures:
+                                    if b != o_bonds[path[d]].get(o_n):
+                                        break
+                                else:
+                                    path.append(o_n)
+                                    used.add(o_n)
+                                    dfs(child, path, used)
+                                    path.pop()
+                                    used.discard(o_n)
+
+            for component in other.connected_components:
+                scope = set(component)
+                for (mask, value, s_neighbors, s_hybridization, s_elements), node in self._root.items():
+                    if not node[2] & active:
+                        continue
+                    candidates = [n for n, c in o_codes.items() if n in scope and c & mask == value and
+                                  c & s_neighbors and c & s_hybridization and c & s_elements]
+                    for n in reversed(candidates):
+                        dfs(node, [n], {n})
+
+        for i in range(start, len(queries)):
+            if not possible >> i & 1:
+                continue
+            elif i in fallback:
+                mappings = queries[i].get_mapping(other, automorphism_filter=automorphism_filter, optimize=optimize)
+            elif active >> i & 1:
+                mappings = found[i]
+                if automorphism_filter:
+                    seen = set()
+                    unique = []
+                    for mapping in mappings:
+                        atoms = frozenset(mapping.values())
+                        if atoms not in seen:
+                            seen.add(atoms)
+                            unique.append(mapping)
+                    mappings = unique
+            else:
+                continue
+            matched = False
+            for mapping in mappings:
+                if not matched:
+                    matched = True
+                    self._filter.match(i)
+                yield i, mapping
+
+
+__all__ = ['Isomorphism', 'MultiQuery', 'CompositionFilter', 'screen_stats', 'reset_screen_stats', 'rules_stats',
+           'reset_rules_stats']
@@ -17,52 +17,282 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from CachedMethods import cached_property
-from collections import Counter
-from itertools import groupby
-from logging import warning
-from operator import itemgetter
-from sys import version_info
-from typing import Dict
-
-
-if version_info[1] >= 8:
-    tuple_hash = hash
-else:
-    def tuple_hash(v):
-        """
-        Python 3.8 hash for tuples implemented on python.
-        Working only for nonnested tuples.
-        """
-        acc = 0x27D4EB2F165667C5
-        for el in v:
-            lane = hash(el)
-            if lane == -1:
-                return -1
-            elif lane < 0:
-                lane += 0x10000000000000000  # to unsigned
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from .._cache import depends_on
+
+
+def initial_partition(weights: Dict[int, int]) -> Tuple[Dict[int, int], int]:
+    """
+    Atoms colors equal to ranks of weights.
+
+    :return: atom-color dict and next free color
+    """
+    ranks = {w: i for i, w in enumerate(sorted(set(weights.values())))}
+    return {n: ranks[w] for n, w in weights.items()}, len(ranks)
+
+
+def refine(colors: Dict[int, int], free: int, adjacency: Dict[int, List[Tuple[int, int]]]) -> int:
+    """
+    Partition refinement of colored graph up to equitable partition. Each round splits cells by sorted neighbors
+    colors and bonds. The biggest subcell keeps color of cell, other subcells get new colors in signatures order.
+    Only cells with neighbors of recolored atoms are refined. Final colors are canonical.
+
+    :param colors: atom-color dict. Updated inplace.
+    :param free: next free color.
+    :param adjacency: atom neighbors and bonds labels.
+    :return: next free color
+    """
+    cells = defaultdict(set)
+    for n, c in colors.items():
+        cells[c].add(n)
+    cells = {c: x for c, x in cells.items() if len(x) > 1}
+    return _refine(colors, cells, free, adjacency, cells)
+
 
-            acc += lane * 0xC2B2AE3D27D4EB4F
-            acc %= 0x10000000000000000
-            acc = (acc << 31) % 0x10000000000000000 | (acc >> 33)
-            acc *= 0x9E3779B185EBCA87
+def _refine(colors, cells, free, adjacency, touched, shared=False):
+    """
+    Refinement of partition with non-singleton cells and touched by recoloring cells atoms.
+    Cells of shared partition copied before changes.
+    """
+    while touched:
+        update = {}
+        for c in sorted(touched):
+            cell = cells[c]
+            affected = touched[c]
+            groups = defaultdict(list)
+            for n in affected:
+                groups[tuple(sorted((colors[m], b) for m, b in adjacency[n]))].append(n)
+            sizes = {s: len(x) for s, x in groups.items()}
+            unaffected = len(cell) - len(affected)
+            if unaffected:  # atoms without recolored neighbors have equal signatures
+                r = next(n for n in cell if n not in affected)
+                rest = tuple(sorted((colors[m], b) for m, b in adjacency[r]))
+                sizes[rest] = sizes.get(rest, 0) + unaffected
+            if len(sizes) == 1:
+                continue
 
-        acc += len(v) ^ 2870177450013471926  # 0xC2B2AE3D27D4EB4F ^ 3527539
-        acc %= 0x10000000000000000
+            if shared:
+                cell = cells[c] = cell.copy()
+            signatures = sorted(sizes)
+            keep = max(signatures, key=sizes.get)
+            for s in signatures:
+                if s == keep:
+                    continue
+                group = groups[s]
+                if unaffected and s == rest:
+                    group = group + [n for n in cell if n not in affected]
+                cell.difference_update(group)
+                if len(group) > 1:
+                    cells[free] = set(group)
+                for n in group:
+                    update[n] = free
+                free += 1
+            if len(cell) == 1:
+                del cells[c]
 
-        if acc == 0xFFFFFFFFFFFFFFFF:
-            return 1546275796
-        elif acc > 0x7FFFFFFFFFFFFFFF:  # (1 << 63) - 1 = largest positive number
-            return acc - 0x10000000000000000
-        return acc
+        colors.update(update)
+        touched = defaultdict(set)
+        for n in update:
+            for m, _ in adjacency[n]:
+                c = colors[m]
+                if c in cells:
+                    touched[c].add(m)
+    return free
+
+
+def individualize(colors: Dict[int, int], cells: Dict[int, Set[int]], free: int, atom: int,
+                  adjacency: Dict[int, List[Tuple[int, int]]]) -> Tuple[Dict[int, int], Dict[int, Set[int]], int]:
+    """
+    Refined partition with atom moved to own cell. Given partition not changed.
+
+    :param colors: atom-color dict of equitable partition.
+    :param cells: non-singleton cells of partition.
+    :return: colors, non-singleton cells and next free color of new partition
+    """
+    colors = colors.copy()
+    cells = cells.copy()
+    c = colors[atom]
+    cell = cells[c] - {atom}
+    if len(cell) > 1:
+        cells[c] = cell
+    else:
+        del cells[c]
+    colors[atom] = free
+
+    touched = defaultdict(set)
+    for m, _ in adjacency[atom]:
+        c = colors[m]
+        if c in cells:
+            touched[c].add(m)
+    free = _refine(colors, cells, free + 1, adjacency, touched, True)
+    return colors, cells, free
+
+
+def split(colors: Dict[int, int], cells: Dict[int, Set[int]], free: int, keys: Dict[int, bool],
+          adjacency: Dict[int, List[Tuple[int, int]]]) -> Tuple[Dict[int, int], Dict[int, Set[int]], int]:
+    """
+    Refined partition with cells split by atoms keys. Atoms without key go first, keyed atoms follow in keys order.
+    First subcell keeps color of cell. Given partition not changed.
+
+    :param colors: atom-color dict of equitable partition.
+    :param cells: non-singleton cells of partition.
+    :param keys: atom-key dict.
+    :return: colors, non-singleton cells and next free color of new partition
+    """
+    colors = colors.copy()
+    cells = cells.copy()
+    update = {}
+    for c in sorted({colors[n] for n in keys}):
+        if c not in cells:
+            continue
+        groups = defaultdict(list)
+        for n in cells[c]:
+            groups[(n in keys, keys.get(n))].append(n)
+        if len(groups) == 1:
+            continue
+        first, *signatures = sorted(groups)
+        cell = groups[first]
+        if len(cell) > 1:
+            cells[c] = set(cell)
+        else:
+            del cells[c]
+        for s in signatures:
+            group = groups[s]
+            if len(group) > 1:
+                cells[free] = set(group)
+            for n in group:
+                update[n] = free
+            free += 1
+
+    colors.update(update)
+    touched = defaultdict(set)
+    for n in update:
+        for m, _ in adjacency[n]:
+            c = colors[m]
+            if c in cells:
+                touched[c].add(m)
+    free = _refine(colors, cells, free, adjacency, touched, True)
+    return colors, cells, free
+
+
+def automorphism_generators(weights: Dict[int, int], adjacency: Dict[int, List[Tuple[int, int]]],
+                            refinement: Optional[Callable[[Dict[int, int], Dict[int, Set[int]], int],
+                                                          Tuple[Dict[int, int], Dict[int, Set[int]], int, Any]]] = None,
+                            check: Optional[Callable[[Dict[int, int]], bool]] = None,
+                            limit: Optional[int] = None) -> List[Dict[int, int]]:
+    """
+    Generating set of graph automorphism group found by individualization-refinement search.
+
+    First path of search tree individualizes atoms of smallest non-singleton cells up to discrete partition.
+    Then on each level from the deepest for each atom of target cell not in orbit of first path atom
+    automorphism mapping first path atom to it searched. Found automorphisms fix atoms individualized on upper
+    levels. Thus together they are strong generating set of group.
+
+    :param weights: atoms labels.
+    :param adjacency: atom neighbors and bonds labels.
+    :param refinement: additional refinement of equitable partitions. Returns new partition and its invariant.
+        Should not depend on atoms numbering. Branches with invariants different from first path pruned.
+    :param check: additional test of found automorphisms.
+    :param limit: maximal number of individualizations. On exceeding found automorphisms returned.
+        They generate subgroup of automorphism group.
+    :return: automorphisms except identity
+    """
+    colors, free = initial_partition(weights)
+    cells = defaultdict(set)
+    for n, c in colors.items():
+        cells[c].add(n)
+    cells = {c: x for c, x in cells.items() if len(x) > 1}
+    free = _refine(colors, cells, free, adjacency, cells)
+    bonds = {n: dict(ms) for n, ms in adjacency.items()}
+    expanded = 0
+
+    def expand(colors, cells, free, atom):
+        nonlocal expanded
+        expanded += 1
+        colors, cells, free = individualize(colors, cells, free, atom, adjacency)
+        if refinement is None:
+            return colors, cells, free, None
+        return refinement(colors, cells, free)
+
+    if refinement is None:
+        invariant = None
+    else:
+        colors, cells, free, invariant = refinement(colors, cells, free)
+    path = []  # colors, non-singleton cells, next free color, invariant, individualized atom
+    while cells:
+        atom = min(min(cells.values(), key=lambda x: (len(x), colors[next(iter(x))])))
+        path.append((colors, cells, free, invariant, atom))
+        colors, cells, free, invariant = expand(colors, cells, free, atom)
+    path.append((colors, cells, free, invariant, None))
+
+    def search(colors, cells, free, invariant, depth):
+        ref_colors, ref_cells, ref_free, ref_invariant, atom = path[depth]
+        # colors of equitable partitions are range(free)
+        if free != ref_free or invariant != ref_invariant or cells.keys() != ref_cells.keys() or \
+                any(len(x) != len(ref_cells[c]) for c, x in cells.items()):
+            return
+        if all(x is ref_cells[c] or x == ref_cells[c] for c, x in cells.items()):
+            # atoms of equal cells mapped to itself
+            singletons = {c: n for n, c in ref_colors.items() if c not in cells}
+            mapping = {singletons[c]: n for n, c in colors.items() if c in singletons}
+            mapping.update((n, n) for x in cells.values() for n in x)
+            if is_automorphism(mapping, bonds) and (check is None or check(mapping)):
+                return mapping
+        if atom is None:  # leaf
+            return
+        for n in sorted(cells[ref_colors[atom]]):
+            if limit is not None and expanded >= limit:
+                return
+            mapping = search(*expand(colors, cells, free, n), depth + 1)
+            if mapping is not None:
+                return mapping
+
+    orbits = {n: n for n in weights}  # union-find of atoms orbits
+
+    def find(n):
+        while orbits[n] != n:
+            orbits[n] = n = orbits[orbits[n]]
+        return n
+
+    generators = []
+    for depth in range(len(path) - 2, -1, -1):
+        colors, cells, free, _, atom = path[depth]
+        for n in sorted(cells[colors[atom]]):
+            if find(n) == find(atom):
+                continue
+            elif limit is not None and expanded >= limit:
+                return generators
+            mapping = search(*expand(colors, cells, free, n), depth + 1)
+            if mapping is not None:
+                generators.append(mapping)
+                for k, v in mapping.items():
+                    k, v = find(k), find(v)
+                    if k != v:
+                        orbits[max(k, v)] = min(k, v)
+    return generators
+
+
+def is_automorphism(mapping: Dict[int, int], bonds: Dict[int, Dict[int, int]]) -> bool:
+    """
+    Test mapping of atoms preserves bonds.
+    """
+    for n, ms in bonds.items():
+        mn = bonds[mapping[n]]
+        for m, b in ms.items():
+            if mn.get(mapping[m]) != b:
+                return False
+    return True
 
 
 class Morgan:
     __slots__ = ()
 
+    @depends_on('topology', 'charges')
     @cached_property
     def atoms_order(self) -> Dict[int, int]:
         """
-        Morgan like algorithm for graph nodes ordering
+        Canonical atoms ranks by partition refinement. Equal ranks have atoms indistinguishable by refinement.
 
         :return: dict of atom-order pairs
         """
@@ -74,35 +304,11 @@ class Morgan:
         return self._morgan({n: hash(a) for n, a in atoms.items()})
 
     def _morgan(self, weights: Dict[int, int]) -> Dict[int, int]:
-        atoms = self._atoms
-        bonds = self._bonds
-
-        tries = len(atoms) - 1
-        numb = len(set(weights.values()))
-        stab = old_numb = 0
-
-        for _ in range(tries):
-            weights = {n: tuple_hash((weights[n],
-                                      *(x for x in sorted((weights[m], int(b)) for m, b in ms.items()) for x in x)))
-                       for n, ms in bonds.items()}
-            old_numb, numb = numb, len(set(weights.values()))
-            if numb == len(atoms):  # each atom now unique
-                break
-            elif numb == old_numb:  # not changed. molecules like benzene
-                if min(Counter(weights.values()).items(), key=itemgetter(1))[1] > 1:
-                    if stab == 3:
-                        break
-                elif stab >= 2:
-                    break
-                stab += 1
-            elif stab:  # changed unique atoms number. reset stability check.
-                stab = 0
-        else:
-            if numb < old_numb:
-                warning('morgan. number of attempts exceeded. uniqueness has decreased.')
-
-        return {n: i for i, (_, g) in enumerate(groupby(sorted(weights.items(), key=itemgetter(1)), key=itemgetter(1)),
-                                                start=1) for n, _ in g}
+        colors, free = initial_partition(weights)
+        adjacency = {n: [(m, int(b)) for m, b in ms.items()] for n, ms in self._bonds.items()}
+        refine(colors, free, adjacency)
+        ranks = {c: i for i, c in enumerate(sorted(set(colors.values())), start=1)}
+        return {n: ranks[c] for n, c in colors.items()}
 
 
 __all__ = ['Morgan']
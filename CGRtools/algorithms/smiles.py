@@ -22,6 +22,8 @@ from collections import defaultdict
 from hashlib import sha512
 from itertools import count, product
 from random import random
+from typing import Dict
+from .._cache import depends_on
 
 
 charge_str = {-4: '-4', -3: '-3', -2: '-2', -1: '-', 0: '0', 1: '+', 2: '+2', 3: '+3', 4: '+4'}
@@ -45,9 +47,10 @@ dyn_radical_str = {(True, True): '*', (True, False): '*>^', (False, True): '^>*'
 class Smiles:
     __slots__ = ()
 
+    @depends_on('topology', 'charges', 'stereo')
     @cached_method
     def __str__(self):
-        return ''.join(self._smiles(self.atoms_order.get))
+        return ''.join(self._smiles(self._smiles_order.get))
 
     def __format__(self, format_spec):
         """
@@ -81,18 +84,31 @@ class Smiles:
             if 'r' in format_spec:
                 def w(x):
                     return random()
-            else:
+            elif '!s' in format_spec:  # stereo independent order
                 w = self.atoms_order.get
+            else:
+                w = self._smiles_order.get
             return ''.join(self._smiles(w, **kwargs))
         return str(self)
 
     def __eq__(self, other):
-        return isinstance(other, Smiles) and str(self) == str(other)
+        if isinstance(other, Smiles):
+            return str(self) == str(other)
+        return NotImplemented  # FrozenMoleculeContainer compares itself
+
+    @property
+    def _smiles_order(self) -> Dict[int, int]:
+        """
+        Atoms ranks used for canonical SMILES.
+        """
+        return self.atoms_order
 
+    @depends_on('topology', 'charges', 'stereo')
     @cached_method
     def __hash__(self):
         return hash(str(self))
 
+    @depends_on('topology', 'charges', 'stereo')
     @cached_method
     def __bytes__(self):
         return sha512(str(self).encode()).digest()
@@ -251,6 +267,10 @@ class Smiles:
 class MoleculeSmiles(Smiles):
     __slots__ = ()
 
+    @property
+    def _smiles_order(self) -> Dict[int, int]:
+        return self._stereo_atoms_order  # stereo atoms with equal ranks written in same order for any numbering
+
     def _format_atom(self, n, adjacency, **kwargs):
         atom = self._atoms[n]
         charge = self._charges[n]
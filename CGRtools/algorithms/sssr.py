@@ -17,23 +17,26 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from CachedMethods import cached_property
-from collections import defaultdict
-from itertools import chain, combinations, product
-from logging import warning
-from operator import itemgetter
-from typing import Any, Dict, Set, Tuple, Union
+from itertools import combinations
+from typing import Any, Dict, List, Set, Tuple, Union
+from .._cache import depends_on
 from ..exceptions import ImplementationError
 
 
 class SSSR:
-    """ SSSR calculation. based on idea of PID matrices from:
-        Lee, C. J., Kang, Y.-M., Cho, K.-H., & No, K. T. (2009).
-        A robust method for searching the smallest set of smallest rings with a path-included distance matrix.
-        Proceedings of the National Academy of Sciences of the United States of America, 106(41), 17355–17358.
-        http://doi.org/10.1073/pnas.0813040106
+    """ SSSR calculation. Graph splitted into ring systems (biconnected components).
+        For each ring system candidate cycles (prototypes of relevant cycles) generated by BFS from each atom
+        and minimal cycles basis selected by Gaussian elimination over GF(2). Based on:
+        Vismara, P. (1997). Union of all the minimum cycle bases of a graph.
+        The Electronic Journal of Combinatorics, 4(1), R9. http://doi.org/10.37236/1294
+
+        Minimal cycles basis of ring system can be not unique (e.g. cubane or macrocycles with equal bridges).
+        Each relevant cycles family represented by member with shortest paths of smallest atoms numbers
+        and equal rings ordered by sorted atoms numbers. Thus rings choice depends only on atoms numbers.
     """
     __slots__ = ()
 
+    @depends_on('topology')
     @cached_property
     def sssr(self) -> Tuple[Tuple[int, ...], ...]:
         """
@@ -51,210 +54,167 @@ class SSSR:
         Smallest Set of Smallest Rings of any adjacency matrix.
         Number of rings required.
         """
+        rings = []
         bonds = cls._skin_graph(bonds)
-        return cls.__rings_filter(cls.__c_set(*cls.__make_pid(bonds)), n_sssr, bonds)
-
-    @staticmethod
-    def __make_pid(bonds):
-        lb = len(bonds)
-        pid1 = defaultdict(lambda: defaultdict(dict))
-        pid2 = defaultdict(lambda: defaultdict(dict))
-        distances = defaultdict(lambda: defaultdict(lambda: lb))
-        for n, ms in bonds.items():
-            dn = distances[n]
-            pn = pid1[n]
-            for m in ms:
-                pn[m][(m, n)] = (n, m)
-                dn[m] = 1
-
-        for k in bonds:
-            new_distances = defaultdict(dict)
-            dk = distances[k]
-            ndk = new_distances[k]
-            for i in bonds:
-                if i == k:
-                    continue
-                di = distances[i]
-                ndi = new_distances[i]
-                ndk[i] = ndi[k] = di[k]
-                for j in bonds:
-                    if j == k or j == i:
-                        continue
-                    ij = di[j]
-                    ikj = di[k] + dk[j]
-                    if ij - ikj == 1:  # A new shortest path == previous shortest path - 1
-                        pid2[i][j] = pid1[i][j]
-                        pid1[i][j] = {(ni, mj): ip[:-1] + jp for ((ni, _), ip), ((_, mj), jp) in
-                                      product(pid1[i][k].items(), pid1[k][j].items())}
-                        ndi[j] = ikj
-                    elif ij > ikj:  # A new shortest path
-                        pid2[i][j] = {}
-                        pid1[i][j] = {(ni, mj): ip[:-1] + jp for ((ni, _), ip), ((_, mj), jp) in
-                                      product(pid1[i][k].items(), pid1[k][j].items())}
-                        ndi[j] = ikj
-                    elif ij == ikj:  # Another shortest path
-                        pid1[i][j].update({(ni, mj): ip[:-1] + jp for ((ni, _), ip), ((_, mj), jp) in
-                                           product(pid1[i][k].items(), pid1[k][j].items())})
-                        ndi[j] = ij
-                    elif ikj - ij == 1:  # Shortest+1 path
-                        pid2[i][j].update({(ni, mj): ip[:-1] + jp for ((ni, _), ip), ((_, mj), jp) in
-                                           product(pid1[i][k].items(), pid1[k][j].items())})
-                        ndi[j] = ij
-                    else:
-                        ndi[j] = ij
-            distances = new_distances
-        return pid1, pid2, distances
-
-    @staticmethod
-    def __c_set(pid1, pid2, pid1l):
-        c_set = []
-        seen = set()
-        for i, p1i in pid1.items():
-            seen.add(i)
-            di = pid1l[i]
-            p2i = pid2[i]
-
-            for j, p1ij in p1i.items():
-                if j in seen:
-                    continue
-                p1ij = list(p1ij.values())
-                p2ij = list(p2i[j].values())
-                dij = di[j] * 2
-
-                if len(p1ij) == 1:  # one shortest
-                    if not p2ij:  # need shortest + 1 path
-                        continue
-                    c_set.append((dij + 1, p1ij, p2ij))
-                elif not p2ij:  # one or more odd rings
-                    c_set.append((dij, p1ij, None))
-                else:  # odd and even rings found (e.g. bicycle)
-                    c_set.append((dij, p1ij, None))
-                    c_set.append((dij + 1, p1ij, p2ij))
-
-        for c_num, p1ij, p2ij in sorted(c_set, key=itemgetter(0)):
-            if c_num % 2:  # odd rings
-                for c1 in p1ij:
-                    for c2 in p2ij:
-                        yield c1 + c2[-2:0:-1]
-            else:
-                for c1, c2 in zip(p1ij, p1ij[1:]):
-                    yield c1 + c2[-2:0:-1]
+        for system in cls.__ring_systems(bonds):
+            rings.extend(cls.__system_rings(system))
+        if len(rings) != n_sssr:
+            raise ImplementationError
+        rings.sort(key=len)
+        return tuple(rings)
 
     @staticmethod
-    def __rings_filter(rings, n_sssr, bonds):
-        # step 1: collect isolated rings
-        c = next(rings)
-        if n_sssr == 1:
-            return c,
-
-        ck = frozenset(c)
-        seen_rings = {ck}
-        sssr = {ck: c}
-        condensed_rings = {ck}  # collection of contours of condensed rings
-        hold = []
-        for c in rings:
-            ck = frozenset(c)
-            if len(ck) != len(c) or ck in seen_rings:
+    def __ring_systems(bonds: Dict[int, Set[int]]) -> List[List[Tuple[int, int]]]:
+        """
+        Bonds of biconnected components with cycles. Iterative Tarjan algorithm.
+        """
+        index = {}
+        low = {}
+        systems = []
+        for root in bonds:
+            if root in index:
                 continue
-            seen_rings.add(ck)
-
-            # create graph of connected neighbour rings
-            neighbors = {x: set() for x in chain(sssr, condensed_rings) if len(x & ck) > 1}
-            if neighbors:
-                for i, j in combinations(neighbors, 2):
-                    if len(i & j) > 1:
-                        neighbors[i].add(j)
-                        neighbors[j].add(i)
-                # check if hold rings is combination of existing. (123654) is combo of (1254) and (2365)
-                #
-                # 1--2--3
-                # |  |  |
-                # 4--5--6
-                #
-                # modified NX.dfs_labeled_edges
-                # https://networkx.github.io/documentation/stable/reference/algorithms/generated/networkx.algorithms.\
-                # traversal.depth_first_search.dfs_labeled_edges.html
-                depth_limit = len(neighbors) - 1
-                for start, nbrs in neighbors.items():
-                    if not nbrs:
-                        continue
-                    stack = [(start, depth_limit, iter(neighbors[start]), {start})]
-                    while stack:
-                        parent, depth_now, children, seen = stack[-1]
-                        try:
-                            child = next(children)
-                        except StopIteration:
-                            stack.pop()
-                        else:
-                            if child not in seen:
-                                common = parent & child
-                                if len(common) > 2:  # only terminal common atoms required
-                                    mc = parent ^ child | {n for n in common if len(common.intersection(bonds[n])) == 1}
-                                else:  # neighbors at least have 2 common atoms
-                                    mc = parent | child
-                                if ck == mc:  # macrocycle found
-                                    break
-                                elif depth_now and 2 < len(mc) <= len(c):
-                                    stack.append((mc, depth_now - 1, iter(neighbors[child]), {child} | seen))
-                    else:
+            index[root] = low[root] = len(index)
+            stack = [(root, None, iter(bonds[root]))]
+            edges = []
+            while stack:
+                n, parent, children = stack[-1]
+                for m in children:
+                    if m == parent:
                         continue
-                    break
+                    elif m not in index:
+                        index[m] = low[m] = len(index)
+                        edges.append((n, m))
+                        stack.append((m, n, iter(bonds[m])))
+                        break
+                    elif index[m] < index[n]:  # back edge
+                        edges.append((n, m))
+                        if index[m] < low[n]:
+                            low[n] = index[m]
                 else:
-                    # update condensed rings. need for cuban and fullerene like structures.
-                    tmp = set()
-                    ckc = ck
-                    for r in condensed_rings:
-                        common = r & ckc
-                        lc = len(common)
-                        if lc == 2:
-                            ckc |= r
-                        elif lc == len(ckc):
-                            unique = r - ckc
-                            ckc = unique | {n for n in common if not unique.isdisjoint(bonds[n])}
-                        # elif lc == len(r):  # impossible?
-                        #     ckc -= r
-                        elif lc > 2:
-                            ckc = r ^ ckc | {n for n in common if len(common.intersection(bonds[n])) == 1}
-                            while True:
-                                term = {n for n in ckc if len(ckc.intersection(bonds[n])) == 1}
-                                if not term:
-                                    break
-                                ckc -= term
-                        else:
-                            tmp.add(r)
-                    condensed_rings = tmp
+                    stack.pop()
+                    if parent is None:
+                        continue
+                    if low[n] < low[parent]:
+                        low[parent] = low[n]
+                    if low[n] >= index[parent]:  # parent is articulation point or root
+                        system = []
+                        while True:
+                            edge = edges.pop()
+                            system.append(edge)
+                            if edge == (parent, n):
+                                break
+                        if len(system) > 1:  # skip linkers
+                            systems.append(system)
+        return systems
 
-                    if ckc != ck and ckc in seen_rings:
-                        # check ring for full surrounding by other rings
-                        # reduced to existing ring. finish reached?
-                        neighbors = set()  # bonds of neighbors
-                        for r in sssr:
-                            if len(r & ck) > 1:
-                                for n in r:
-                                    for m in bonds[n]:
-                                        if m in r:
-                                            neighbors.add((n, m))
-                        if (c[0], c[-1]) in neighbors and all(x in neighbors for x in zip(c, c[1:])):
-                            condensed_rings.add(ck)  # add ring to condensed. required for combined rings detection.
-                            hold.append(c)
+    @classmethod
+    def __system_rings(cls, edges: List[Tuple[int, int]]) -> List[Tuple[int, ...]]:
+        """
+        Minimal cycles basis of ring system.
+        """
+        atoms = sorted({n for e in edges for n in e})
+        n_sssr = len(edges) - len(atoms) + 1
+        if n_sssr == 1:  # isolated ring
+            return [cls.__ring(edges, atoms[0])]
+
+        # integer relabeling. atom index is its order used for prototypes filtering
+        mapping = {n: i for i, n in enumerate(atoms)}
+        size = len(atoms)
+        adjacency = [[] for _ in range(size)]
+        for e, (n, m) in enumerate(edges):
+            n = mapping[n]
+            m = mapping[m]
+            bit = 1 << e
+            adjacency[n].append((m, bit))
+            adjacency[m].append((n, bit))
+
+        candidates = []
+        for r in range(1, size):
+            # BFS. atoms of V_r have shortest path to r through lower ordered atoms only.
+            distances = [-1] * size
+            distances[r] = 0
+            paths = [0] * size  # bonds bitmask of shortest path to r
+            nodes = [0] * size  # atoms bitmask of shortest path to r. reversed order of bits
+            nodes[r] = 1 << size - r
+            branch = [-1] * size  # second atom in shortest path. equal branches means overlapped paths
+            lower = []  # V_r in BFS order
+            queue = [r]
+            for n in queue:
+                dn = distances[n] + 1
+                in_lower = n == r or branch[n] != -1
+                for m, bit in adjacency[n]:
+                    if distances[m] == -1:
+                        distances[m] = dn
+                        queue.append(m)
+                    if in_lower and m < r and distances[m] == dn:
+                        # from equal shortest paths keep path with smallest atoms. it is a member of family.
+                        path_nodes = nodes[n] | 1 << size - m
+                        if branch[m] == -1:
+                            lower.append(m)
+                        elif path_nodes <= nodes[m]:
                             continue
+                        paths[m] = paths[n] | bit
+                        nodes[m] = path_nodes
+                        branch[m] = m if n == r else branch[n]
+
+            for y in lower:
+                dy = distances[y]
+                by = branch[y]
+                predecessors = []
+                for z, bit in adjacency[y]:
+                    bz = branch[z]
+                    if bz == -1:  # z not in V_r
+                        continue
+                    dz = distances[z]
+                    if dz == dy - 1:
+                        predecessors.append((z, bit))
+                    elif dz == dy and z < y and bz != by:  # odd ring
+                        candidates.append((2 * dy + 1, -(nodes[y] | nodes[z]), paths[y] | paths[z] | bit))
+                for (p, pb), (q, qb) in combinations(predecessors, 2):
+                    if branch[p] != branch[q]:  # even ring
+                        candidates.append((2 * dy, -(nodes[p] | nodes[q] | 1 << size - y),
+                                           paths[p] | paths[q] | pb | qb))
+
+        # equal rings ordered by sorted atoms numbers: lower numbers first
+        candidates.sort()
+        basis = {}
+        rings = []
+        for _, _, cycle in candidates:
+            vector = cycle
+            while vector:
+                pivot = vector.bit_length()
+                try:
+                    vector ^= basis[pivot]
+                except KeyError:
+                    basis[pivot] = vector
+                    ring = []
+                    while cycle:
+                        bit = cycle & -cycle
+                        ring.append(edges[bit.bit_length() - 1])
+                        cycle ^= bit
+                    rings.append(cls.__ring(ring, min(n for e in ring for n in e)))
+                    if len(rings) == n_sssr:
+                        return rings
+                    break
+        raise ImplementationError
 
-                    condensed_rings.add(ckc)
-                    seen_rings.add(ckc)
-                    sssr[ck] = c
-                    if len(sssr) == n_sssr:
-                        return tuple(sssr.values())
-            else:
-                condensed_rings.add(ck)
-                sssr[ck] = c
-                if len(sssr) == n_sssr:
-                    return tuple(sssr.values())
-
-        if len(hold) < n_sssr - len(sssr):
-            raise ImplementationError
-        elif len(hold) > n_sssr - len(sssr):
-            warning('Number of closing rings more than SSSR count. Possible errors.')
-        return (*sssr.values(), *hold[:n_sssr - len(sssr)])
+    @staticmethod
+    def __ring(edges: List[Tuple[int, int]], start: int) -> Tuple[int, ...]:
+        """
+        Ordered atoms of simple cycle.
+        """
+        neighbors = {}
+        for n, m in edges:
+            neighbors.setdefault(n, []).append(m)
+            neighbors.setdefault(m, []).append(n)
+        ring = [start]
+        previous, n = start, neighbors[start][0]
+        while n != start:
+            ring.append(n)
+            x, y = neighbors[n]
+            previous, n = n, x if y == previous else y
+        return tuple(ring)
 
 
 __all__ = ['SSSR']
@@ -19,7 +19,10 @@
 #
 from CachedMethods import class_cached_property
 from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
 from typing import List
+from .isomorphism import CompositionFilter, MultiQuery
 from ..containers import molecule, query  # cyclic imports resolve
 from ..containers.bonds import Bond
 from ..exceptions import ValenceError
@@ -33,8 +36,9 @@ class Standardize:
         Convert molecule to canonical forms of functional groups and aromatic rings without explicit hydrogens.
         """
         s = self.standardize(fix_stereo=False)
-        k = self.kekule()
-        h = self.implicify_hydrogens(fix_stereo=False)
+        with self.batch_edit():  # thiele requires actual hybridization
+            k = self.kekule()
+            h = self.implicify_hydrogens(fix_stereo=False)
         t = self.thiele()
         return s or k or h or t
 
@@ -45,17 +49,13 @@ class Standardize:
         :param logging: return list of fixed atoms with matched rules.
         """
         neutralized = self.neutralize(fix_stereo=False)
-        hs, log = self.__standardize()
+        with self.batch_edit():
+            hs, log = self.__standardize()
         if hs:
-            if not neutralized:
-                self.flush_cache()
-            for n in hs:
-                self._calc_implicit(n)
             # second round. need for intersected groups.
-            hs, lg = self.__standardize()
-            log.extend(lg)
-            for n in hs:
-                self._calc_implicit(n)
+            with self.batch_edit():
+                log.extend(self.__standardize()[1])
+        if hs or neutralized:
             if fix_stereo:
                 self._fix_stereo()
             if logging:
@@ -63,13 +63,6 @@ class Standardize:
                     log.append(((), -1, 'neutralized'))
                 return log
             return True
-        if neutralized:
-            if fix_stereo:
-                self._fix_stereo()
-            if logging:
-                log.append(((), -1, 'neutralized'))
-                return log
-            return True
         if logging:
             return log
         return False
@@ -118,12 +111,13 @@ class Standardize:
                 break  # path from negative atom to positive atom found.
             # path not found. keep negative atom n as is
         if hs:
-            self.flush_cache()
-            for n in hs:
-                self._calc_implicit(n)
-                self._calc_hybridization(n)
-            if fix_stereo:
-                self._fix_stereo()
+            with self.batch_edit():
+                for n in hs:
+                    self._calc_implicit(n)
+                    self._calc_hybridization(n)
+                self.flush_cache()
+                if fix_stereo:
+                    self._fix_stereo()
             return True
         return False
 
@@ -207,10 +201,11 @@ class Standardize:
                        for s, d, h in rules):
                     to_remove.update(hi)
                     break
-        for n in to_remove:
-            self.delete_atom(n)
-        if to_remove and fix_stereo:
-            self._fix_stereo()
+        with self.batch_edit():
+            for n in to_remove:
+                self.delete_atom(n)
+            if to_remove and fix_stereo:
+                self._fix_stereo()
         return len(to_remove)
 
     def explicify_hydrogens(self, *, fix_stereo=True) -> int:
@@ -229,10 +224,11 @@ class Standardize:
                 to_add.extend([n] * h)
             except TypeError:
                 raise ValenceError(f'atom {{{n}}} has valence error')
-        for n in to_add:
-            self.add_bond(n, self.add_atom('H'), 1)
-        if to_add and fix_stereo:
-            self._fix_stereo()
+        with self.batch_edit():
+            for n in to_add:
+                self.add_bond(n, self.add_atom('H'), 1)
+            if to_add and fix_stereo:
+                self._fix_stereo()
         return len(to_add)
 
     def check_valence(self) -> List[int]:
@@ -294,42 +290,50 @@ class Standardize:
         hs = set()
         log = []
         flush = False
-        for r, (pattern, atom_fix, bonds_fix) in enumerate(self.__standardize_compiled_rules):
-            seen = set()
-            for mapping in pattern.get_mapping(self, automorphism_filter=False):
-                match = set(mapping.values())
-                if not match.isdisjoint(seen):  # skip intersected groups
-                    continue
-                seen.update(match)
-                for n, fix in atom_fix.items():
-                    n = mapping[n]
-                    for key, value in fix.items():
-                        atom_map[key][n] = value
-                for n, m, b in bonds_fix:
-                    n = mapping[n]
-                    m = mapping[m]
-                    if m in bonds[n]:
-                        bonds[n][m]._Bond__order = b
-                        if b == 8:  # expected original molecule don't contain `any` bonds or these bonds not changed
+        rules = self.__standardize_compiled_rules
+        start = 0
+        while start is not None:  # all rules matched in one pass. restarted after fixes
+            matches = self.__standardize_compiled_matcher.get_mapping(self, start=start, automorphism_filter=False)
+            start = None
+            for r, group in groupby(matches, itemgetter(0)):
+                pattern, atom_fix, bonds_fix = rules[r]
+                seen = set()
+                for _, mapping in group:
+                    match = set(mapping.values())
+                    if not match.isdisjoint(seen):  # skip intersected groups
+                        continue
+                    seen.update(match)
+                    for n, fix in atom_fix.items():
+                        n = mapping[n]
+                        for key, value in fix.items():
+                            atom_map[key][n] = value
+                    for n, m, b in bonds_fix:
+                        n = mapping[n]
+                        m = mapping[m]
+                        if b == 8 or m not in bonds[n]:
+                            # expected original molecule don't contain `any` bonds or these bonds not changed
                             flush = True
-                    else:
-                        flush = True
                         bonds[n][m] = bonds[m][n] = Bond(b)
-                log.append((tuple(match), r, str(pattern)))
-                # flush cache
-                if flush:
-                    try:
-                        del self.__dict__['__cached_args_method_neighbors']
-                    except KeyError:  # already flushed before
-                        pass
-                    flush = False
-            hs.update(seen)
+                    log.append((tuple(match), r, str(pattern)))
+                    # flush cache
+                    if flush:
+                        self.flush_cache('topology')
+                        flush = False
+                # next rules should see fixed atoms and bonds
+                self.flush_cache('topology', 'charges')
+                hs.update(seen)
+                start = r + 1
+                break
+        if hs:  # deferred in batch_edit block
+            self.flush_cache()
+            for n in hs:
+                self._calc_implicit(n)
         return hs, log
 
     def __patch_path(self, path):
         bonds = self._bonds
         for n, m, b in path:
-            bonds[n][m]._Bond__order = b
+            bonds[n][m] = bonds[m][n] = Bond(b)
 
     def __find_delocalize_path(self, start, finish, constrains):
         bonds = self._bonds
@@ -396,6 +400,10 @@ class Standardize:
             rules.append((q, atom_fix, bonds_fix))
         return rules
 
+    @class_cached_property
+    def __standardize_compiled_matcher(self):
+        return MultiQuery([q for q, *_ in self.__standardize_compiled_rules], 'Standardize.standardize_rules')
+
     @staticmethod
     def __standardize_rules():
         rules = []
@@ -1366,13 +1374,21 @@ class StandardizeReaction:
         elif not isinstance(self.reactants[0], Standardize):
             raise TypeError('Only Molecules supported')
 
-        for r_pattern, p_pattern, fix in self.__standardize_compiled_rules:
+        rules_filter = self.__standardize_compiled_filter
+        possible = [rules_filter(m) for m in self.reactants]
+        for r, (r_pattern, p_pattern, fix) in enumerate(self.__standardize_compiled_rules):
             found = []
-            for m in self.reactants:
+            for m, p in zip(self.reactants, possible):
+                if not p >> r & 1:
+                    continue
+                matched = False
                 for mapping in r_pattern.get_mapping(m, automorphism_filter=False):
+                    matched = True
                     if mapping[1] not in seen:
                         found.append(({fix.get(k, k): v for k, v in mapping.items()},
                                       {mapping[k]: mapping[v] for k, v in fix.items()}))
+                if matched:
+                    rules_filter.match(r)
 
             if not found:
                 continue
@@ -1397,11 +1413,18 @@ class StandardizeReaction:
         else:
             flag = False
 
-        for bad_query, good_query, fix, valid in  self.__remapping_compiled_rules:
+        rules_filter = self.__remapping_compiled_filter
+        for r, (bad_query, good_query, fix, valid) in enumerate(self.__remapping_compiled_rules):
             cgr = ~self
             del  self.__dict__['__cached_method_compose']
+            if not rules_filter(cgr, r, r + 1):
+                continue
 
+            matched = False
             for mapping in bad_query.get_mapping(cgr, automorphism_filter=False):
+                if not matched:
+                    matched = True
+                    rules_filter.match(r)
                 if not seen.isdisjoint(mapping.values()):  # prevent matching same RC
                     continue
                 mapping = {mapping[n]: mapping[m] for n, m in fix.items()}
@@ -1468,6 +1491,11 @@ class StandardizeReaction:
     def __remapping_compiled_rules(self):
         return ()
 
+    @class_cached_property
+    def __remapping_compiled_filter(self):
+        return CompositionFilter([q for q, *_ in self.__remapping_compiled_rules],
+                                 'StandardizeReaction.remapping_rules')
+
     def implicify_hydrogens(self) -> int:
         """
         Remove explicit hydrogens if possible
@@ -1663,6 +1691,11 @@ class StandardizeReaction:
             rules.append((r_q, p_q, fix))
         return rules
 
+    @class_cached_property
+    def __standardize_compiled_filter(self):
+        return CompositionFilter([q for q, *_ in self.__standardize_compiled_rules],
+                                 'StandardizeReaction.standardize_rules')
+
     @staticmethod
     def __standardize_rules():
         rules = []
@@ -20,6 +20,8 @@ from CachedMethods import cached_property
 from collections import defaultdict, deque
 from logging import info
 from typing import Dict, Optional, Set, Tuple, Union
+from .morgan import automorphism_generators, individualize, initial_partition, refine, split
+from .._cache import depends_on
 from ..exceptions import AtomNotFound, IsChiral, NotChiral
 
 
@@ -133,7 +135,7 @@ class Stereo:
         self._atoms_stereo.clear()
         self._allenes_stereo.clear()
         self._cis_trans_stereo.clear()
-        self.flush_cache()
+        self.flush_cache('stereo')
 
     def get_mapping(self, other, **kwargs):
         atoms_stereo = self._atoms_stereo
@@ -188,6 +190,7 @@ class Stereo:
         else:
             yield from super().get_mapping(other, **kwargs)
 
+    @depends_on('topology', 'charges', 'coordinates', 'stereo')
     @cached_property
     def _wedge_map(self):
         plane = self._plane
@@ -387,6 +390,7 @@ class Stereo:
             return not s
         return s
 
+    @depends_on('topology')
     @cached_property
     def _stereo_cumulenes(self) -> Dict[Tuple[int, ...], Tuple[int, int, Optional[int], Optional[int]]]:
         """
@@ -415,6 +419,7 @@ class Stereo:
                 cumulenes[path] = (nn[0], mn[0], sn, sm)
         return cumulenes
 
+    @depends_on('topology', 'charges')
     @cached_property
     def _stereo_tetrahedrons(self) -> Dict[int, Union[Tuple[int, int, int], Tuple[int, int, int, int]]]:
         """
@@ -434,6 +439,7 @@ class Stereo:
                 tetrahedrons[n] = env
         return tetrahedrons
 
+    @depends_on('topology')
     @cached_property
     def _stereo_cis_trans(self) -> Dict[Tuple[int, int], Tuple[int, int, Optional[int], Optional[int]]]:
         """
@@ -441,10 +447,12 @@ class Stereo:
         """
         return {(n, m): env for (n, *mid, m), env in self._stereo_cumulenes.items() if not len(mid) % 2}
 
+    @depends_on('topology')
     @cached_property
     def _stereo_cis_trans_paths(self) -> Dict[Tuple[int, int], Tuple[int, ...]]:
         return {(path[0], path[-1]): path for path in self._stereo_cumulenes if not len(path) % 2}
 
+    @depends_on('topology')
     @cached_property
     def _stereo_cis_trans_terminals(self) -> Dict[int, Tuple[int, int]]:
         """
@@ -456,6 +464,7 @@ class Stereo:
             terminals[n] = terminals[m] = nm
         return terminals
 
+    @depends_on('topology')
     @cached_property
     def _stereo_allenes(self) -> Dict[int, Tuple[int, int, Optional[int], Optional[int]]]:
         """
@@ -463,6 +472,7 @@ class Stereo:
         """
         return {path[len(path) // 2]: env for path, env in self._stereo_cumulenes.items() if len(path) % 2}
 
+    @depends_on('topology')
     @cached_property
     def _stereo_allenes_centers(self) -> Dict[int, int]:
         """
@@ -473,6 +483,7 @@ class Stereo:
             terminals[n] = terminals[m] = c
         return terminals
 
+    @depends_on('topology')
     @cached_property
     def _stereo_allenes_terminals(self) -> Dict[int, Tuple[int, int]]:
         """
@@ -480,6 +491,7 @@ class Stereo:
         """
         return {c: (path[0], path[-1]) for c, path in self._stereo_allenes_paths.items()}
 
+    @depends_on('topology')
     @cached_property
     def _stereo_allenes_paths(self) -> Dict[int, Tuple[int, ...]]:
         return {path[len(path) // 2]: path for path in self._stereo_cumulenes if len(path) % 2}
@@ -517,7 +529,7 @@ class MoleculeStereo(Stereo):
             if s:
                 self._atoms_stereo[n] = s > 0
                 if clean_cache:
-                    self.flush_cache()
+                    self.flush_cache('stereo')
         else:
             c = self._stereo_allenes_centers.get(n)
             if c:
@@ -547,7 +559,7 @@ class MoleculeStereo(Stereo):
                 if s:
                     self._allenes_stereo[c] = s < 0 if r else s > 0
                     if clean_cache:
-                        self.flush_cache()
+                        self.flush_cache('stereo')
             else:
                 # only tetrahedrons and allenes supported
                 raise NotChiral
@@ -574,7 +586,7 @@ class MoleculeStereo(Stereo):
             else:
                 break
         if flag and clean_cache:
-            self.flush_cache()
+            self.flush_cache('stereo')
 
     def add_atom_stereo(self, n: int, env: Tuple[int, ...], mark: bool, *, clean_cache=True):
         """
@@ -596,11 +608,11 @@ class MoleculeStereo(Stereo):
         if n in self._chiral_tetrahedrons:
             self._atoms_stereo[n] = self._translate_tetrahedron_sign_reversed(n, env, mark)
             if clean_cache:
-                self.flush_cache()
+                self.flush_cache('stereo')
         elif n in self._chiral_allenes:
             self._allenes_stereo[n] = self._translate_allene_sign_reversed(n, *env, mark)
             if clean_cache:
-                self.flush_cache()
+                self.flush_cache('stereo')
         else:  # only tetrahedrons supported
             raise NotChiral
 
@@ -629,11 +641,11 @@ class MoleculeStereo(Stereo):
         if (n, m) in self._chiral_cis_trans:
             self._cis_trans_stereo[(n, m)] = self._translate_cis_trans_sign_reversed(n, m, n1, n2, mark)
             if clean_cache:
-                self.flush_cache()
+                self.flush_cache('stereo')
         elif (m, n) in self._chiral_cis_trans:
             self._cis_trans_stereo[(m, n)] = self._translate_cis_trans_sign_reversed(m, n, n2, n1, mark)
             if clean_cache:
-                self.flush_cache()
+                self.flush_cache('stereo')
         else:
             raise NotChiral
 
@@ -708,6 +720,7 @@ class MoleculeStereo(Stereo):
     def _chiral_allenes(self) -> Set[int]:
         return self.__chiral_centers[2]
 
+    @depends_on('topology', 'charges')
     @cached_property
     def _stereo_axises(self) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]:
         """
@@ -813,6 +826,7 @@ class MoleculeStereo(Stereo):
                 env.append(e)
         return tuple(out), tuple(env)
 
+    @depends_on('topology', 'charges')
     @cached_property
     def __stereo_axises(self):
         bonds = self._bonds
@@ -846,6 +860,7 @@ class MoleculeStereo(Stereo):
                     checks[n] = ngb
         return axises
 
+    @depends_on('topology', 'charges', 'stereo')
     @cached_property
     def __chiral_centers(self):
         atoms_stereo = self._atoms_stereo
@@ -970,6 +985,178 @@ class MoleculeStereo(Stereo):
             else:
                 return chiral_t, {(n, m) for n, *_, m in chiral_c}, {path[len(path) // 2] for path in chiral_a}
 
+    @depends_on('topology', 'charges', 'stereo')
+    @cached_property
+    def _stereo_atoms_order(self) -> Dict[int, int]:
+        """
+        Canonical atoms ranks refined by stereo marks.
+
+        Stereo atoms with neighbors unique by colors get labels independent from atoms numbering.
+        Labeled atoms split cells and refinement repeated until new labels found.
+        Stereo atoms with equal neighbors left (e.g. bridgeheads of bicyclo[2.2.2]octane) are labeled
+        in individualization search of these neighbors. Neighbors in one orbit of stereo preserving automorphisms
+        fixing already individualized atoms give equal branches, thus only one of them expanded.
+        Only branches with smallest labels invariant kept. From leaves one with smallest invariants chosen.
+        Search limited by number of atoms. On exceeding limit ties left unresolved.
+        """
+        if not self._atoms_stereo and not self._cis_trans_stereo and not self._allenes_stereo:
+            return self.atoms_order
+        adjacency = {n: [(m, int(b)) for m, b in ms.items()] for n, ms in self._bonds.items()}
+        weights = {n: hash(a) for n, a in self._atoms.items()}
+        colors, free = initial_partition(weights)
+        free = refine(colors, free, adjacency)
+        cells = defaultdict(set)
+        for n, c in colors.items():
+            cells[c].add(n)
+        cells = {c: x for c, x in cells.items() if len(x) > 1}
+        signs = {}  # labels of stereo atoms for given neighbors order
+        root = colors, cells, free, _, ties = self.__stereo_refine(colors, cells, free, adjacency, signs)
+
+        if ties:
+            def refinement(colors, cells, free):
+                colors, cells, free, labels, _ = self.__stereo_refine(colors, cells, free, adjacency, signs)
+                return colors, cells, free, sorted((colors[n], s) for n, s in labels.items())
+
+            limit = len(colors)
+            generators = automorphism_generators(weights, adjacency, refinement, self.__is_stereo_automorphism,
+                                                 8 * limit)
+            best = best_trace = None
+            stack = [(root, (), [])]
+            while stack:
+                (colors, cells, free, _, ties), path, trace = stack.pop()
+                # equal neighbors of stereo atoms with smallest color
+                color = min(colors[n] for n in ties)
+                orbits = {n: n for n in ties if colors[n] == color}  # union-find of atoms orbits
+
+                def find(n):
+                    while orbits[n] != n:
+                        orbits[n] = n = orbits[orbits[n]]
+                    return n
+
+                for g in generators:
+                    if all(g[n] == n for n in path):  # stabilizer of individualized atoms
+                        for n in orbits:
+                            k, v = find(n), find(g[n])
+                            if k != v:
+                                orbits[max(k, v)] = min(k, v)
+
+                representatives = sorted(n for n, m in orbits.items() if n == m)
+                if len(representatives) > limit:  # too big search. ties left unresolved
+                    best = root[0]
+                    break
+                limit -= len(representatives)
+                branches = []
+                for n in representatives:
+                    branch = self.__stereo_refine(*individualize(colors, cells, free, n, adjacency), adjacency, signs)
+                    branches.append((sorted((branch[0][m], s) for m, s in branch[3].items()), branch, n))
+                invariant = min(x for x, *_ in branches)
+                for x, branch, n in branches:
+                    if x != invariant:
+                        continue
+                    elif branch[4]:
+                        stack.append((branch, (*path, n), trace + [x]))
+                    elif best is None or trace + [x] < best_trace:
+                        best = branch[0]
+                        best_trace = trace + [x]
+            colors = best
+        ranks = {c: i for i, c in enumerate(sorted(set(colors.values())), start=1)}
+        return {n: ranks[c] for n, c in colors.items()}
+
+    def __stereo_refine(self, colors, cells, free, adjacency, signs):
+        """
+        Split cells of partition by stereo labels.
+
+        :return: new partition, labels and neighbors of not labeled stereo atoms with equal colors
+        """
+        atoms_stereo = self._atoms_stereo
+        cis_trans_stereo = self._cis_trans_stereo
+        allenes_stereo = self._allenes_stereo
+        tetrahedrons = self._stereo_tetrahedrons
+        cis_trans = self._stereo_cis_trans
+        cis_trans_terminals = self._stereo_cis_trans_terminals
+        allenes = self._stereo_allenes
+
+        while True:
+            labels = {}
+            ties = set()
+            for n in atoms_stereo:
+                env = tetrahedrons[n]
+                if len({colors[x] for x in env}) == len(env):
+                    key = (n, *sorted(env, key=colors.get))
+                    try:
+                        labels[n] = signs[key]
+                    except KeyError:
+                        labels[n] = signs[key] = self._translate_tetrahedron_sign(n, key[1:])
+                else:
+                    ties.update(env)
+            for n, m in cis_trans_stereo:
+                nm = cis_trans_terminals[n]
+                n1, m1, n2, m2 = cis_trans[nm]
+                if n2 is not None and colors[n1] == colors[n2]:
+                    ties.update((n1, n2))
+                elif m2 is not None and colors[m1] == colors[m2]:
+                    ties.update((m1, m2))
+                else:
+                    a = n1 if n2 is None else min(n1, n2, key=colors.get)
+                    b = m1 if m2 is None else min(m1, m2, key=colors.get)
+                    try:
+                        labels[n] = labels[m] = signs[(n, a, b)]
+                    except KeyError:
+                        labels[n] = labels[m] = signs[(n, a, b)] = self._translate_cis_trans_sign(*nm, a, b)
+            for c in allenes_stereo:
+                n1, m1, n2, m2 = allenes[c]
+                if n2 is not None and colors[n1] == colors[n2]:
+                    ties.update((n1, n2))
+                elif m2 is not None and colors[m1] == colors[m2]:
+                    ties.update((m1, m2))
+                else:
+                    a = n1 if n2 is None else min(n1, n2, key=colors.get)
+                    b = m1 if m2 is None else min(m1, m2, key=colors.get)
+                    try:
+                        labels[c] = signs[(c, a, b)]
+                    except KeyError:
+                        labels[c] = signs[(c, a, b)] = self._translate_allene_sign(c, a, b)
+            # label splits cell into 3 ordered parts: not labeled, False and True.
+            colors, cells, new = split(colors, cells, free, labels, adjacency)
+            if new == free:
+                # only atoms with equal colors should be individualized
+                groups = defaultdict(int)
+                for n in ties:
+                    groups[colors[n]] += 1
+                return colors, cells, free, labels, {n for n in ties if groups[colors[n]] > 1}
+            free = new
+
+    def __is_stereo_automorphism(self, mapping: Dict[int, int]) -> bool:
+        """
+        Test automorphism preserves stereo marks.
+        """
+        atoms_stereo = self._atoms_stereo
+        cis_trans_stereo = self._cis_trans_stereo
+        allenes_stereo = self._allenes_stereo
+        tetrahedrons = self._stereo_tetrahedrons
+        cis_trans = self._stereo_cis_trans
+        allenes = self._stereo_allenes
+        try:
+            for n, s in atoms_stereo.items():
+                m = mapping[n]
+                if m not in atoms_stereo or \
+                        self._translate_tetrahedron_sign(m, [mapping[x] for x in tetrahedrons[n]]) != s:
+                    return False
+            for (n, m), s in cis_trans_stereo.items():
+                n1, m1, *_ = cis_trans[(n, m)]
+                x, y = mapping[n], mapping[m]
+                if (x, y) not in cis_trans_stereo and (y, x) not in cis_trans_stereo or \
+                        self._translate_cis_trans_sign(x, y, mapping[n1], mapping[m1]) != s:
+                    return False
+            for c, s in allenes_stereo.items():
+                n1, m1, *_ = allenes[c]
+                x = mapping[c]
+                if x not in allenes_stereo or self._translate_allene_sign(x, mapping[n1], mapping[m1]) != s:
+                    return False
+        except KeyError:  # stereo atom environment mapped to other atoms
+            return False
+        return True
+
 
 class QueryStereo(Stereo):  # todo: implement add_wedge
     __slots__ = ()
@@ -23,8 +23,10 @@ from functools import reduce
 from itertools import product
 from operator import and_
 from typing import TYPE_CHECKING, Iterator
+from .._cache import depends_on
 from ..containers import query  # cyclic imports resolve
 from ..containers.bonds import Bond
+from .isomorphism import CompositionFilter
 from ..periodictable import ListElement
 
 
@@ -78,8 +80,9 @@ class Tautomers:
         copy = self.copy()
         copy.clean_stereo()
         if prepare_molecules:
-            copy.kekule()
-            copy.implicify_hydrogens()
+            with copy.batch_edit():  # thiele requires actual hybridization
+                copy.kekule()
+                copy.implicify_hydrogens()
             copy.thiele()  # prevent
 
         entries = {}
@@ -190,8 +193,7 @@ class Tautomers:
             hybridizations = mol._hybridizations
 
             del bonds[n][acc], bonds[acc][n]
-            b = bonds[n][dnr]
-            b._Bond__order = b._Bond__order + 1
+            bonds[n][dnr] = bonds[dnr][n] = Bond(bonds[n][dnr].order + 1)  # bonds shared with original
             hydrogens[dnr] -= 1
             hydrogens[acc] += 1
             hybridizations[dnr] += 1
@@ -222,8 +224,7 @@ class Tautomers:
             hydrogens = mol._hydrogens
             hybridizations = mol._hybridizations
 
-            b = bonds[a][c]
-            b._Bond__order = b._Bond__order - 1
+            bonds[a][c] = bonds[c][a] = Bond(bonds[a][c].order - 1)
             bonds[d][a] = bonds[a][d] = Bond(1)
             hydrogens[c] += 1
             hydrogens[d] -= 1
@@ -290,7 +291,7 @@ class Tautomers:
                     elif m in adjn:
                         bn[m] = adjn[m]
                     else:
-                        bn[m] = bond.copy()
+                        bn[m] = bond
 
             mol.kekule()
             mol.thiele()
@@ -350,6 +351,7 @@ class Tautomers:
                                 continue
                         yield path, False
 
+    @depends_on('topology', 'charges')
     @cached_property
     def __keto_enols(self):
         atoms = self._atoms
@@ -360,10 +362,18 @@ class Tautomers:
         entries = []
         forbidden = {}
         seen = set()
-        for q, bl, wl, dnr, acc in self.__keto_enol_rules:
+        rules_filter = self.__keto_enol_filter
+        possible = rules_filter(self)
+        for r, (q, bl, wl, dnr, acc) in enumerate(self.__keto_enol_rules):
+            if not possible >> r & 1:
+                continue
             components, closures = q._compiled_query
+            matched = False
             for candidate in connected_components:
                 for mapping in q._get_mapping(components[0], closures, atoms, bonds, candidate - seen, atoms_order):
+                    if not matched:
+                        matched = True
+                        rules_filter.match(r)
                     n = mapping[1]
                     if n in seen:
                         continue
@@ -378,6 +388,7 @@ class Tautomers:
                         entries.append((n, False))
         return entries, forbidden
 
+    @depends_on('topology', 'charges')
     @cached_property
     def __h_donors_acceptors(self):
         atoms = self._atoms
@@ -389,10 +400,18 @@ class Tautomers:
         acceptors = []
 
         seen = set()
-        for q, dnr, acc in self.__h_donor_acceptor_rules:
+        rules_filter = self.__h_donor_acceptor_filter
+        possible = rules_filter(self)
+        for r, (q, dnr, acc) in enumerate(self.__h_donor_acceptor_rules):
+            if not possible >> r & 1:
+                continue
             components, closures = q._compiled_query
+            matched = False
             for candidate in connected_components:
                 for mapping in q._get_mapping(components[0], closures, atoms, bonds, candidate - seen, atoms_order):
+                    if not matched:
+                        matched = True
+                        rules_filter.match(r)
                     n = mapping[1]
                     if n in seen:
                         continue
@@ -403,6 +422,7 @@ class Tautomers:
                         acceptors.append(n)
         return donors, acceptors
 
+    @depends_on('topology', 'charges')
     @cached_property
     def __rings(self):
         atoms = self._atoms
@@ -414,10 +434,18 @@ class Tautomers:
 
         entries = []
         seen = set()
-        for q, in_ring, dnr, acc in self.__ring_rules:
+        rules_filter = self.__ring_filter
+        possible = rules_filter(self)
+        for r, (q, in_ring, dnr, acc) in enumerate(self.__ring_rules):
+            if not possible >> r & 1:
+                continue
             components, closures = q._compiled_query
+            matched = False
             for candidate in connected_components:
                 for mapping in q._get_mapping(components[0], closures, atoms, bonds, candidate - seen, atoms_order):
+                    if not matched:
+                        matched = True
+                        rules_filter.match(r)
                     n = mapping[1]
                     if n in seen:
                         continue
@@ -435,6 +463,7 @@ class Tautomers:
 
         return entries
 
+    @depends_on('topology', 'charges')
     @cached_property
     def __chains(self):
         atoms = self._atoms
@@ -445,10 +474,18 @@ class Tautomers:
         donors = []
         acceptors = []
         seen = set()
-        for q, dnr in self.__chain_rules:
+        rules_filter = self.__chain_filter
+        possible = rules_filter(self)
+        for r, (q, dnr) in enumerate(self.__chain_rules):
+            if not possible >> r & 1:
+                continue
             components, closures = q._compiled_query
+            matched = False
             for candidate in connected_components:
                 for mapping in q._get_mapping(components[0], closures, atoms, bonds, candidate - seen, atoms_order):
+                    if not matched:
+                        matched = True
+                        rules_filter.match(r)
                     n = mapping[1]
                     if n in seen:
                         continue
@@ -464,6 +501,10 @@ class Tautomers:
 
         return donors, acceptors
 
+    @class_cached_property
+    def __keto_enol_filter(self):
+        return CompositionFilter([q for q, *_ in self.__keto_enol_rules], 'Tautomers.keto_enol_rules')
+
     @class_cached_property
     def __keto_enol_rules(self):
         rules = []  # query, black list [except first], allowed, H-donor, H-acceptor
@@ -559,6 +600,10 @@ class Tautomers:
 
         return rules
 
+    @class_cached_property
+    def __h_donor_acceptor_filter(self):
+        return CompositionFilter([q for q, *_ in self.__h_donor_acceptor_rules], 'Tautomers.h_donor_acceptor_rules')
+
     @class_cached_property
     def __h_donor_acceptor_rules(self):
         rules = []  # query, H-donor, H-acceptor
@@ -627,6 +672,10 @@ class Tautomers:
 
         return rules
 
+    @class_cached_property
+    def __ring_filter(self):
+        return CompositionFilter([q for q, *_ in self.__ring_rules], 'Tautomers.ring_rules')
+
     @class_cached_property
     def __ring_rules(self):
         rules = []  # query, in ring [except first], H-donor, H-acceptor
@@ -751,6 +800,10 @@ class Tautomers:
 
         return rules
 
+    @class_cached_property
+    def __chain_filter(self):
+        return CompositionFilter([q for q, *_ in self.__chain_rules], 'Tautomers.chain_rules')
+
     @class_cached_property
     def __chain_rules(self):
         rules = []  # query, is donor
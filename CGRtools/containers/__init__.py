@@ -17,6 +17,7 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from .molecule import *
+from .frozen import *
 from .cgr import *
 from .query import *
 from .cgr_query import *
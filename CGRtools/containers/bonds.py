@@ -19,9 +19,34 @@
 from typing import Optional
 
 
+interned = False
+_bonds = {}
+_dynamic_bonds = {}
+
+
+def intern_bonds(enable: bool = True):
+    """
+    Switch interning of Bond and DynamicBond objects.
+
+    In interned mode equal bonds are the same singleton object. This saves memory on big in-RAM sets of molecules.
+    Bonds are immutable: containers replace bond objects instead of order changing.
+    Already created bonds are not affected.
+    """
+    global interned
+    interned = enable
+
+
 class Bond:
     __slots__ = ('__order',)
 
+    def __new__(cls, order=None):
+        if interned and cls is Bond:
+            try:
+                return _bonds[order]
+            except (KeyError, TypeError):  # invalid order. __init__ will raise error
+                pass
+        return super().__new__(cls)
+
     def __init__(self, order):
         if not isinstance(order, int):
             raise TypeError('invalid order value')
@@ -29,6 +54,9 @@ class Bond:
             raise ValueError('order should be from [1, 2, 3, 4, 8]')
         self.__order = order
 
+    def __reduce__(self):
+        return self.__class__, (self.__order,)
+
     def __eq__(self, other):
         if isinstance(other, Bond):
             return self.__order == other.order
@@ -48,6 +76,8 @@ class Bond:
         return self.__order
 
     def copy(self) -> 'Bond':
+        if interned and self.__class__ is Bond:
+            return _bonds[self.__order]
         copy = object.__new__(self.__class__)
         copy._Bond__order = self.__order
         return copy
@@ -56,6 +86,14 @@ class Bond:
 class DynamicBond:
     __slots__ = ('__order', '__p_order')
 
+    def __new__(cls, order=None, p_order=None):
+        if interned and cls is DynamicBond:
+            try:
+                return _dynamic_bonds[(order, p_order)]
+            except (KeyError, TypeError):
+                pass
+        return super().__new__(cls)
+
     def __init__(self, order=None, p_order=None):
         if order is None:
             if not isinstance(p_order, int):
@@ -71,6 +109,9 @@ class DynamicBond:
         self.__order = order
         self.__p_order = p_order
 
+    def __reduce__(self):
+        return self.__class__, (self.__order, self.__p_order)
+
     def __eq__(self, other):
         if isinstance(other, DynamicBond):
             return self.__order == other.order and self.__p_order == other.p_order
@@ -94,7 +135,14 @@ class DynamicBond:
         return self.__p_order
 
     def copy(self) -> 'DynamicBond':
+        if interned and self.__class__ is DynamicBond:
+            return _dynamic_bonds[(self.__order, self.__p_order)]
         copy = object.__new__(self.__class__)
         copy._DynamicBond__order = self.__order
         copy._DynamicBond__p_order = self.__p_order
         return copy
+
+
+_bonds.update((x, Bond(x)) for x in (1, 2, 3, 4, 8))
+_dynamic_bonds.update(((x, y), DynamicBond(x, y)) for x in (1, 2, 3, 4, 8, None) for y in (1, 2, 3, 4, 8, None)
+                      if x or y)
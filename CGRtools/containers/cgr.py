@@ -16,12 +16,16 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from array import array
 from CachedMethods import cached_args_method
 from collections import defaultdict
+from itertools import islice
+from struct import Struct
 from typing import List, Union, Tuple, Dict, Optional
 from . import cgr_query as query, molecule  # cyclic imports resolve
 from .bonds import Bond, DynamicBond
 from .common import Graph
+from .._cache import depends_on
 from ..algorithms.calculate2d import Calculate2DCGR
 from ..algorithms.components import CGRComponents
 from ..algorithms.depict import DepictCGR
@@ -31,6 +35,11 @@ from ..exceptions import MappingError
 from ..periodictable import DynamicElement, Element, DynamicQueryElement
 
 
+pack_header = Struct('<4sBIII')  # magic, version, atoms, adjacency size, conformers count
+pack_magic = b'CGRC'
+pack_version = 1
+
+
 class CGRContainer(Graph, CGRSmiles, CGRComponents, DepictCGR, Calculate2DCGR, X3domCGR):
     __slots__ = ('_conformers', '_p_charges', '_p_radicals', '_hybridizations', '_p_hybridizations')
 
@@ -103,6 +112,7 @@ class CGRContainer(Graph, CGRSmiles, CGRComponents, DepictCGR, Calculate2DCGR, X
         self._calc_hybridization(n)
         self._calc_hybridization(m)
 
+    @depends_on('topology')
     @cached_args_method
     def neighbors(self, n: int) -> Tuple[int, int]:
         """number of neighbors atoms excluding any-bonded"""
@@ -471,6 +481,125 @@ class CGRContainer(Graph, CGRSmiles, CGRComponents, DepictCGR, Calculate2DCGR, X
         self._hybridizations[n] = hybridization
         self._p_hybridizations[n] = p_hybridization
 
+    def to_bytes(self) -> bytes:
+        """
+        Pack CGR into compact versioned binary string.
+
+        Atoms, charges, radicals, coordinates, bonds and conformers stored in fixed-width arrays.
+        Meta should be JSON serializable.
+        """
+        return self._to_bytes(self.meta)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> 'CGRContainer':
+        """
+        Unpack CGR from binary string created by `to_bytes`.
+        """
+        return cls._from_bytes(data)
+
+    def _to_bytes(self, meta) -> bytes:
+        atoms = self._atoms
+        charges = self._charges
+        radicals = self._radicals
+        p_charges = self._p_charges
+        p_radicals = self._p_radicals
+        parsed_mapping = self._parsed_mapping
+        plane = self._plane
+
+        xy = array('d')
+        for n in atoms:
+            xy.extend(plane[n])
+        # keep neighbors order as is
+        degrees = array('I')
+        neighbors = array('I')
+        orders = array('B')
+        p_orders = array('B')
+        for m_bond in self._bonds.values():
+            degrees.append(len(m_bond))
+            neighbors.extend(m_bond)
+            for b in m_bond.values():
+                orders.append(b.order or 0)
+                p_orders.append(b.p_order or 0)
+        conformers = array('d')
+        for c in self._conformers:
+            for n in atoms:
+                conformers.extend(c[n])
+
+        header = pack_header.pack(pack_magic, pack_version, len(atoms), len(orders), len(self._conformers))
+        body = self._pack_arrays(array('I', atoms),
+                                 array('B', [a.atomic_number for a in atoms.values()]),
+                                 array('H', [a.isotope or 0 for a in atoms.values()]),
+                                 array('b', [charges[n] for n in atoms]),
+                                 array('b', [p_charges[n] for n in atoms]),
+                                 array('B', [radicals[n] for n in atoms]),
+                                 array('B', [p_radicals[n] for n in atoms]),
+                                 array('i', [parsed_mapping.get(n, -1) for n in atoms]),
+                                 xy, degrees, neighbors, orders, p_orders, conformers)
+        return header + body + self._pack_meta(self.name, meta)
+
+    @classmethod
+    def _from_bytes(cls, data, meta=None) -> 'CGRContainer':
+        data = memoryview(data)
+        if len(data) < pack_header.size:
+            raise ValueError('truncated data')
+        magic, version, atoms_count, bonds_count, conformers_count = pack_header.unpack_from(data)
+        if magic != pack_magic:
+            raise ValueError('CGRContainer binary data expected')
+        if version != pack_version:
+            raise ValueError(f'unsupported binary format version: {version}')
+
+        unpack = cls._unpack_array
+        offset = pack_header.size
+        numbers, offset = unpack(data, offset, 'I', atoms_count)
+        atomic_numbers, offset = unpack(data, offset, 'B', atoms_count)
+        isotopes, offset = unpack(data, offset, 'H', atoms_count)
+        charges, offset = unpack(data, offset, 'b', atoms_count)
+        p_charges, offset = unpack(data, offset, 'b', atoms_count)
+        radicals, offset = unpack(data, offset, 'B', atoms_count)
+        p_radicals, offset = unpack(data, offset, 'B', atoms_count)
+        parsed_mapping, offset = unpack(data, offset, 'i', atoms_count)
+        xy, offset = unpack(data, offset, 'd', atoms_count * 2)
+        degrees, offset = unpack(data, offset, 'I', atoms_count)
+        neighbors, offset = unpack(data, offset, 'I', bonds_count)
+        orders, offset = unpack(data, offset, 'B', bonds_count)
+        p_orders, offset = unpack(data, offset, 'B', bonds_count)
+        conformers, offset = unpack(data, offset, 'd', atoms_count * conformers_count * 3)
+        name, packed_meta, offset = cls._unpack_meta(data, offset)
+        if offset != len(data):
+            raise ValueError('unexpected data after end of CGR')
+
+        elements = {a: DynamicElement.from_atomic_number(a) for a in set(atomic_numbers)}
+        atoms = {n: elements[a](i or None) for n, a, i in zip(numbers, atomic_numbers, isotopes)}
+        if sum(degrees) != bonds_count:
+            raise ValueError('invalid adjacency')
+        adj = {}
+        bonds = zip(neighbors, orders, p_orders)
+        for n, d in zip(numbers, degrees):
+            adj[n] = bn = {}
+            for m, order, p_order in islice(bonds, d):
+                if m in adj:
+                    bn[m] = adj[m][n]
+                else:
+                    bn[m] = DynamicBond(order or None, p_order or None)
+
+        xy = iter(xy)
+        conformers = iter(conformers)
+        conformers = [dict(zip(numbers, zip(conformers, conformers, conformers))) for _ in range(conformers_count)]
+        state = {'atoms': atoms, 'bonds': adj, 'name': name, 'meta': packed_meta if meta is None else meta,
+                 'plane': dict(zip(numbers, zip(xy, xy))),
+                 'charges': dict(zip(numbers, charges)), 'p_charges': dict(zip(numbers, p_charges)),
+                 'radicals': dict(zip(numbers, map(bool, radicals))),
+                 'p_radicals': dict(zip(numbers, map(bool, p_radicals))),
+                 'parsed_mapping': {n: m for n, m in zip(numbers, parsed_mapping) if m != -1},
+                 'conformers': conformers}
+        cgr = object.__new__(cls)
+        cgr.__setstate__(state)
+        return cgr
+
+    def __reduce__(self):
+        # meta pickled as is. it can contain not JSON serializable data.
+        return self._from_bytes, (self._to_bytes(None), self.meta)
+
     def __getstate__(self):
         return {'conformers': self._conformers, 'p_charges': self._p_charges, 'p_radicals': self._p_radicals,
                 **super().__getstate__()}
@@ -17,9 +17,15 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from abc import ABC, abstractmethod
+from array import array
 from CachedMethods import cached_property, cached_args_method
-from typing import Dict, Optional, Tuple, Iterable, Iterator, Union, List, Type
+from json import dumps, loads
+from struct import Struct
+from sys import byteorder
+from typing import Any, Collection, Dict, Optional, Tuple, Iterable, Iterator, Union, List, Type
 from .bonds import Bond, DynamicBond
+from .. import _cache
+from .._cache import depends_on, dependencies, labels, counters, scopes as cache_scopes
 from ..algorithms.components import GraphComponents
 from ..algorithms.isomorphism import Isomorphism
 from ..algorithms.mcs import MCS
@@ -29,6 +35,10 @@ from ..exceptions import AtomNotFound
 from ..periodictable import AnyAtom
 
 
+pack_tail = Struct('<II')  # name and meta lengths
+big_endian = byteorder == 'big'
+
+
 class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
     __slots__ = ('_atoms', '_bonds', '_plane', '_charges', '_radicals', '__meta', '__name', '_parsed_mapping',
                  '__dict__', '__weakref__')
@@ -63,6 +73,69 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         self.__meta = state['meta']
         self.__name = state.get('name', '')  # 4.0.9 compatibility
 
+    @staticmethod
+    def _pack_arrays(*arrays: array) -> bytes:
+        """
+        Concatenate fixed-width arrays in little-endian byte order.
+        """
+        if big_endian:
+            swapped = []
+            for x in arrays:
+                x = array(x.typecode, x)
+                x.byteswap()
+                swapped.append(x)
+            arrays = swapped
+        return b''.join(x.tobytes() for x in arrays)
+
+    @staticmethod
+    def _unpack_array(data: memoryview, offset: int, typecode: str, count: int) -> Tuple[array, int]:
+        """
+        Read `count` items of little-endian array starting from `offset`.
+
+        :return: array and offset of next chunk
+        """
+        arr = array(typecode)
+        end = offset + arr.itemsize * count
+        if end > len(data):
+            raise ValueError('truncated data')
+        arr.frombytes(data[offset:end])
+        if big_endian:
+            arr.byteswap()
+        return arr, end
+
+    @staticmethod
+    def _pack_meta(name: str, meta: Optional[Dict]) -> bytes:
+        """
+        Pack name and JSON-serializable meta. Meta can be omitted by None.
+        """
+        name = name.encode()
+        if meta:
+            try:
+                meta = dumps(meta, separators=(',', ':')).encode()
+            except TypeError as e:
+                raise TypeError('meta should be JSON serializable') from e
+        else:
+            meta = b''
+        return pack_tail.pack(len(name), len(meta)) + name + meta
+
+    @staticmethod
+    def _unpack_meta(data: memoryview, offset: int) -> Tuple[str, Dict, int]:
+        """
+        Read name and meta packed by `_pack_meta`.
+
+        :return: name, meta and offset of next chunk
+        """
+        if offset + pack_tail.size > len(data):
+            raise ValueError('truncated data')
+        ln, lm = pack_tail.unpack_from(data, offset)
+        offset += pack_tail.size
+        end = offset + ln + lm
+        if end > len(data):
+            raise ValueError('truncated data')
+        name = bytes(data[offset:offset + ln]).decode()
+        meta = loads(bytes(data[offset + ln:end]).decode()) if lm else {}
+        return name, meta, end
+
     def __len__(self):
         return len(self._atoms)
 
@@ -87,14 +160,17 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         """
         return iter(self._atoms.items())
 
+    @depends_on('topology')
     @cached_property
     def atoms_count(self) -> int:
         return len(self._atoms)
 
+    @depends_on('topology')
     @cached_property
     def atoms_numbers(self) -> Tuple[int, ...]:
         return tuple(self._atoms)
 
+    @depends_on('topology')
     @cached_args_method
     def environment(self, atom: int, include_bond: bool = True, include_atom: bool = True) -> \
             Tuple[Union[Tuple[int, Union[Bond, DynamicBond], AnyAtom],
@@ -141,6 +217,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
                 if m not in seen:
                     yield n, m, bond
 
+    @depends_on('topology')
     @cached_property
     def bonds_count(self) -> int:
         return sum(len(x) for x in self._bonds.values()) // 2
@@ -186,7 +263,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         self._plane[_map] = xy
         self._bonds[_map] = {}
         atom._attach_to_graph(self, _map)
-        self.__dict__.clear()
+        self.flush_cache('topology')
         return _map
 
     @abstractmethod
@@ -202,7 +279,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
             raise ValueError('atoms already bonded')
 
         self._bonds[n][m] = self._bonds[m][n] = bond
-        self.__dict__.clear()
+        self.flush_cache('topology')
 
     @abstractmethod
     def delete_atom(self, n: int):
@@ -220,7 +297,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
             del self._parsed_mapping[n]
         except KeyError:
             pass
-        self.__dict__.clear()
+        self.flush_cache('topology')
 
     def delete_bond(self, n: int, m: int):
         """
@@ -228,7 +305,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         """
         del self._bonds[n][m]
         del self._bonds[m][n]
-        self.__dict__.clear()
+        self.flush_cache('topology')
 
     @abstractmethod
     def remap(self, mapping: Dict[int, int], *, copy: bool = False):
@@ -289,7 +366,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
 
         self._bonds = hb
         self._parsed_mapping = hm
-        self.__dict__.clear()
+        self.flush_cache()
         return self
 
     @abstractmethod
@@ -311,15 +388,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         copy._radicals = self._radicals.copy()
         copy._plane = self._plane.copy()
         copy._parsed_mapping = self._parsed_mapping.copy()
-
-        copy._bonds = cb = {}
-        for n, m_bond in self._bonds.items():
-            cb[n] = cbn = {}
-            for m, bond in m_bond.items():
-                if m in cb:  # bond partially exists. need back-connection.
-                    cbn[m] = cb[m][n]
-                else:
-                    cbn[m] = bond.copy()
+        copy._bonds = self._copy_bonds(self._atoms)
 
         copy._atoms = ca = {}
         for n, atom in self._atoms.items():
@@ -340,7 +409,6 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         sc = self._charges
         sr = self._radicals
         sp = self._plane
-        sb = self._bonds
 
         if meta:
             sub._Graph__meta = self.__meta.copy()
@@ -353,15 +421,7 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         sub._radicals = {n: sr[n] for n in atoms}
         sub._plane = {n: sp[n] for n in atoms}
         sub._parsed_mapping = {n: m for n, m in self._parsed_mapping.items() if n in atoms}
-
-        sub._bonds = cb = {}
-        for n in atoms:
-            cb[n] = cbn = {}
-            for m, bond in sb[n].items():
-                if m in cb:  # bond partially exists. need back-connection.
-                    cbn[m] = cb[m][n]
-                elif m in atoms:
-                    cbn[m] = bond.copy()
+        sub._bonds = self._copy_bonds(atoms)
         return sub, atoms
 
     def __and__(self, other):
@@ -440,8 +500,43 @@ class Graph(GraphComponents, Morgan, SSSR, Isomorphism, MCS, ABC):
         """
         return [self.substructure(c, meta=meta) for c in self.connected_components]
 
-    def flush_cache(self):
-        self.__dict__.clear()
+    def _copy_bonds(self, atoms: Collection[int]) -> Dict[int, Dict[int, Any]]:
+        """
+        Copy of adjacency of given atoms with new bond objects.
+        """
+        sb = self._bonds
+        cb = {}
+        for n in atoms:
+            cb[n] = cbn = {}
+            for m, bond in sb[n].items():
+                if m in cb:  # bond partially exists. need back-connection.
+                    cbn[m] = cb[m][n]
+                elif m in atoms:
+                    cbn[m] = bond.copy()
+        return cb
+
+    def flush_cache(self, *scopes: str):
+        """
+        Drop cached attributes.
+
+        :param scopes: drop only attributes depending on given parts of structure: 'topology', 'charges'
+            (including radicals and implicit hydrogens), 'coordinates' or 'stereo'. By default all attributes dropped.
+        """
+        cache = self.__dict__
+        if not cache:
+            return
+        if scopes:
+            keys = [k for k in cache if not dependencies.get(k, cache_scopes).isdisjoint(scopes)]
+        else:
+            keys = list(cache)
+        if _cache.collect:
+            for k in keys:
+                counters[labels.get(k, k)][2] += 1
+        if len(keys) == len(cache):
+            cache.clear()
+        else:
+            for k in keys:
+                del cache[k]
 
     @staticmethod
     def _validate_charge(charge):
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2020 Ramil Nugmanov <nougmanoff@protonmail.com>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+from weakref import ref
+from . import molecule  # cyclic imports resolve
+from .bonds import Bond
+from ..algorithms.isomorphism import atom_code, screen_fingerprint
+from ..exceptions import AtomNotFound
+from ..periodictable import Element
+
+
+# molecule bonds are never modified in place. frozen molecules share them.
+_bonds = {x: Bond(x) for x in (1, 2, 3, 4, 8)}
+_elements = Element._numbers_registry
+
+
+class _AtomsValues(Mapping):
+    """
+    Read-only atom number to value mapping over per-atom array of frozen molecule.
+    """
+    __slots__ = ('_graph', '_values')
+
+    def __init__(self, graph: 'FrozenMoleculeContainer', values):
+        self._graph = graph
+        self._values = values
+
+    def __getitem__(self, n: int):
+        return self._values[self._graph._atom_index(n)]
+
+    def __iter__(self):
+        return iter(self._graph._numbers)
+
+    def __len__(self):
+        return len(self._graph._numbers)
+
+    def __contains__(self, n):
+        return self._graph.has_atom(n)
+
+
+class _RadicalsValues(_AtomsValues):
+    __slots__ = ()
+
+    def __getitem__(self, n: int) -> bool:
+        return bool(self._values[self._graph._atom_index(n)])
+
+
+class _HydrogensValues(_AtomsValues):
+    __slots__ = ()
+
+    def __getitem__(self, n: int) -> Optional[int]:
+        h = self._values[self._graph._atom_index(n)]
+        if h < 0:  # invalid valence
+            return None
+        return h
+
+
+class _PlaneValues(_AtomsValues):
+    __slots__ = ()
+
+    def __getitem__(self, n: int) -> Tuple[float, float]:
+        i = 2 * self._graph._atom_index(n)
+        return self._values[i], self._values[i + 1]
+
+
+class _Adjacency(_AtomsValues):
+    """
+    Adjacency view of frozen molecule. Rows memoized on access for view lifetime.
+    """
+    __slots__ = ()
+
+    def __init__(self, graph):
+        super().__init__(graph, {})
+
+    def __getitem__(self, n: int) -> Dict[int, Bond]:
+        try:
+            return self._values[n]
+        except KeyError:
+            pass
+        g = self._graph
+        i = g._atom_index(n)
+        start, end = g._indptr[i], g._indptr[i + 1]
+        numbers = g._numbers
+        self._values[n] = row = {numbers[j]: _bonds[o] for j, o in zip(g._indices[start:end], g._orders[start:end])}
+        return row
+
+
+class FrozenMoleculeContainer:
+    """
+    Immutable compact molecule. Topology stored as CSR arrays: neighbors of atom with index `i` are
+    `indices[indptr[i]:indptr[i + 1]]` with bond orders in parallel `orders` array.
+    Atoms attributes stored in parallel arrays. Element objects created on first access and cached.
+
+    Supports read API of MoleculeContainer: atoms, bonds, sssr, atoms_order, SMILES, depiction and
+    substructure search with frozen molecule as target. Use `thaw()` for editing.
+    """
+    __slots__ = ('_numbers', '_index', '_atomic_numbers', '_isotopes', '_charges_array', '_radicals_array',
+                 '_hydrogens_array', '_hybridizations_array', '_plane_array', '_indptr', '_indices', '_orders',
+                 '_stereo', '_conformers', '_parsed_mapping', '_name', '_meta', '_cached_atoms_order',
+                 '_cached_components', '_cached_sssr', '_cached_smiles', '_cached_screen', '_cached_atoms',
+                 '__weakref__')
+
+    def __init__(self, structure: 'molecule.MoleculeContainer'):
+        """
+        Freeze molecule.
+        """
+        if not isinstance(structure, molecule.MoleculeContainer):
+            raise TypeError('MoleculeContainer expected')
+        atoms = structure._atoms
+        bonds = structure._bonds
+        charges = structure._charges
+        radicals = structure._radicals
+        plane = structure._plane
+        hydrogens = structure._hydrogens
+        hybridizations = structure._hybridizations
+
+        self._numbers = numbers = array('I', atoms)
+        if all(n == i for i, n in enumerate(numbers, 1)):
+            self._index = None  # atoms numbered from 1 in order. index = number - 1
+        else:
+            self._index = {n: i for i, n in enumerate(numbers)}
+        index = self._atom_index
+
+        self._atomic_numbers = array('B', [a.atomic_number for a in atoms.values()])
+        self._isotopes = array('H', [a.isotope or 0 for a in atoms.values()])
+        self._charges_array = array('b', [charges[n] for n in numbers])
+        self._radicals_array = array('B', [radicals[n] for n in numbers])
+        self._hydrogens_array = array('b', [-1 if hydrogens[n] is None else hydrogens[n] for n in numbers])
+        self._hybridizations_array = array('B', [hybridizations[n] for n in numbers])
+        self._plane_array = array('d', [x for n in numbers for x in plane[n]])
+
+        self._indptr = indptr = array('I', [0])
+        self._indices = indices = array('I')
+        self._orders = orders = array('B')
+        for n in numbers:
+            for m, b in bonds[n].items():
+                indices.append(index(m))
+                orders.append(b.order)
+            indptr.append(len(indices))
+
+        if structure._atoms_stereo or structure._allenes_stereo or structure._cis_trans_stereo:
+            self._stereo = (structure._atoms_stereo.copy(), structure._allenes_stereo.copy(),
+                            structure._cis_trans_stereo.copy())
+        else:
+            self._stereo = None
+        self._conformers = tuple(structure._conformers) or None
+        self._parsed_mapping = structure._parsed_mapping.copy() or None
+        self._name = structure.name
+        self._meta = structure.meta.copy() or None
+        self._cached_atoms_order = self._cached_components = self._cached_sssr = self._cached_smiles = None
+        self._cached_screen = self._cached_atoms = None
+
+    def thaw(self) -> 'molecule.MoleculeContainer':
+        """
+        Mutable copy of molecule.
+        """
+        numbers = self._numbers
+        indptr = self._indptr
+        indices = self._indices
+        orders = self._orders
+        xy = self._plane_array
+
+        bonds = {}
+        for i, n in enumerate(numbers):
+            bonds[n] = bn = {}
+            for j in range(indptr[i], indptr[i + 1]):
+                m = numbers[indices[j]]
+                if m in bonds:  # bond partially exists. need back-connection.
+                    bn[m] = bonds[m][n]
+                else:
+                    bn[m] = Bond(orders[j])
+
+        if self._stereo:
+            atoms_stereo, allenes_stereo, cis_trans_stereo = (x.copy() for x in self._stereo)
+        else:
+            atoms_stereo, allenes_stereo, cis_trans_stereo = {}, {}, {}
+
+        state = {'atoms': {n: self._make_atom(i) for i, n in enumerate(numbers)}, 'bonds': bonds,
+                 'charges': dict(zip(numbers, self._charges_array)),
+                 'radicals': {n: bool(r) for n, r in zip(numbers, self._radicals_array)},
+                 'hydrogens': {n: None if h < 0 else h for n, h in zip(numbers, self._hydrogens_array)},
+                 'plane': {n: (xy[2 * i], xy[2 * i + 1]) for i, n in enumerate(numbers)},
+                 'parsed_mapping': dict(self._parsed_mapping or ()), 'name': self._name,
+                 'meta': dict(self._meta or ()), 'conformers': list(self._conformers or ()),
+                 'atoms_stereo': atoms_stereo, 'allenes_stereo': allenes_stereo, 'cis_trans_stereo': cis_trans_stereo}
+        mol = object.__new__(molecule.MoleculeContainer)
+        mol.__setstate__(state)
+        return mol
+
+    def _atom_index(self, n: int) -> int:
+        if self._index is None:
+            if isinstance(n, int) and 0 < n <= len(self._numbers):
+                return n - 1
+            raise AtomNotFound
+        try:
+            return self._index[n]
+        except KeyError:
+            raise AtomNotFound
+
+    def _make_atom(self, i: int, n: Optional[int] = None, graph: Optional[ref] = None) -> Element:
+        atom = object.__new__(_elements[self._atomic_numbers[i]])
+        atom._Core__isotope = self._isotopes[i] or None
+        if n is not None:
+            atom._graph = graph or ref(self)
+            atom._map = n
+        return atom
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __iter__(self):
+        return iter(self._numbers)
+
+    def __contains__(self, n: int):
+        return self.has_atom(n)
+
+    def __bool__(self):
+        return bool(self._numbers)
+
+    def atom(self, n: int) -> Element:
+        """
+        Element attached to frozen molecule.
+        """
+        return self._elements[self._atom_index(n)][1]
+
+    def has_atom(self, n: int) -> bool:
+        try:
+            self._atom_index(n)
+        except AtomNotFound:
+            return False
+        return True
+
+    def atoms(self) -> Iterator[Tuple[int, Element]]:
+        """
+        iterate over all atoms
+        """
+        return iter(self._elements)
+
+    @property
+    def _elements(self) -> Tuple[Tuple[int, Element], ...]:
+        if self._cached_atoms is None:
+            graph = ref(self)
+            self._cached_atoms = tuple((n, self._make_atom(i, n, graph)) for i, n in enumerate(self._numbers))
+        return self._cached_atoms
+
+    @property
+    def atoms_count(self) -> int:
+        return len(self._numbers)
+
+    @property
+    def atoms_numbers(self) -> Tuple[int, ...]:
+        return tuple(self._numbers)
+
+    def bond(self, n: int, m: int) -> Bond:
+        i, j = self._atom_index(n), self._atom_index(m)
+        indptr = self._indptr
+        for k in range(indptr[i], indptr[i + 1]):
+            if self._indices[k] == j:
+                return _bonds[self._orders[k]]
+        raise KeyError(m)
+
+    def has_bond(self, n: int, m: int) -> bool:
+        i, j = self._atom_index(n), self._atom_index(m)
+        return j in self._indices[self._indptr[i]:self._indptr[i + 1]]
+
+    def bonds(self) -> Iterator[Tuple[int, int, Bond]]:
+        """
+        iterate other all bonds
+        """
+        numbers = self._numbers
+        indptr = self._indptr
+        indices = self._indices
+        orders = self._orders
+        i = -1
+        end = 0
+        for k, (j, o) in enumerate(zip(indices, orders)):
+            while k == end:  # next atom. skip isolated atoms
+                i += 1
+                end = indptr[i + 1]
+            if j > i:
+                yield numbers[i], numbers[j], _bonds[o]
+
+    @property
+    def bonds_count(self) -> int:
+        return len(self._indices) // 2
+
+    def neighbors(self, n: int) -> int:
+        """number of neighbors atoms excluding any-bonded"""
+        i = self._atom_index(n)
+        return sum(o != 8 for o in self._orders[self._indptr[i]:self._indptr[i + 1]])
+
+    def _explicit_hydrogens(self, n: int) -> int:
+        i = self._atom_index(n)
+        an = self._atomic_numbers
+        return sum(an[j] == 1 for j in self._indices[self._indptr[i]:self._indptr[i + 1]])
+
+    def _total_hydrogens(self, n: int) -> int:
+        return self._hydrogens[n] + self._explicit_hydrogens(n)
+
+    @property
+    def meta(self) -> Dict:
+        return self._meta or {}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    # MoleculeContainer-like internal state views used by elements and algorithms.
+    @property
+    def _atoms(self) -> Dict[int, Element]:
+        return dict(self.atoms())
+
+    @property
+    def _bonds(self) -> Mapping:
+        return _Adjacency(self)
+
+    @property
+    def _charges(self) -> Mapping:
+        return _AtomsValues(self, self._charges_array)
+
+    @property
+    def _radicals(self) -> Mapping:
+        return _RadicalsValues(self, self._radicals_array)
+
+    @property
+    def _hydrogens(self) -> Mapping:
+        return _HydrogensValues(self, self._hydrogens_array)
+
+    @property
+    def _hybridizations(self) -> Mapping:
+        return _AtomsValues(self, self._hybridizations_array)
+
+    @property
+    def _plane(self) -> Mapping:
+        return _PlaneValues(self, self._plane_array)
+
+    @property
+    def _molecule_codes(self) -> Tuple[Dict[int, int], Dict[int, Dict[int, int]]]:
+        numbers = self._numbers
+        indptr = self._indptr
+        indices = self._indices
+        orders = self._orders
+        return ({n: atom_code(a, i or None, c, r, sum(o != 8 for o in orders[indptr[x]:indptr[x + 1]]), h)
+                 for x, (n, a, i, c, r, h) in enumerate(zip(numbers, self._atomic_numbers, self._isotopes,
+                                                            self._charges_array, self._radicals_array,
+                                                            self._hybridizations_array))},
+                {n: {numbers[j]: orders[k] for k, j in enumerate(indices[indptr[x]:indptr[x + 1]], indptr[x])}
+                 for x, n in enumerate(numbers)})
+
+    @property
+    def _screen_fingerprint(self) -> int:
+        if self._cached_screen is None:
+            self._cached_screen = screen_fingerprint({n: a << 5 | c + 4 << 1 | r for n, a, c, r in
+                                                      zip(self._numbers, self._atomic_numbers, self._charges_array,
+                                                          self._radicals_array)}, self._molecule_codes[1])
+        return self._cached_screen
+
+    @property
+    def _atoms_stereo(self) -> Dict[int, bool]:
+        return self._stereo[0] if self._stereo else {}
+
+    @property
+    def _allenes_stereo(self) -> Dict[int, bool]:
+        return self._stereo[1] if self._stereo else {}
+
+    @property
+    def _cis_trans_stereo(self) -> Dict[Tuple[int, int], bool]:
+        return self._stereo[2] if self._stereo else {}
+
+    # stereo signs translation required for stereo substructure search. called once per search.
+    @property
+    def _translate_tetrahedron_sign(self):
+        return self.thaw()._translate_tetrahedron_sign
+
+    @property
+    def _translate_allene_sign(self):
+        return self.thaw()._translate_allene_sign
+
+    @property
+    def _translate_cis_trans_sign(self):
+        return self.thaw()._translate_cis_trans_sign
+
+    @property
+    def connected_components(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Isolated components of single graph. E.g. salts as ion pair.
+        """
+        if self._cached_components is None:
+            numbers = self._numbers
+            indptr = self._indptr
+            indices = self._indices
+            bonds = {i: indices[indptr[i]:indptr[i + 1]] for i in range(len(numbers))}
+            self._cached_components = tuple(tuple(numbers[i] for i in x)
+                                            for x in molecule.MoleculeContainer._connected_components(bonds))
+        return self._cached_components
+
+    @property
+    def rings_count(self) -> int:
+        """
+        SSSR rings count.
+        """
+        return len(self._indices) // 2 - len(self._numbers) + len(self.connected_components)
+
+    @property
+    def sssr(self) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Smallest Set of Smallest Rings.
+
+        :return rings atoms numbers
+        """
+        if self._cached_sssr is None:
+            rings_count = self.rings_count
+            if rings_count:
+                self._cached_sssr = molecule.MoleculeContainer._sssr(self._bonds, rings_count)
+            else:
+                self._cached_sssr = ()
+        return self._cached_sssr
+
+    @property
+    def ring_atoms(self):
+        """
+        Atoms in rings
+        """
+        return tuple({x for x in self.sssr for x in x})
+
+    @property
+    def atoms_order(self) -> Dict[int, int]:
+        """
+        Canonical atoms ranks by partition refinement
+
+        :return: dict of atom-order pairs
+        """
+        if self._cached_atoms_order is None:
+            if len(self._numbers) > 1:
+                order = molecule.MoleculeContainer._morgan(self, {n: hash(a) for n, a in self.atoms()})
+                self._cached_atoms_order = array('I', [order[n] for n in self._numbers])
+            else:
+                self._cached_atoms_order = array('I', [1] * len(self._numbers))
+        return dict(zip(self._numbers, self._cached_atoms_order))
+
+    def __str__(self):
+        if self._cached_smiles is None:
+            self._cached_smiles = str(self.thaw())
+        return self._cached_smiles
+
+    def __format__(self, format_spec):
+        if format_spec:
+            return format(self.thaw(), format_spec)
+        return str(self)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self})'
+
+    def __eq__(self, other):
+        return isinstance(other, (FrozenMoleculeContainer, molecule.MoleculeContainer)) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def depict(self, **kwargs) -> str:
+        """
+        SVG depiction of molecule. See `MoleculeContainer.depict`.
+        """
+        return self.thaw().depict(**kwargs)
+
+    def _repr_svg_(self):
+        return self.depict()
+
+
+__all__ = ['FrozenMoleculeContainer']
@@ -16,12 +16,18 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from array import array
 from CachedMethods import cached_args_method, cached_property
 from collections import defaultdict
-from typing import List, Union, Tuple, Optional, Dict
-from . import cgr, query  # cyclic imports resolve
+from itertools import islice
+from operator import index
+from struct import Struct
+from typing import ContextManager, List, Union, Tuple, Optional, Dict, Sequence
+from . import cgr, frozen, query  # cyclic imports resolve
 from .bonds import Bond, DynamicBond
 from .common import Graph
+from .. import _cache
+from .._cache import depends_on, dependencies, immediate, labels, counters, scopes as cache_scopes
 from ..algorithms.aromatics import Aromatize
 from ..algorithms.calculate2d import Calculate2DMolecule
 from ..algorithms.components import StructureComponents
@@ -32,17 +38,77 @@ from ..algorithms.standardize import Standardize
 from ..algorithms.stereo import MoleculeStereo
 from ..algorithms.tautomers import Tautomers
 from ..algorithms.x3dom import X3domMolecule
-from ..exceptions import ValenceError, MappingError
+from ..exceptions import AtomNotFound, ValenceError, MappingError
 from ..periodictable import Element, QueryElement
 
 
+pack_header = Struct('<4sBIIII')  # magic, version, atoms, adjacency size, cis-trans, conformers count
+pack_magic = b'CGRM'
+pack_version = 1
+
+
+class _BatchEdit:
+    """
+    Deferred recalculation state of molecule. Created by `MoleculeContainer.batch_edit`.
+    """
+    __slots__ = ('molecule', 'implicit', 'hybridization', 'scopes', 'stereo', 'depth')
+
+    def __init__(self, molecule):
+        self.molecule = molecule
+        self.implicit = set()
+        self.hybridization = set()
+        self.scopes = set()
+        self.stereo = False
+        self.depth = 0
+
+    def __enter__(self):
+        self.depth += 1
+        self.molecule._batch = self
+        return self.molecule
+
+    def __exit__(self, _type, value, traceback):
+        self.depth -= 1
+        if self.depth:  # nested block
+            return
+        molecule = self.molecule
+        molecule._batch = None
+        self.apply(molecule)
+
+    def apply(self, molecule, mapping=None):
+        """
+        Do deferred calculations on given molecule. Used on block exit and for copies made inside block.
+
+        :param mapping: renumbering of atoms in molecule against edited one
+        """
+        if mapping:
+            mg = mapping.get
+            hybridization = [mg(n, n) for n in self.hybridization]
+            implicit = [mg(n, n) for n in self.implicit]
+        else:
+            hybridization = self.hybridization
+            implicit = self.implicit
+
+        atoms = molecule._atoms
+        for n in hybridization:
+            if n in atoms:  # skip deleted atoms
+                molecule._calc_hybridization(n)
+        for n in implicit:
+            if n in atoms:
+                molecule._calc_implicit(n)
+        if self.scopes:
+            molecule.flush_cache(*self.scopes)
+        if self.stereo:
+            molecule._fix_stereo()
+
+
 class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeSmiles, StructureComponents,
                         DepictMolecule, Calculate2DMolecule, Tautomers, Huckel, X3domMolecule):
     __slots__ = ('_conformers', '_hybridizations', '_atoms_stereo', '_hydrogens', '_cis_trans_stereo',
-                 '_allenes_stereo')
+                 '_allenes_stereo', '_batch')
     __class_cache__ = {}
 
     def __init__(self):
+        self._batch: Optional[_BatchEdit] = None
         self._conformers: List[Dict[int, Tuple[float, float, float]]] = []
         self._hybridizations: Dict[int, int] = {}
         self._hydrogens: Dict[int, Optional[int]] = {}
@@ -152,11 +218,50 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         if self._atoms[n].atomic_number != 1 and self._atoms[m].atomic_number != 1:
             self._fix_stereo()
 
+    @depends_on('topology', immediate=True)
     @cached_args_method
     def neighbors(self, n: int) -> int:
         """number of neighbors atoms excluding any-bonded"""
         return sum(b.order != 8 for b in self._bonds[n].values())
 
+    def batch_edit(self) -> ContextManager['MoleculeContainer']:
+        """
+        Context manager for massive editing of atoms and bonds:
+
+            with mol.batch_edit():
+                for n, a in mol.atoms():
+                    a.charge = 0
+
+        Implicit hydrogens and hybridization calculation, cache flushing and stereo fixing are deferred
+        to the end of block and done once for changed atoms only.
+        Implicit hydrogens, hybridizations and cached attributes are not actual inside block.
+        Substructure matching caches are dropped at once and can be used inside block.
+        Nested blocks are merged into outer one. Copies made inside block get deferred calculations done at once.
+        """
+        if self._batch is None:
+            return _BatchEdit(self)
+        return self._batch
+
+    def flush_cache(self, *scopes: str):
+        if self._batch is None:
+            super().flush_cache(*scopes)
+        else:
+            scopes = scopes or cache_scopes
+            self._batch.scopes.update(scopes)
+            cache = self.__dict__
+            keys = [k for k in immediate.intersection(cache) if not dependencies[k].isdisjoint(scopes)]
+            if _cache.collect:
+                for k in keys:
+                    counters[labels[k]][2] += 1
+            for k in keys:  # matching inside block should see actual structure
+                del cache[k]
+
+    def _fix_stereo(self):
+        if self._batch is None:
+            super()._fix_stereo()
+        else:
+            self._batch.stereo = True
+
     def remap(self, mapping, *, copy=False) -> 'MoleculeContainer':
         h = super().remap(mapping, copy=copy)
         mg = mapping.get
@@ -192,8 +297,14 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
             hcs[(mg(n, n), mg(m, m))] = stereo
 
         if copy:
+            if self._batch is not None:  # copy made inside batch block should be actual
+                self._batch.apply(h, mapping)
             return h
 
+        if self._batch is not None:  # renumber deferred atoms
+            batch = self._batch
+            batch.implicit = {mg(n, n) for n in batch.implicit}
+            batch.hybridization = {mg(n, n) for n in batch.hybridization}
         self._hybridizations = hh
         self._hydrogens = hhg
         self._conformers = hc
@@ -203,15 +314,33 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         return self
 
     def copy(self, **kwargs) -> 'MoleculeContainer':
+        """
+        Copy of molecule.
+
+        Bond objects and conformers are shared with original: molecule never modifies them in place.
+        It is not copy-on-write: atoms are bound to graph and always copied. Charges, radicals, hydrogens,
+        hybridizations and stereo dicts are modified in place by algorithms and copied too.
+
+        :param meta: include metadata
+        """
         copy = super().copy(**kwargs)
+        copy._batch = None
         copy._hybridizations = self._hybridizations.copy()
         copy._hydrogens = self._hydrogens.copy()
-        copy._conformers = [c.copy() for c in self._conformers]
+        copy._conformers = self._conformers.copy()  # conformers not modified in place. share them
         copy._atoms_stereo = self._atoms_stereo.copy()
         copy._allenes_stereo = self._allenes_stereo.copy()
         copy._cis_trans_stereo = self._cis_trans_stereo.copy()
+        if self._batch is not None:  # copy made inside batch block should be actual
+            self._batch.apply(copy)
         return copy
 
+    def freeze(self) -> 'frozen.FrozenMoleculeContainer':
+        """
+        Immutable compact copy of molecule. Use `FrozenMoleculeContainer.thaw()` for backward conversion.
+        """
+        return frozen.FrozenMoleculeContainer(self)
+
     def substructure(self, atoms, *, as_query: bool = False, **kwargs) -> Union['MoleculeContainer',
                                                                                 'query.QueryContainer']:
         """
@@ -258,6 +387,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
                 atom._attach_to_graph(sub, n)
 
             # recalculate query marks
+            sub._batch = None
             sub._hybridizations = {}
             sub._hydrogens = {}
             for n in sub._atoms:
@@ -288,7 +418,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
                     if m in ub:  # bond partially exists. need back-connection.
                         ubn[m] = ub[m][n]
                     else:
-                        ubn[m] = bond.copy()
+                        ubn[m] = bond
 
             ua = u._atoms
             for n, atom in other._atoms.items():
@@ -447,16 +577,17 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
             return dict(zip(so, oo))
         raise TypeError('MoleculeContainer expected')
 
-    def get_mapping(self, other: 'MoleculeContainer', **kwargs):
-        if isinstance(other, MoleculeContainer):
+    def get_mapping(self, other: Union['MoleculeContainer', 'frozen.FrozenMoleculeContainer'], **kwargs):
+        if isinstance(other, (MoleculeContainer, frozen.FrozenMoleculeContainer)):
             return super().get_mapping(other, **kwargs)
-        raise TypeError('MoleculeContainer expected')
+        raise TypeError('MoleculeContainer or FrozenMoleculeContainer expected')
 
     def get_mcs_mapping(self, other: 'MoleculeContainer', **kwargs):
         if isinstance(other, MoleculeContainer):
             return super().get_mcs_mapping(other, **kwargs)
         raise TypeError('MoleculeContainer expected')
 
+    @depends_on('topology', 'charges')
     @cached_property
     def molecular_charge(self) -> int:
         """
@@ -464,6 +595,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         """
         return sum(self._charges.values())
 
+    @depends_on('topology', 'charges')
     @cached_property
     def is_radical(self) -> bool:
         """
@@ -477,6 +609,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         """
         return self.molecular_charge
 
+    @depends_on('topology', 'charges')
     @cached_property
     def molecular_mass(self):
         return sum(x.atomic_mass for x in self._atoms.values())
@@ -484,6 +617,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
     def __float__(self):
         return self.molecular_mass
 
+    @depends_on('topology')
     @cached_args_method
     def _explicit_hydrogens(self, n: int) -> int:
         """
@@ -494,11 +628,24 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         atoms = self._atoms
         return sum(atoms[m].atomic_number == 1 for m in self._bonds[n])
 
+    @depends_on('topology', 'charges')
     @cached_args_method
     def _total_hydrogens(self, n: int) -> int:
         return self._hydrogens[n] + self._explicit_hydrogens(n)
 
+    def _copy_bonds(self, atoms):
+        # molecule bonds are never modified in place: changed bonds replaced by new objects.
+        # thus bonds shared with copies. adjacency dicts are new.
+        sb = self._bonds
+        if len(atoms) == len(sb):
+            return {n: sb[n].copy() for n in atoms}
+        keep = set(atoms)
+        return {n: {m: b for m, b in sb[n].items() if m in keep} for n in atoms}
+
     def _calc_implicit(self, n: int):
+        if self._batch is not None:
+            self._batch.implicit.add(n)
+            return
         atoms = self._atoms
         atom = atoms[n]
         if atom.atomic_number != 1:
@@ -526,6 +673,9 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
         self._hydrogens[n] = 0
 
     def _calc_hybridization(self, n: int):
+        if self._batch is not None:
+            self._batch.hybridization.add(n)
+            return
         hybridization = 1
         for bond in self._bonds[n].values():
             order = bond.order
@@ -542,6 +692,238 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
                     hybridization = 2
         self._hybridizations[n] = hybridization
 
+    def to_bytes(self) -> bytes:
+        """
+        Pack molecule into compact versioned binary string.
+
+        Atoms, charges, radicals, implicit hydrogens, coordinates, bonds, stereo and conformers stored in
+        fixed-width arrays. Meta should be JSON serializable.
+        """
+        return self._to_bytes(self.meta)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> 'MoleculeContainer':
+        """
+        Unpack molecule from binary string created by `to_bytes`.
+        """
+        return cls._from_bytes(data)
+
+    @classmethod
+    def from_arrays(cls, atomic_numbers: Sequence[Union[int, str]], bonds: Sequence[Tuple[int, int]],
+                    orders: Sequence[int], *, charges: Optional[Sequence[int]] = None,
+                    radicals: Optional[Sequence[bool]] = None, xy: Optional[Sequence[Tuple[float, float]]] = None,
+                    isotopes: Optional[Sequence[Optional[int]]] = None,
+                    numbers: Optional[Sequence[int]] = None) -> 'MoleculeContainer':
+        """
+        Build molecule from parallel arrays of atoms and bonds properties. Much faster than `add_atom` and `add_bond`
+        calls sequence: input validated in bulk, implicit hydrogens and hybridizations calculated once per atom.
+        Any sequences supported including numpy arrays.
+
+        :param atomic_numbers: atomic numbers or element symbols.
+        :param bonds: pairs of atoms indices in `atomic_numbers` array (zero-based).
+        :param orders: bonds orders.
+        :param charges: formal charges of atoms. zero by default.
+        :param radicals: radical states of atoms. not radicals by default.
+        :param xy: 2d coordinates of atoms. zeros by default.
+        :param isotopes: isotopes of atoms. zero or None for natural abundance.
+        :param numbers: atoms numbers. atoms numbered from 1 by default.
+        """
+        atoms_count = len(atomic_numbers)
+        for x in (charges, radicals, xy, isotopes, numbers):
+            if x is not None and len(x) != atoms_count:
+                raise ValueError('atoms properties arrays should be the same size')
+        if len(bonds) != len(orders):
+            raise ValueError('bonds and orders arrays should be the same size')
+
+        if numbers is None:
+            numbers = list(range(1, atoms_count + 1))
+        else:
+            try:
+                numbers = [index(n) for n in numbers]
+            except TypeError:
+                raise TypeError('mapping should be integer')
+            if len(set(numbers)) != atoms_count:
+                raise ValueError('atom with same number exists')
+
+        elements = {}
+        for a in set(atomic_numbers):
+            elements[a] = Element.from_symbol(a) if isinstance(a, str) else Element.from_atomic_number(index(a))
+        if isotopes is None:
+            atoms = {n: elements[a]() for n, a in zip(numbers, atomic_numbers)}
+        else:
+            atoms = {n: elements[a](i and index(i) or None) for n, a, i in zip(numbers, atomic_numbers, isotopes)}
+
+        if charges is None:
+            charges = dict.fromkeys(numbers, 0)
+        else:
+            try:
+                charges = [index(c) for c in charges]
+            except TypeError:
+                raise TypeError('formal charge should be int in range [-4, 4]')
+            if charges and (max(charges) > 4 or min(charges) < -4):
+                raise ValueError('formal charge should be in range [-4, 4]')
+            charges = dict(zip(numbers, charges))
+        if radicals is None:
+            radicals = dict.fromkeys(numbers, False)
+        else:
+            radicals = dict(zip(numbers, map(bool, radicals)))
+        if xy is None:
+            plane = dict.fromkeys(numbers, (0., 0.))
+        else:
+            plane = {n: (float(x), float(y)) for n, (x, y) in zip(numbers, xy)}
+
+        adj = {n: {} for n in numbers}
+        for (i, j), order in zip(bonds, orders):
+            i, j = index(i), index(j)
+            if i == j:
+                raise ValueError('atom loops impossible')
+            if not 0 <= i < atoms_count or not 0 <= j < atoms_count:
+                raise AtomNotFound('atoms not found')
+            n, m = numbers[i], numbers[j]
+            if m in adj[n]:
+                raise ValueError('atoms already bonded')
+            adj[n][m] = adj[m][n] = Bond(index(order))
+
+        molecule = object.__new__(cls)
+        # hydrogens not in state. will be calculated for all atoms
+        molecule.__setstate__({'atoms': atoms, 'bonds': adj, 'charges': charges, 'radicals': radicals,
+                               'plane': plane, 'parsed_mapping': {}, 'name': '', 'meta': {}, 'conformers': [],
+                               'atoms_stereo': {}, 'allenes_stereo': {}, 'cis_trans_stereo': {}})
+        return molecule
+
+    def _to_bytes(self, meta) -> bytes:
+        columns = self._to_columns()
+        header = pack_header.pack(pack_magic, pack_version, len(self._atoms), len(columns[11]),
+                                  len(self._cis_trans_stereo), len(self._conformers))
+        return header + self._pack_arrays(*columns) + self._pack_meta(self.name, meta)
+
+    def _to_columns(self) -> Tuple[array, ...]:
+        """
+        Molecule as fixed-width arrays: atom numbers, atomic numbers, isotopes, charges, radicals, implicit hydrogens,
+        parsed mapping, atoms stereo, allenes stereo, coordinates, degrees, neighbors, bond orders,
+        cis-trans pairs, cis-trans marks and conformers.
+        """
+        atoms = self._atoms
+        charges = self._charges
+        radicals = self._radicals
+        hydrogens = self._hydrogens
+        parsed_mapping = self._parsed_mapping
+        plane = self._plane
+        atoms_stereo = self._atoms_stereo
+        allenes_stereo = self._allenes_stereo
+
+        xy = array('d')
+        for n in atoms:
+            xy.extend(plane[n])
+        # neighbors order is significant for stereo marks. store adjacency as is
+        degrees = array('I')
+        neighbors = array('I')
+        orders = array('B')
+        for m_bond in self._bonds.values():
+            degrees.append(len(m_bond))
+            neighbors.extend(m_bond)
+            orders.extend(b.order for b in m_bond.values())
+        cis_trans = array('I')
+        for nm in self._cis_trans_stereo:
+            cis_trans.extend(nm)
+        conformers = array('d')
+        for c in self._conformers:
+            for n in atoms:
+                conformers.extend(c[n])
+
+        return (array('I', atoms),
+                array('B', [a.atomic_number for a in atoms.values()]),
+                array('H', [a.isotope or 0 for a in atoms.values()]),
+                array('b', [charges[n] for n in atoms]),
+                array('B', [radicals[n] for n in atoms]),
+                array('b', [-1 if h is None else h for h in (hydrogens.get(n) for n in atoms)]),
+                array('i', [parsed_mapping.get(n, -1) for n in atoms]),
+                array('b', [-1 if n not in atoms_stereo else atoms_stereo[n] for n in atoms]),
+                array('b', [-1 if n not in allenes_stereo else allenes_stereo[n] for n in atoms]),
+                xy, degrees, neighbors, orders, cis_trans, array('B', self._cis_trans_stereo.values()), conformers)
+
+    @classmethod
+    def _from_bytes(cls, data, meta=None) -> 'MoleculeContainer':
+        data = memoryview(data)
+        if len(data) < pack_header.size:
+            raise ValueError('truncated data')
+        magic, version, atoms_count, bonds_count, cis_trans_count, conformers_count = pack_header.unpack_from(data)
+        if magic != pack_magic:
+            raise ValueError('MoleculeContainer binary data expected')
+        if version != pack_version:
+            raise ValueError(f'unsupported binary format version: {version}')
+
+        unpack = cls._unpack_array
+        offset = pack_header.size
+        numbers, offset = unpack(data, offset, 'I', atoms_count)
+        atomic_numbers, offset = unpack(data, offset, 'B', atoms_count)
+        isotopes, offset = unpack(data, offset, 'H', atoms_count)
+        charges, offset = unpack(data, offset, 'b', atoms_count)
+        radicals, offset = unpack(data, offset, 'B', atoms_count)
+        hydrogens, offset = unpack(data, offset, 'b', atoms_count)
+        parsed_mapping, offset = unpack(data, offset, 'i', atoms_count)
+        atoms_stereo, offset = unpack(data, offset, 'b', atoms_count)
+        allenes_stereo, offset = unpack(data, offset, 'b', atoms_count)
+        xy, offset = unpack(data, offset, 'd', atoms_count * 2)
+        degrees, offset = unpack(data, offset, 'I', atoms_count)
+        neighbors, offset = unpack(data, offset, 'I', bonds_count)
+        orders, offset = unpack(data, offset, 'B', bonds_count)
+        cis_trans, offset = unpack(data, offset, 'I', cis_trans_count * 2)
+        cis_trans_marks, offset = unpack(data, offset, 'B', cis_trans_count)
+        conformers, offset = unpack(data, offset, 'd', atoms_count * conformers_count * 3)
+        name, packed_meta, offset = cls._unpack_meta(data, offset)
+        if offset != len(data):
+            raise ValueError('unexpected data after end of molecule')
+        return cls._from_columns(numbers, atomic_numbers, isotopes, charges, radicals, hydrogens, parsed_mapping,
+                                 atoms_stereo, allenes_stereo, xy, degrees, neighbors, orders, cis_trans,
+                                 cis_trans_marks, conformers, name, packed_meta if meta is None else meta)
+
+    @classmethod
+    def _from_columns(cls, numbers, atomic_numbers, isotopes, charges, radicals, hydrogens, parsed_mapping,
+                      atoms_stereo, allenes_stereo, xy, degrees, neighbors, orders, cis_trans, cis_trans_marks,
+                      conformers, name, meta) -> 'MoleculeContainer':
+        """
+        Build molecule from sequences of integers and floats in `_to_columns` order.
+        Arrays and memoryviews supported.
+        """
+        atoms_count = len(numbers)
+        bonds_count = len(neighbors)
+        conformers_count = len(conformers) // (atoms_count * 3) if atoms_count else 0
+        elements = {a: Element.from_atomic_number(a) for a in set(atomic_numbers)}
+        atoms = {n: elements[a](i or None) for n, a, i in zip(numbers, atomic_numbers, isotopes)}
+        if sum(degrees) != bonds_count:
+            raise ValueError('invalid adjacency')
+        adj = {}
+        bonds = zip(neighbors, orders)
+        for n, d in zip(numbers, degrees):
+            adj[n] = bn = {}
+            for m, order in islice(bonds, d):
+                if m in adj:
+                    bn[m] = adj[m][n]
+                else:
+                    bn[m] = Bond(order)
+
+        xy = iter(xy)
+        conformers = iter(conformers)
+        conformers = [dict(zip(numbers, zip(conformers, conformers, conformers))) for _ in range(conformers_count)]
+        state = {'atoms': atoms, 'bonds': adj, 'name': name, 'meta': meta, 'plane': dict(zip(numbers, zip(xy, xy))),
+                 'charges': dict(zip(numbers, charges)),
+                 'radicals': dict(zip(numbers, map(bool, radicals))),
+                 'hydrogens': {n: None if h == -1 else h for n, h in zip(numbers, hydrogens)},
+                 'parsed_mapping': {n: m for n, m in zip(numbers, parsed_mapping) if m != -1},
+                 'atoms_stereo': {n: bool(s) for n, s in zip(numbers, atoms_stereo) if s != -1},
+                 'allenes_stereo': {n: bool(s) for n, s in zip(numbers, allenes_stereo) if s != -1},
+                 'cis_trans_stereo': {(cis_trans[2 * i], cis_trans[2 * i + 1]): bool(s)
+                                      for i, s in enumerate(cis_trans_marks)},
+                 'conformers': conformers}
+        molecule = object.__new__(cls)
+        molecule.__setstate__(state)
+        return molecule
+
+    def __reduce__(self):
+        # meta pickled as is. it can contain not JSON serializable data.
+        return self._from_bytes, (self._to_bytes(None), self.meta)
+
     def __getstate__(self):
         return {'conformers': self._conformers, 'hydrogens': self._hydrogens, 'atoms_stereo': self._atoms_stereo,
                 'allenes_stereo': self._allenes_stereo, 'cis_trans_stereo': self._cis_trans_stereo,
@@ -595,6 +977,7 @@ class MoleculeContainer(MoleculeStereo, Graph, Aromatize, Standardize, MoleculeS
             state['cis_trans_stereo'] = {}
 
         super().__setstate__(state)
+        self._batch = None
         self._conformers = state['conformers']
         self._atoms_stereo = state['atoms_stereo']
         self._allenes_stereo = state['allenes_stereo']
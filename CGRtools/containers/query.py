@@ -17,7 +17,7 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from typing import List, Tuple, Union, Dict
-from . import cgr, molecule  # cyclic imports resolve
+from . import cgr, frozen, molecule  # cyclic imports resolve
 from .bonds import Bond
 from .common import Graph
 from ..algorithms.calculate2d import Calculate2DMolecule
@@ -255,10 +255,11 @@ class QueryContainer(QueryStereo, Graph, QuerySmiles, StructureComponents, Depic
         else:
             raise TypeError('Graph expected')
 
-    def get_mapping(self, other: Union['QueryContainer', 'molecule.MoleculeContainer'], **kwargs):
-        if isinstance(other, (QueryContainer, molecule.MoleculeContainer)):
+    def get_mapping(self, other: Union['QueryContainer', 'molecule.MoleculeContainer',
+                                       'frozen.FrozenMoleculeContainer'], **kwargs):
+        if isinstance(other, (QueryContainer, molecule.MoleculeContainer, frozen.FrozenMoleculeContainer)):
             return super().get_mapping(other, **kwargs)
-        raise TypeError('MoleculeContainer or QueryContainer expected')
+        raise TypeError('MoleculeContainer, FrozenMoleculeContainer or QueryContainer expected')
 
     def get_mcs_mapping(self, other: Union['QueryContainer', 'molecule.MoleculeContainer'], **kwargs):
         if isinstance(other, (QueryContainer, molecule.MoleculeContainer)):
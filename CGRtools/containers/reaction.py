@@ -18,12 +18,14 @@
 #
 from CachedMethods import cached_method
 from collections.abc import Iterable
+from copyreg import __newobj__
 from functools import reduce
 from hashlib import sha512
 from itertools import chain
 from operator import or_
+from struct import Struct
 from typing import Dict, Iterable as TIterable, Iterator, Optional, Tuple, Union
-from .cgr import CGRContainer
+from .cgr import CGRContainer, pack_magic as cgr_pack_magic
 from .cgr_query import QueryCGRContainer
 from .molecule import MoleculeContainer
 from .query import QueryContainer
@@ -33,6 +35,10 @@ from ..algorithms.standardize import StandardizeReaction
 
 
 graphs = Union[MoleculeContainer, QueryContainer, CGRContainer, QueryCGRContainer]
+pack_header = Struct('<4sBHHH')  # magic, version, reactants, reagents, products count
+pack_length = Struct('<I')
+pack_magic = b'CGRR'
+pack_version = 1
 
 
 class ReactionContainer(StandardizeReaction, ReactionComponents, DepictReaction):
@@ -116,6 +122,73 @@ class ReactionContainer(StandardizeReaction, ReactionComponents, DepictReaction)
             return self.__name
         raise KeyError('invalid attribute')
 
+    def to_bytes(self) -> bytes:
+        """
+        Pack reaction of molecules or CGRs into compact versioned binary string.
+        Meta of reaction and molecules should be JSON serializable.
+        """
+        return self._to_bytes(True)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> 'ReactionContainer':
+        """
+        Unpack reaction from binary string created by `to_bytes`.
+        """
+        return cls._from_bytes(data)
+
+    def _to_bytes(self, meta: bool) -> bytes:
+        if not isinstance(next(self.molecules()), (MoleculeContainer, CGRContainer)):
+            raise TypeError('only reactions of MoleculeContainer or CGRContainer supported')
+        data = [pack_header.pack(pack_magic, pack_version, len(self.__reactants), len(self.__reagents),
+                                 len(self.__products))]
+        for m in self.molecules():
+            m = m._to_bytes(m.meta if meta else None)
+            data.append(pack_length.pack(len(m)))
+            data.append(m)
+        data.append(MoleculeContainer._pack_meta(self.__name, self.__meta if meta else None))
+        return b''.join(data)
+
+    @classmethod
+    def _from_bytes(cls, data, meta=None, molecules_meta=None) -> 'ReactionContainer':
+        data = memoryview(data)
+        if len(data) < pack_header.size:
+            raise ValueError('truncated data')
+        magic, version, *counts = pack_header.unpack_from(data)
+        if magic != pack_magic:
+            raise ValueError('ReactionContainer binary data expected')
+        if version != pack_version:
+            raise ValueError(f'unsupported binary format version: {version}')
+
+        offset = pack_header.size
+        molecules = []
+        for i in range(sum(counts)):
+            if offset + pack_length.size > len(data):
+                raise ValueError('truncated data')
+            end = offset + pack_length.size + pack_length.unpack_from(data, offset)[0]
+            blob = data[offset + pack_length.size:end]
+            if blob[:4] == cgr_pack_magic:
+                m = CGRContainer._from_bytes(blob, molecules_meta and molecules_meta[i])
+            else:
+                m = MoleculeContainer._from_bytes(blob, molecules_meta and molecules_meta[i])
+            molecules.append(m)
+            offset = end
+        name, packed_meta, offset = MoleculeContainer._unpack_meta(data, offset)
+        if offset != len(data):
+            raise ValueError('unexpected data after end of reaction')
+
+        r, m, _ = counts
+        reaction = object.__new__(cls)
+        reaction.__setstate__({'reactants': tuple(molecules[:r]), 'reagents': tuple(molecules[r:r + m]),
+                               'products': tuple(molecules[r + m:]), 'name': name,
+                               'meta': packed_meta if meta is None else meta})
+        return reaction
+
+    def __reduce__(self):
+        if isinstance(next(self.molecules()), (MoleculeContainer, CGRContainer)):
+            # meta pickled as is. it can contain not JSON serializable data.
+            return self._from_bytes, (self._to_bytes(False), self.__meta, tuple(m.meta for m in self.molecules()))
+        return __newobj__, (self.__class__,), self.__getstate__()  # queries pickled by state
+
     def __getstate__(self):
         return dict(reactants=self.__reactants, products=self.__products, reagents=self.__reagents, meta=self.__meta,
                     name=self.__name)
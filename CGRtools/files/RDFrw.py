@@ -17,12 +17,12 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from array import array
 from bisect import bisect_left
 from collections import defaultdict
 from itertools import chain
 from logging import warning
-from os.path import getsize
-from subprocess import check_output
+from re import compile, MULTILINE
 from time import strftime
 from traceback import format_exc
 from warnings import warn
@@ -32,6 +32,9 @@ from ..containers import ReactionContainer, MoleculeContainer
 from ..containers.common import Graph
 
 
+delimiter = compile(rb'^\$[RM]FMT', MULTILINE)
+
+
 class RDFRead(MDLRead):
     """
     MDL RDF files reader. works similar to opened file object. support `with` context manager.
@@ -41,11 +44,18 @@ class RDFRead(MDLRead):
     def __init__(self, file, indexable=False, **kwargs):
         """
         :param indexable: if True: supported methods seek, tell, object size and subscription, it only works when
-            dealing with a real file (the path to the file is specified) because the external grep utility is used,
-            supporting in unix-like OS the object behaves like a normal open file.
+            dealing with a real file (the path to the file is specified) or seekable buffer. Index of records of real
+            file stored in sidecar file and reused on next opening of unchanged file.
 
             if False: works like generator converting a record into ReactionContainer and returning each object in
             order, records with errors are skipped
+        :param cache_dir: directory for records index files. By default index stored next to the original file or
+            in temporary directory if original file directory is not writable.
+        :param fields: metadata keys to keep. By default all metadata stored.
+        :param structure: if False: connection tables not parsed. MetaRecord(title, meta, atoms_count) returned instead
+            of containers. atoms_count available only for V2000 molecules.
+        :param predicate: callable accepting MetaRecord(title, meta, atoms_count) called before structure conversion.
+            Records for which predicate returns False skipped. Should be picklable for parallel parsing.
         :param ignore: Skip some checks of data or try to fix some errors.
         :param remap: Remap atom numbers started from one.
         :param store_log: Store parser log if exists messages to `.meta` by key `CGRtoolsParserLog`.
@@ -62,11 +72,10 @@ class RDFRead(MDLRead):
         else:
             next(self._data)
 
-    @staticmethod
-    def _get_shifts(file):
-        shifts = [int(x.split(b':', 1)[0]) for x in
-                  check_output(['grep', '-boE', r'^\$[RM]FMT', file]).split()]
-        shifts.append(getsize(file))
+    @classmethod
+    def _get_shifts(cls, file):
+        shifts = array('Q', (start for start, _ in cls._scan_file(file, delimiter)))
+        shifts.append(file.tell())  # end of file
         return shifts
 
     def seek(self, offset):
@@ -106,20 +115,17 @@ class RDFRead(MDLRead):
         """
         if self._shifts:
             t = self._file.tell()
-            if t == self._shifts[0]:
-                return 0
-            elif t == self._shifts[-1]:
-                return len(self._shifts) - 1
-            elif t in self._shifts:
-                return bisect_left(self._shifts, t)
-            else:
-                return bisect_left(self._shifts, t) - 1
+            i = bisect_left(self._shifts, t)
+            if i < len(self._shifts) and self._shifts[i] == t:
+                return i
+            return i - 1
         raise self._implement_error
 
     def __reader(self):
         record = parser = mkey = pos = None
         failed = False
         file = self._file
+        fields = self._fields
         seekable = file.seekable()
 
         if next(self.__file).startswith('$RXN'):  # parse RXN file
@@ -168,15 +174,12 @@ class RDFRead(MDLRead):
                     if title:
                         record['title'] = title
                     try:
-                        if is_reaction:
-                            container = self._convert_reaction(record)
-                        else:
-                            container = self._convert_structure(record)
+                        container = self._convert_record(record, is_reaction)
                     except ValueError:
                         self._info(f'record consist errors:\n{format_exc()}')
                         seek = yield parse_error(count, pos, self._format_log(), record['meta'])
                     else:
-                        if self._store_log:
+                        if self._store_log and container is not None:
                             log = self._format_log()
                             if log:
                                 container.meta['CGRtoolsParserLog'] = log
@@ -204,15 +207,12 @@ class RDFRead(MDLRead):
                     if title:
                         record['title'] = title
                     try:
-                        if is_reaction:
-                            container = self._convert_reaction(record)
-                        else:
-                            container = self._convert_structure(record)
+                        container = self._convert_record(record, is_reaction)
                     except ValueError:
                         self._info(f'record consist errors:\n{format_exc()}')
                         seek = yield parse_error(count, pos, self._format_log(), record['meta'])
                     else:
-                        if self._store_log:
+                        if self._store_log and container is not None:
                             log = self._format_log()
                             if log:
                                 container.meta['CGRtoolsParserLog'] = log
@@ -238,6 +238,8 @@ class RDFRead(MDLRead):
                     mkey = line[7:].strip()
                     if not mkey:
                         self._info(f'invalid metadata entry: {line}')
+                    elif fields is not None and mkey not in fields:
+                        mkey = None
                 elif mkey:
                     data = line.lstrip("$DATUM").strip()
                     if data:
@@ -248,7 +250,9 @@ class RDFRead(MDLRead):
                 ir -= 1
             else:
                 try:
-                    if is_reaction:
+                    if not self._structure:  # connection table skipped
+                        record = {'atoms_count': int(line[0:3]) if not is_reaction and 'V2000' in line else None}
+                    elif is_reaction:
                         if line.startswith('M  V30 COUNTS'):
                             parser = ERXNRead(line, self._ignore, self._log_buffer)
                         else:
@@ -274,23 +278,21 @@ class RDFRead(MDLRead):
             if title:
                 record['title'] = title
             try:
-                if is_reaction:
-                    container = self._convert_reaction(record)
-                else:
-                    container = self._convert_structure(record)
+                container = self._convert_record(record, is_reaction)
             except ValueError:
                 self._info(f'record consist errors:\n{format_exc()}')
                 log = self._format_log()
                 self._flush_log()
                 yield parse_error(count, pos, log, record['meta'])
             else:
-                if self._store_log:
+                if self._store_log and container is not None:
                     log = self._format_log()
                     if log:
                         container.meta['CGRtoolsParserLog'] = log
                 self._flush_log()
                 yield container
 
+    _chunk_header = '$RDFILE 1\n$DATM\n'
     __already_seeked = False
 
 
@@ -16,12 +16,14 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from array import array
 from bisect import bisect_left
 from collections import defaultdict
-from io import BytesIO
+from io import BufferedReader
 from logging import warning
-from re import match, compile
-from subprocess import check_output
+from mmap import mmap, ACCESS_READ
+from os import fstat
+from re import match, compile, MULTILINE
 from traceback import format_exc
 from warnings import warn
 from ._mdl import parse_error
@@ -30,6 +32,8 @@ from ..exceptions import EmptyMolecule
 
 
 head = compile(r'>\s.*<(.*)>')
+bytes_head = compile(rb'>\s.*<(.*)>')
+delimiter = compile(rb'^\$\$\$\$.*\n?', MULTILINE)
 
 
 class SDFRead(MDLRead):
@@ -41,11 +45,18 @@ class SDFRead(MDLRead):
     def __init__(self, file, indexable=False, **kwargs):
         """
         :param indexable: if True: supported methods seek, tell, object size and subscription, it only works when
-            dealing with a real file (the path to the file is specified) because the external grep utility is used,
-            supporting in unix-like OS the object behaves like a normal open file.
+            dealing with a real file (the path to the file is specified) or seekable buffer. Index of records of real
+            file stored in sidecar file and reused on next opening of unchanged file.
 
             if False: works like generator converting a record into MoleculeContainer and returning each object in
             order, records with errors are skipped
+        :param cache_dir: directory for records index files. By default index stored next to the original file or
+            in temporary directory if original file directory is not writable.
+        :param fields: metadata keys to keep. By default all metadata stored.
+        :param structure: if False: connection table not parsed. MetaRecord(title, meta, atoms_count) returned instead
+            of containers. atoms_count available only for V2000 records.
+        :param predicate: callable accepting MetaRecord(title, meta, atoms_count) called before structure conversion.
+            Records for which predicate returns False skipped. Should be picklable for parallel parsing.
         :param ignore: Skip some checks of data or try to fix some errors.
         :param remap: Remap atom numbers started from one.
         :param store_log: Store parser log if exists messages to `.meta` by key `CGRtoolsParserLog`.
@@ -60,12 +71,10 @@ class SDFRead(MDLRead):
         if indexable:
             self._load_cache()
 
-    @staticmethod
-    def _get_shifts(file):
-        shifts = [0]
-        for x in BytesIO(check_output(['grep', '-bE', r'\$\$\$\$', file])):
-            pos, line = x.split(b':', 1)
-            shifts.append(int(pos) + len(line))
+    @classmethod
+    def _get_shifts(cls, file):
+        shifts = array('Q', [0])
+        shifts.extend(end for _, end in cls._scan_file(file, delimiter))
         return shifts
 
     def seek(self, offset):
@@ -112,6 +121,7 @@ class SDFRead(MDLRead):
         mkey = parser = record = None
         meta = defaultdict(list)
         file = self._file
+        fields = self._fields
         seekable = file.seekable()
         seek = yield  # init stop
         if seek is not None:
@@ -151,12 +161,12 @@ class SDFRead(MDLRead):
                     if title:
                         record['title'] = title
                     try:
-                        container = self._convert_structure(record)
+                        container = self._convert_record(record)
                     except ValueError:
                         self._info(f'record consist errors:\n{format_exc()}')
                         seek = yield parse_error(count, pos, self._format_log(), record['meta'])
                     else:
-                        if self._store_log:
+                        if self._store_log and container is not None:
                             log = self._format_log()
                             if log:
                                 container.meta['CGRtoolsParserLog'] = log
@@ -181,6 +191,8 @@ class SDFRead(MDLRead):
                     mkey = head_line.group(1).strip()
                     if not mkey:
                         self._info(f'invalid metadata entry: {line}')
+                    elif fields is not None and mkey not in fields:
+                        mkey = None
                 elif mkey:
                     data = line.strip()
                     if data:
@@ -191,7 +203,9 @@ class SDFRead(MDLRead):
                 im -= 1
             elif not im:
                 try:
-                    if 'V2000' in line:
+                    if not self._structure:  # connection table skipped
+                        record = {'atoms_count': int(line[0:3]) if 'V2000' in line else None}
+                    elif 'V2000' in line:
                         try:
                             parser = MOLRead(line, self._log_buffer)
                         except EmptyMolecule:
@@ -224,14 +238,14 @@ class SDFRead(MDLRead):
             if title:
                 record['title'] = title
             try:
-                container = self._convert_structure(record)
+                container = self._convert_record(record)
             except ValueError:
                 self._info(f'record consist errors:\n{format_exc()}')
                 log = self._format_log()
                 self._flush_log()
                 yield parse_error(count, pos, log, record['meta'])
             else:
-                if self._store_log:
+                if self._store_log and container is not None:
                     log = self._format_log()
                     if log:
                         container.meta['CGRtoolsParserLog'] = log
@@ -241,6 +255,191 @@ class SDFRead(MDLRead):
     __already_seeked = False
 
 
+class MMapSDFRead(MDLRead):
+    """
+    MDL SDF files reader working on memory-mapped file. Records delimiters and V2000 connection tables parsed from raw
+    bytes without lines decoding. V3000 and CGR or Query records parsed by regular text parsers.
+    Works similar to opened file object. support `with` context manager.
+    on initialization accept opened in binary mode file, string path to file or pathlib.Path object.
+    """
+    def __init__(self, file, indexable=False, *, encoding: str = 'utf-8', **kwargs):
+        """
+        :param indexable: if True: supported methods seek, tell, object size and subscription.
+        :param encoding: encoding of titles and metadata.
+        :param cache_dir: directory for records index files. By default index stored next to the original file or
+            in temporary directory if original file directory is not writable.
+        :param fields: metadata keys to keep. By default all metadata stored.
+        :param structure: if False: connection table not parsed. MetaRecord(title, meta, atoms_count) returned instead
+            of containers. atoms_count available only for V2000 records.
+        :param predicate: callable accepting MetaRecord(title, meta, atoms_count) called before structure conversion.
+            Records for which predicate returns False skipped. Should be picklable for parallel parsing.
+        :param ignore: Skip some checks of data or try to fix some errors.
+        :param remap: Remap atom numbers started from one.
+        :param store_log: Store parser log if exists messages to `.meta` by key `CGRtoolsParserLog`.
+        :param calc_cis_trans: Calculate cis/trans marks from 2d coordinates.
+        :param ignore_stereo: Ignore stereo data.
+        """
+        super().__init__(file, **kwargs)
+        self.__encoding = encoding
+        if fstat(self._file.fileno()).st_size:
+            self.__map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        else:  # empty file can't be mapped
+            self.__map = b''
+        self._data = self.__reader()
+
+        if indexable:
+            self._load_cache()
+
+    _get_shifts = SDFRead._get_shifts
+
+    def close(self, force=False):
+        """
+        Close opened file
+
+        :param force: force closing of externally opened file or buffer
+        """
+        if self.__map:
+            self.__map.close()
+            self.__map = b''
+        super().close(force)
+
+    def seek(self, offset):
+        """
+        shifts on a given number of record in the original file
+        :param offset: number of record
+        """
+        if self._shifts:
+            if 0 <= offset < len(self._shifts):
+                self.__position = self._shifts[offset]
+                self._data = self.__reader(self.__position, offset)
+            else:
+                raise IndexError('invalid offset')
+        else:
+            raise self._implement_error
+
+    def tell(self):
+        """
+        :return: number of records processed from the original file
+        """
+        if self._shifts:
+            return bisect_left(self._shifts, self.__position)
+        raise self._implement_error
+
+    def read_text(self, item):
+        """
+        Read record block as text
+        """
+        return super().read_text(item).decode(self.__encoding)
+
+    @classmethod
+    def _parse_range(cls, start, end, file, encoding, kwargs):
+        with cls(file, encoding=encoding, **kwargs) as f:
+            return [x for x in f.__reader(start, 0, end) if x is not None and not isinstance(x, parse_error)]
+
+    @property
+    def _encoding(self):
+        return self.__encoding
+
+    def __reader(self, position=0, count=0, stop=None):
+        data = self.__map
+        if stop is None:
+            stop = len(data)
+        while position < stop:
+            end = delimiter.search(data, position, stop)
+            if end:
+                self.__position = end.end()
+                lines = data[position:end.start()].splitlines()
+            else:  # MOL file or last record without delimiter
+                self.__position = stop
+                lines = data[position:stop].splitlines()
+                if not any(lines):
+                    break
+            yield self.__parse(lines, count, position)
+            position = self.__position
+            count += 1
+
+    def __parse(self, lines, count, position):
+        try:
+            if len(lines) < 4:
+                raise ValueError('invalid MOL entry')
+            line = lines[3]
+            if not self._structure:  # connection table skipped
+                parsed = {'atoms_count': int(line[0:3]) if b'V2000' in line else None}, \
+                         next((n for n, x in enumerate(lines) if x.startswith(b'M  END')), 3)
+            elif b'V2000' in line:
+                try:
+                    parsed = MOLRead.parse_bytes(lines, 3, self._log_buffer)
+                except EmptyMolecule:
+                    if not self._ignore:
+                        raise
+                    self._info(f'line:\n{line.decode(self.__encoding)}\nconsist errors:\n'
+                               'empty atoms list. try to parse as V3000')
+                    parsed = None
+                if parsed is None:  # CGR, Query or V3000 in V2000 header
+                    parsed = self.__parse_text(lines)
+            elif b'V3000' in line:
+                parsed = self.__parse_text(lines)
+            else:
+                raise ValueError('invalid MOL entry')
+        except ValueError:
+            self._info(f'record consist errors:\n{format_exc()}')
+            log = self._format_log()
+            self._flush_log()
+            return parse_error(count, position, log, {})
+
+        record, end = parsed
+        encoding = self.__encoding
+        fields = self._fields
+        meta = defaultdict(list)
+        mkey = None
+        for line in lines[end + 1:]:
+            head_line = match(bytes_head, line)
+            if head_line:
+                mkey = head_line.group(1).strip().decode(encoding)
+                if not mkey:
+                    self._info(f'invalid metadata entry: {line.decode(encoding)}')
+                elif fields is not None and mkey not in fields:
+                    mkey = None
+            elif mkey:
+                data = line.strip()
+                if data:
+                    meta[mkey].append(data.decode(encoding))
+        record['meta'] = self._prepare_meta(meta)
+        title = lines[0].strip().decode(encoding)
+        if title:
+            record['title'] = title
+
+        try:
+            container = self._convert_record(record)
+        except ValueError:
+            self._info(f'record consist errors:\n{format_exc()}')
+            log = self._format_log()
+            self._flush_log()
+            return parse_error(count, position, log, record['meta'])
+        if self._store_log and container is not None:
+            log = self._format_log()
+            if log:
+                container.meta['CGRtoolsParserLog'] = log
+        self._flush_log()
+        return container
+
+    def __parse_text(self, lines):
+        encoding = self.__encoding
+        line = lines[3].decode(encoding)
+        if 'V2000' in line and not line.startswith('  0'):
+            parser = MOLRead(line, self._log_buffer)
+        else:
+            parser = EMOLRead(self._log_buffer)
+        for end in range(4, len(lines)):
+            if parser(lines[end].decode(encoding) + '\n'):
+                return parser.getvalue(), end
+        raise ValueError('molecule not complete')
+
+    _file_mode = 'rb'
+    _buffer_types = (BufferedReader,)
+    __position = 0
+
+
 class SDFWrite(MDLWrite):
     """
     MDL SDF files writer. works similar to opened for writing file object. support `with` context manager.
@@ -329,4 +528,4 @@ class SDFwrite:
         return self.__obj.__exit__(_type, value, traceback)
 
 
-__all__ = ['SDFRead', 'SDFWrite', 'ESDFWrite', 'SDFread', 'SDFwrite']
+__all__ = ['SDFRead', 'MMapSDFRead', 'SDFWrite', 'ESDFWrite', 'SDFread', 'SDFwrite']
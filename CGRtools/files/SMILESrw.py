@@ -17,14 +17,17 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from collections import defaultdict
-from itertools import permutations
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count, islice, permutations
 from io import StringIO, TextIOWrapper
 from logging import warning
+from os import cpu_count
 from pathlib import Path
 from re import split, compile, fullmatch
 from traceback import format_exc
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Iterable, Iterator, Optional
 from warnings import warn
 from ._mdl import CGRRead, parse_error
 from ..containers import MoleculeContainer, CGRContainer, ReactionContainer
@@ -65,6 +68,11 @@ dyn_radical_dict = {'*': (True,), '*>^': (True, ('radical', None)), '^>*': (Fals
 atom_re = compile(r'([1-9][0-9]{0,2})?([A-IK-PR-Zacnopsb][a-ik-pr-vy]?)(@@|@)?(H[1-4]?)?([+-][1-4+-]?)?(:[0-9]{1,4})?')
 dyn_atom_re = compile(r'([1-9][0-9]{0,2})?([A-IK-PR-Z][a-ik-pr-vy]?)([+-0][1-4+-]?(>[+-0][1-4+-]?)?)?([*^](>[*^])?)?')
 delimiter = compile(r'[=:]')
+token_re = compile(r'\[[^\[\]()]+]|Cl|Br|%[1-9][0-9]*|[NOPSFICBcnopsb=#:~\-\\/.()1-9]')
+organic_tokens = {**{x: (0, x) for x in ('N', 'O', 'P', 'S', 'F', 'I', 'C', 'B', 'Cl', 'Br')},
+                  **{x: (8, x.upper()) for x in 'cnopsb'}}
+simple_tokens = {**{x: (1, replace_dict[x]) for x in '=#:~-'}, **{str(x): (6, x) for x in range(1, 10)},
+                 '(': (2, None), ')': (3, None), '.': (4, None), '/': (9, True), '\\': (9, False)}
 
 
 class SMILESRead(CGRRead):
@@ -146,6 +154,71 @@ class SMILESRead(CGRRead):
         super(SMILESRead, obj).__init__(*args, **kwargs)
         return obj.parse
 
+    @classmethod
+    def parse_many(cls, smiles: Iterable[str], workers: Optional[int] = None, *, chunksize: int = 1000,
+                   prefetch: int = 2, **kwargs) -> List[Union[MoleculeContainer, CGRContainer, ReactionContainer,
+                                                              parse_error]]:
+        """
+        Parse SMILES strings in worker processes.
+
+        :param smiles: SMILES strings optionally followed by metadata.
+        :param workers: number of processes. By default equal to number of CPUs. If 1 parsing done in current process.
+        :param chunksize: number of strings parsed in worker per task.
+        :param prefetch: number of tasks queued per worker. Limits memory usage.
+        :param kwargs: parser options: header, ignore, remap, store_log, ignore_stereo.
+        :return: list of containers or ParseError(number, None, log, meta) in input order.
+        """
+        return list(cls.imap(smiles, workers, chunksize=chunksize, prefetch=prefetch, **kwargs))
+
+    @classmethod
+    def imap(cls, smiles: Iterable[str], workers: Optional[int] = None, *, chunksize: int = 1000,
+             prefetch: int = 2, **kwargs) -> Iterator[Union[MoleculeContainer, CGRContainer, ReactionContainer,
+                                                            parse_error]]:
+        """
+        Lazy version of `parse_many`. Strings consumed from iterable by chunks on demand.
+        """
+        header = kwargs.get('header')
+        if header and (not isinstance(header, (list, tuple)) or not all(isinstance(x, str) for x in header)):
+            raise TypeError('expected list (tuple) of strings')
+        smiles = iter(smiles)
+        chunks = iter(lambda: list(islice(smiles, chunksize)), [])
+        if workers is None:
+            workers = cpu_count() or 1
+        if workers == 1:
+            for n, chunk in zip(count(0, chunksize), chunks):
+                yield from cls._parse_chunk(n, chunk, kwargs)
+            return
+
+        limit = workers * prefetch
+        with ProcessPoolExecutor(workers) as executor:
+            queue = deque()
+            for n, chunk in zip(count(0, chunksize), chunks):
+                if len(queue) == limit:
+                    yield from queue.popleft().result()
+                queue.append(executor.submit(cls._parse_chunk, n, chunk, kwargs))
+            while queue:
+                yield from queue.popleft().result()
+
+    @classmethod
+    def _parse_chunk(cls, start, smiles, kwargs):
+        """
+        Parse list of SMILES. Used in worker processes.
+        """
+        kwargs = kwargs.copy()
+        obj = object.__new__(cls)
+        obj._SMILESRead__header = kwargs.pop('header', None) or None
+        obj._SMILESRead__ignore_stereo = kwargs.pop('ignore_stereo', False)
+        super(SMILESRead, obj).__init__(**kwargs)
+
+        out = []
+        for n, x in enumerate(smiles, start):
+            x = obj.parse(x)
+            if isinstance(x, dict):
+                out.append(parse_error(n, None, obj._format_log(), x))
+            else:
+                out.append(x)
+        return out
+
     def close(self, force=False):
         """
         Close opened file.
@@ -353,145 +426,60 @@ class SMILESRead(CGRRead):
             break
         return mol
 
-    @staticmethod
-    def _raw_tokenize(smiles):
-        token_type = token = None
+    @classmethod
+    def _tokenize(cls, smiles):
+        """
+        Single pass tokenizer. Split SMILES by compiled regex and convert tokens to parser format.
+        """
+        raw = token_re.findall(smiles)
+        if sum(len(x) for x in raw) != len(smiles):  # unmatched symbols found
+            raise IncorrectSmiles('invalid smiles')
+
         tokens = []
-        for s in smiles:
-            if s == '[':  # open complex token
-                if token_type == 5:  # two opened [
-                    raise IncorrectSmiles('[...[')
-                elif token:
-                    tokens.append((token_type, token))
-                elif token_type == 7:  # empty closure
-                    raise IncorrectSmiles('invalid closure')
-                token = []
-                token_type = 5
-            elif s == ']':  # close complex token
-                if token_type != 5:
-                    raise IncorrectSmiles(']..]')
-                elif not token:
-                    raise IncorrectSmiles('empty [] brackets')
-                tokens.append((5, ''.join(token)))
-                token_type = token = None
-            elif s in '()':
-                if token_type == 5:
-                    raise IncorrectSmiles('brackets in atom/bond token')
-                elif token:
-                    tokens.append((token_type, token))
-                    token = None
-                elif token_type == 7:  # empty closure
-                    raise IncorrectSmiles('invalid closure')
-                elif token_type == 2:  # barely opened
+        parse = cls._parse_bracket
+        organic = organic_tokens.get
+        simple = simple_tokens.get
+        previous = None
+        for token in raw:
+            x = organic(token)
+            if x is not None:
+                previous, token = x
+                tokens.append((previous, {'element': token, 'charge': 0, 'isotope': None, 'is_radical': False,
+                                          'mapping': 0, 'x': 0., 'y': 0., 'z': 0., 'hydrogen': None, 'stereo': None}))
+                continue
+            x = simple(token)
+            if x is not None:
+                if previous == 2 and x[0] in (2, 3):  # barely opened
                     raise IncorrectSmiles('(( or ()')
-                token_type = replace_dict[s]
-                tokens.append((token_type, None))
-            elif token_type == 5:  # grow token with brackets. skip validation
-                token.append(s)
-            elif s.isnumeric():  # closures
-                if token_type == 7:  # % already found. collect number
-                    if not token and s == '0':
-                        raise IncorrectSmiles('number starts with 0')
-                    token.append(s)
-                else:
-                    if s == '0':
-                        raise IncorrectSmiles('number starts with 0')
-                    elif token:
-                        tokens.append((token_type, token))
-                        token = None
-                    token_type = 6
-                    tokens.append((6, int(s)))
-            elif s == '%':
-                if token:
-                    tokens.append((token_type, token))
-                elif token_type == 7:
-                    raise IncorrectSmiles('%%')
-                token_type = 7
-                token = []
-            elif s in '=#:-~':  # bonds found
-                if token:
-                    tokens.append((token_type, token))
-                    token = None
-                token_type = 1
-                tokens.append((1, replace_dict[s]))
-            elif s in r'\/':
-                if token:
-                    tokens.append((token_type, token))
-                    token = None
-                token_type = 9
-                tokens.append((9, s == '/'))  # Up is true
-            elif s == '.':
-                if token:
-                    tokens.append((token_type, token))
-                    token = None
-                token_type = 4
-                tokens.append((4, None))
-            elif s in 'NOPSFI':  # organic atoms
-                if token:
-                    tokens.append((token_type, token))
-                    token = None
-                token_type = 0
-                tokens.append((0, s))
-            elif s in 'cnopsb':  # aromatic ring atom
-                if token:
-                    tokens.append((token_type, token))
-                    token = None
-                token_type = 8
-                tokens.append((8, s.upper()))
-            elif s in 'CB':  # flag possible Cl or Br
-                if token:
-                    tokens.append((token_type, token))
-                token_type = 0
-                token = s
-            elif token_type == 0:
-                if s == 'l':
-                    if token == 'C':
-                        tokens.append((0, 'Cl'))
-                        token = None
-                    else:
-                        raise IncorrectSmiles('invalid element Bl')
-                elif s == 'r':
-                    if token == 'B':
-                        tokens.append((0, 'Br'))
-                        token = None
-                    else:
-                        raise IncorrectSmiles('invalid smiles for Cr')
-                else:
-                    raise IncorrectSmiles('invalid smiles')
-            else:
-                raise IncorrectSmiles('invalid smiles')
-
-        if token_type == 5:
-            raise IncorrectSmiles('atom description has not finished')
-        elif token_type == 2:
+            elif token[0] == '[':
+                x = parse(token[1:-1])
+                if x[0] != 10:  # atoms dicts mutable
+                    x = (x[0], x[1].copy())
+            else:  # composite closure
+                x = (6, int(token[1:]))
+            tokens.append(x)
+            previous = x[0]
+
+        if previous == 2:
             raise IncorrectSmiles('not closed')
-        elif token:
-            tokens.append((token_type, token))  # %closure or C or B
-        return [(6, int(''.join(x[1]))) if x[0] == 7 else x for x in tokens]  # composite closures folding
+        return tokens
 
     @classmethod
-    def _fix_tokens(cls, tokens):
-        out = []
-        for token_type, token in tokens:
-            if token_type in (0, 8):  # simple atom
-                out.append((token_type, {'element': token, 'charge': 0, 'isotope': None, 'is_radical': False,
-                                         'mapping': 0, 'x': 0., 'y': 0., 'z': 0., 'hydrogen': None, 'stereo': None}))
-            elif token_type == 5:
-                if '>' in token:  # dynamic bond or atom
-                    if len(token) == 3:  # bond only possible
-                        try:
-                            out.append((10, dynamic_bonds[token]))
-                        except KeyError:
-                            raise IncorrectSmiles(f'invalid dynamic bond token {{{token}}}')
-                    else:  # dynamic atom token
-                        out.append((11, cls.__dynatom_parse(token)))
-                elif '*' in token:  # CGR atom radical mark
-                    out.append((11, cls.__dynatom_parse(token)))
-                else:  # atom token
-                    out.append(cls.__atom_parse(token))
-            else:  # as is types: 1, 2, 3, 4, 6, 9
-                out.append((token_type, token))
-        return out
+    @lru_cache(maxsize=4096)
+    def _parse_bracket(cls, token):
+        """
+        Parse in bracket token. Parsed atoms shared between calls and should be copied.
+        """
+        if '>' in token:  # dynamic bond or atom
+            if len(token) == 3:  # bond only possible
+                try:
+                    return 10, dynamic_bonds[token]
+                except KeyError:
+                    raise IncorrectSmiles(f'invalid dynamic bond token {{{token}}}')
+            return 11, cls.__dynatom_parse(token)  # dynamic atom token
+        elif '*' in token:  # CGR atom radical mark
+            return 11, cls.__dynatom_parse(token)
+        return cls.__atom_parse(token)  # atom token
 
     @staticmethod
     def __atom_parse(token):
@@ -573,9 +561,7 @@ class SMILESRead(CGRRead):
                 'mapping': 0, 'x': 0., 'y': 0., 'z': 0., 'cgr': cgr}
 
     def __parse_tokens(self, smiles):
-        tokens = self._raw_tokenize(smiles)
-        tokens = self._fix_tokens(tokens)
-        return self._parse_tokens(tokens)
+        return self._parse_tokens(self._tokenize(smiles))
 
     def _parse_tokens(self, tokens):
         strong_cycle = not self._ignore
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2020 Ramil Nugmanov <nougmanoff@protonmail.com>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from array import array
+from json import dumps, loads
+from mmap import mmap, ACCESS_READ
+from os import replace
+from pathlib import Path
+from sys import byteorder
+from typing import Dict, Iterator, List, Union
+from ..containers import MoleculeContainer
+
+
+# column name, typecode and CSR offsets group. xy and cis_trans have 2 items per atom or pair.
+columns = (('numbers', 'I', 'atoms'), ('atomic_numbers', 'B', 'atoms'), ('isotopes', 'H', 'atoms'),
+           ('charges', 'b', 'atoms'), ('radicals', 'B', 'atoms'), ('hydrogens', 'b', 'atoms'),
+           ('parsed_mapping', 'i', 'atoms'), ('atoms_stereo', 'b', 'atoms'), ('allenes_stereo', 'b', 'atoms'),
+           ('xy', 'd', 'atoms'), ('degrees', 'I', 'atoms'), ('neighbors', 'I', 'bonds'), ('orders', 'B', 'bonds'),
+           ('cis_trans', 'I', 'cis_trans'), ('cis_trans_marks', 'B', 'cis_trans'), ('conformers', 'd', 'conformers'))
+offsets = ('atoms', 'bonds', 'cis_trans', 'conformers', 'meta')
+dtypes = {'B': 'u1', 'b': 'i1', 'H': 'u2', 'I': 'u4', 'i': 'i4', 'Q': 'u8', 'd': 'f8'}  # numpy compatible types
+store_version = 1
+
+
+class MolStoreWrite:
+    """
+    Column-wise molecules storage writer. Works similar to opened for writing file object.
+    Support `with` context manager.
+
+    Store is directory of flat arrays in native byte order: one file per atoms, bonds and stereo property,
+    CSR offsets files (`*.idx`) of records and JSON name and meta of records with separate offsets index.
+    Arrays can be opened by numpy.memmap with dtypes from `store.json` header.
+    """
+    def __init__(self, path: Union[str, Path], *, append: bool = False):
+        """
+        :param path: store directory. will be created if not exists.
+        :param append: append molecules to existing store.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        elif not isinstance(path, Path):
+            raise TypeError('invalid path. str or pathlib.Path expected')
+        self.__path = path
+        path.mkdir(parents=True, exist_ok=True)
+
+        if append and (path / 'store.json').exists():
+            header = MolStore._load_header(path)
+            self.__count = header['count']
+            self.__totals = totals = {x: MolStore._read_offset(path / f'{x}.idx', self.__count) for x in offsets}
+            self.__files = {x: (path / f'{x}.bin').open('ab') for x, *_ in columns}
+            self.__files['meta'] = (path / 'meta.bin').open('ab')
+            self.__indices = {x: (path / f'{x}.idx').open('ab') for x in offsets}
+            # drop records written after last header update
+            for name, typecode, group in columns:
+                f = self.__files[name]
+                f.truncate(totals[group] * (2 if name in ('xy', 'cis_trans') else 1) * array(typecode).itemsize)
+            self.__files['meta'].truncate(totals['meta'])
+            for x, f in self.__indices.items():
+                f.truncate((self.__count + 1) * 8)
+        else:
+            self.__count = 0
+            self.__totals = dict.fromkeys(offsets, 0)
+            self.__files = {x: (path / f'{x}.bin').open('wb') for x, *_ in columns}
+            self.__files['meta'] = (path / 'meta.bin').open('wb')
+            self.__indices = {x: (path / f'{x}.idx').open('wb') for x in offsets}
+            zero = array('Q', [0]).tobytes()
+            for f in self.__indices.values():
+                f.write(zero)
+            self.__write_header()
+
+    def write(self, data: MoleculeContainer):
+        """
+        write single molecule into store
+        """
+        if not isinstance(data, MoleculeContainer):
+            raise TypeError('MoleculeContainer expected')
+        arrays = data._to_columns()
+        meta = dumps([data.name, data.meta], separators=(',', ':')).encode()
+
+        files = self.__files
+        for (name, *_), arr in zip(columns, arrays):
+            files[name].write(arr.tobytes())
+        files['meta'].write(meta)
+
+        totals = self.__totals
+        totals['atoms'] += len(arrays[0])
+        totals['bonds'] += len(arrays[11])
+        totals['cis_trans'] += len(arrays[14])
+        totals['conformers'] += len(arrays[15])
+        totals['meta'] += len(meta)
+        for x, f in self.__indices.items():
+            f.write(array('Q', [totals[x]]).tobytes())
+        self.__count += 1
+
+    def close(self):
+        """
+        flush data and write store header
+        """
+        if self.__files is None:
+            return
+        for f in self.__files.values():
+            f.close()
+        for f in self.__indices.values():
+            f.close()
+        self.__files = self.__indices = None
+        self.__write_header()
+        self.write = self.__write_closed
+
+    def __write_header(self):
+        header = {'version': store_version, 'count': self.__count, 'byteorder': byteorder,
+                  'columns': {name: ('<' if byteorder == 'little' else '>') + dtypes[typecode]
+                              for name, typecode, _ in columns},
+                  'offsets': offsets}
+        tmp = self.__path / 'store.json.tmp'
+        with tmp.open('w') as f:
+            f.write(dumps(header))
+        replace(str(tmp), str(self.__path / 'store.json'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.close()
+
+    @staticmethod
+    def __write_closed(_):
+        raise ValueError('I/O operation on closed writer')
+
+
+class MolStore:
+    """
+    Read-only memory-mapped molecules storage created by `MolStoreWrite`.
+
+    Molecules reconstructed on access: support `len`, indexing, slicing and iteration
+    without loading of whole store into memory.
+    """
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: store directory.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        elif not isinstance(path, Path):
+            raise TypeError('invalid path. str or pathlib.Path expected')
+        header = self._load_header(path)
+        if header['byteorder'] != byteorder:
+            raise ValueError('store created on platform with different byte order')
+        self.__count = header['count']
+        self.__maps = maps = []
+        self.__columns = {}
+        for name, typecode, _ in columns:
+            self.__columns[name] = self.__map(path / f'{name}.bin', typecode, maps)
+        self.__offsets = {x: self.__map(path / f'{x}.idx', 'Q', maps) for x in offsets}
+        self.__meta = self.__map(path / 'meta.bin', 'B', maps)
+
+    def __len__(self):
+        return self.__count
+
+    def __iter__(self) -> Iterator[MoleculeContainer]:
+        for i in range(self.__count):
+            yield self[i]
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[MoleculeContainer, List[MoleculeContainer]]:
+        """
+        getitem method for store
+
+        :param item: index or slice
+        :return: MoleculeContainer or list of MoleculeContainers
+        """
+        if isinstance(item, slice):
+            return [self.__record(i) for i in range(*item.indices(self.__count))]
+        elif isinstance(item, int):
+            if item < 0:
+                item += self.__count
+            if not 0 <= item < self.__count:
+                raise IndexError('index out of range')
+            return self.__record(item)
+        raise TypeError('indices must be integers or slices')
+
+    def meta(self, item: int) -> Dict:
+        """
+        Meta of record without structure reconstruction.
+        """
+        return self.__name_meta(item)[1]
+
+    def close(self):
+        """
+        release memory maps
+        """
+        for x in self.__columns.values():
+            x.release()
+        for x in self.__offsets.values():
+            x.release()
+        self.__meta.release()
+        for x in self.__maps:
+            x.close()
+        self.__maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.close()
+
+    def __name_meta(self, item):
+        if item < 0:
+            item += self.__count
+        if not 0 <= item < self.__count:
+            raise IndexError('index out of range')
+        index = self.__offsets['meta']
+        return loads(bytes(self.__meta[index[item]:index[item + 1]]).decode())
+
+    def __record(self, item):
+        name, meta = self.__name_meta(item)
+        o = self.__offsets
+        c = self.__columns
+        a0, a1 = o['atoms'][item], o['atoms'][item + 1]
+        b0, b1 = o['bonds'][item], o['bonds'][item + 1]
+        s0, s1 = o['cis_trans'][item], o['cis_trans'][item + 1]
+        x0, x1 = o['conformers'][item], o['conformers'][item + 1]
+        return MoleculeContainer._from_columns(c['numbers'][a0:a1], c['atomic_numbers'][a0:a1],
+                                               c['isotopes'][a0:a1], c['charges'][a0:a1], c['radicals'][a0:a1],
+                                               c['hydrogens'][a0:a1], c['parsed_mapping'][a0:a1],
+                                               c['atoms_stereo'][a0:a1], c['allenes_stereo'][a0:a1],
+                                               c['xy'][2 * a0:2 * a1], c['degrees'][a0:a1],
+                                               c['neighbors'][b0:b1], c['orders'][b0:b1],
+                                               c['cis_trans'][2 * s0:2 * s1], c['cis_trans_marks'][s0:s1],
+                                               c['conformers'][x0:x1], name, meta)
+
+    @staticmethod
+    def __map(file: Path, typecode: str, maps: list) -> memoryview:
+        with file.open('rb') as f:
+            try:
+                m = mmap(f.fileno(), 0, access=ACCESS_READ)
+            except ValueError:  # empty file can't be mapped
+                return memoryview(b'').cast(typecode)
+        maps.append(m)
+        return memoryview(m).cast(typecode)
+
+    @staticmethod
+    def _load_header(path: Path) -> Dict:
+        try:
+            with (path / 'store.json').open() as f:
+                header = loads(f.read())
+        except FileNotFoundError:
+            raise ValueError('store header not found')
+        if header.get('version') != store_version:
+            raise ValueError(f'unsupported store version: {header.get("version")}')
+        return header
+
+    @staticmethod
+    def _read_offset(file: Path, item: int) -> int:
+        with file.open('rb') as f:
+            f.seek(item * 8)
+            return array('Q', f.read(8))[0]
+
+
+__all__ = ['MolStore', 'MolStoreWrite']
@@ -22,7 +22,8 @@ from .PDBrw import *
 from .RDFrw import *
 from .SDFrw import *
 from .SMILESrw import *
+from .STORErw import *
 from .XYZrw import *
 
 
-__all__ = [x for x in locals() if x.endswith(('Read', 'Write'))]
+__all__ = [x for x in locals() if x.endswith(('Read', 'Write', 'Store'))]
@@ -20,7 +20,7 @@ from .emol import EMOLRead
 from .erxn import ERXNRead
 from .ewrite import EMDLWrite
 from .mol import MOLRead, common_isotopes
-from .parser import CGRRead, parse_error
+from .parser import CGRRead, parse_error, meta_record
 from .rxn import RXNRead
 from .stereo import MDLStereo
 from .rw import MDLRead
@@ -154,6 +154,96 @@ class MOLRead:
         else:
             self.__collect(line)
 
+    @classmethod
+    def parse_bytes(cls, lines, start=0, log_buffer=None):
+        """
+        Parse V2000 molecule from list of bytes lines without decoding.
+        Charges, isotopes and radicals properties supported only.
+
+        :param lines: lines of record
+        :param start: index of counts line
+        :return: molecule and index of `M  END` line or None if molecule has unsupported data.
+        """
+        counts = lines[start]
+        if counts.startswith(b'  0'):
+            raise EmptyMolecule
+        atoms_count = int(counts[0:3])
+        bonds_count = int(counts[3:6])
+        atoms_end = start + atoms_count + 1
+        bonds_end = atoms_end + bonds_count
+        if len(lines) <= bonds_end:
+            raise ValueError('molecule not complete')
+        if log_buffer is None:
+            log_buffer = []
+        charge_map = cls.__bytes_charge_map
+
+        atoms = []
+        for line in lines[start + 1: atoms_end]:
+            try:
+                charge = charge_map[line[36:39]]
+            except KeyError:
+                raise ValueError('invalid charge')
+            element = line[31:34].strip().decode()
+            isotope = line[34:36]
+
+            if element == 'A':  # query
+                return
+            elif element == 'L':
+                raise ValueError('list of atoms not supported')
+            elif element == 'D':
+                element = 'H'
+                if isotope != b' 0':
+                    raise ValueError('isotope on deuterium atom')
+                isotope = 2
+            elif isotope != b' 0':
+                try:
+                    isotope = common_isotopes[element] + int(isotope)
+                except KeyError:
+                    raise ValueError('invalid element symbol')
+            else:
+                isotope = None
+
+            mapping = line[60:63]
+            atoms.append({'element': element, 'charge': charge, 'isotope': isotope, 'is_radical': False,
+                          'mapping': int(mapping) if mapping else 0,
+                          'x': float(line[0:10]), 'y': float(line[10:20]), 'z': float(line[20:30])})
+
+        bonds = []
+        stereo = []
+        for line in lines[atoms_end: bonds_end]:
+            a1, a2 = int(line[0:3]) - 1, int(line[3:6]) - 1
+            s = line[9:12]
+            if s == b'  1':
+                stereo.append((a1, a2, 1))
+            elif s == b'  6':
+                stereo.append((a1, a2, -1))
+            elif s != b'  0':
+                log_buffer.append('unsupported or invalid stereo')
+            b = int(line[6:9])
+            bonds.append((a1, a2, b if b != 9 else 8))
+
+        ctf_data = cls.__bytes_ctf_data
+        for end in range(bonds_end, len(lines)):
+            line = lines[end]
+            if line.startswith(b'M  END'):
+                for a in atoms:
+                    if a['is_radical']:
+                        a['is_radical'] = True
+                return {'atoms': atoms, 'bonds': bonds, 'stereo': stereo}, end
+            elif line.startswith((b'M  ISO', b'M  RAD', b'M  CHG')):
+                _type = ctf_data[line[3:4]]
+                for i in range(int(line[6:9])):
+                    i8 = i * 8
+                    atom = int(line[10 + i8:13 + i8])
+                    if not atom or atom > len(atoms):
+                        raise ValueError('invalid atoms number')
+                    atoms[atom - 1][_type] = int(line[14 + i8:17 + i8])
+            elif line.startswith(b'M  ALS'):
+                raise ValueError('list of atoms not supported')
+            elif line.startswith((b'M  STY', b'M  SAL', b'M  SDT', b'M  SED')):  # CGR or query data
+                return
+        raise ValueError('molecule not complete')
+
     def __collect(self, line):
         if line.startswith('M  ALS'):
             raise ValueError('list of atoms not supported')
@@ -187,6 +277,8 @@ class MOLRead:
 
     __ctf_data = {'R': 'is_radical', 'C': 'charge', 'I': 'isotope'}
     __charge_map = {'  0': 0, '  1': 3, '  2': 2, '  3': 1, '  4': 0, '  5': -1, '  6': -2, '  7': -3}
+    __bytes_ctf_data = {b'R': 'is_radical', b'C': 'charge', b'I': 'isotope'}
+    __bytes_charge_map = {b'  0': 0, b'  1': 3, b'  2': 2, b'  3': 1, b'  4': 0, b'  5': -1, b'  6': -2, b'  7': -3}
     __mend = False
 
 
@@ -19,12 +19,14 @@
 from collections import defaultdict, namedtuple
 from itertools import count
 from ...containers import CGRContainer, MoleculeContainer, QueryContainer, ReactionContainer
-from ...containers.bonds import Bond, DynamicBond
+from ...containers.bonds import DynamicBond
 from ...exceptions import AtomNotFound, MappingError
-from ...periodictable import DynamicElement, Element, QueryElement
+from ...periodictable import DynamicElement, QueryElement
 
 
-parse_error = namedtuple('ParseError', ('number', 'position', 'log', 'meta'))
+# named same as classes for pickle compatibility
+ParseError = parse_error = namedtuple('ParseError', ('number', 'position', 'log', 'meta'))
+MetaRecord = meta_record = namedtuple('MetaRecord', ('title', 'meta', 'atoms_count'))
 
 
 class CGRRead:
@@ -144,38 +146,17 @@ class CGRRead:
         return g
 
     def _convert_molecule(self, molecule, mapping):
-        g = object.__new__(self.MoleculeContainer)
-        pm = {}
-        atoms = {}
-        plane = {}
-        charges = {}
-        radicals = {}
-        bonds = {}
-        for n, atom in enumerate(molecule['atoms']):
-            n = mapping[n]
-            atoms[n] = Element.from_symbol(atom['element'])(atom['isotope'])
-            bonds[n] = {}
-
-            charges[n] = g._validate_charge(atom['charge'])
-            radicals[n] = atom['is_radical']
-            plane[n] = (atom['x'], atom['y'])
-            pm[n] = atom['mapping']
-        for n, m, b in molecule['bonds']:
-            n, m = mapping[n], mapping[m]
-            if n == m:
-                raise ValueError('atom loops impossible')
-            if n not in bonds or m not in bonds:
-                raise AtomNotFound('atoms not found')
-            if n in bonds[m]:
-                raise ValueError('atoms already bonded')
-            bonds[n][m] = bonds[m][n] = Bond(b)
-        if any(a['z'] for a in molecule['atoms']):
-            conformers = [{mapping[n]: (a['x'], a['y'], a['z']) for n, a in enumerate(molecule['atoms'])}]
-        else:
-            conformers = []
-        g.__setstate__({'atoms': atoms, 'bonds': bonds, 'meta': {}, 'plane': plane, 'parsed_mapping': pm,
-                        'charges': charges, 'radicals': radicals, 'name': '', 'conformers': conformers,
-                        'atoms_stereo': {}, 'allenes_stereo': {}, 'cis_trans_stereo': {}})
+        atoms = molecule['atoms']
+        numbers = [mapping[n] for n in range(len(atoms))]
+        g = self.MoleculeContainer.from_arrays([a['element'] for a in atoms], [(n, m) for n, m, _ in molecule['bonds']],
+                                               [b for *_, b in molecule['bonds']],
+                                               charges=[a['charge'] for a in atoms],
+                                               radicals=[a['is_radical'] for a in atoms],
+                                               xy=[(a['x'], a['y']) for a in atoms],
+                                               isotopes=[a['isotope'] for a in atoms], numbers=numbers)
+        g._parsed_mapping.update(zip(numbers, (a['mapping'] for a in atoms)))
+        if any(a['z'] for a in atoms):
+            g._conformers.append({n: (a['x'], a['y'], a['z']) for n, a in zip(numbers, atoms)})
         return g
 
     def _convert_cgr(self, molecule, mapping):
@@ -262,4 +243,4 @@ class CGRRead:
         return g
 
 
-__all__ = ['CGRRead', 'parse_error']
+__all__ = ['CGRRead', 'parse_error', 'meta_record']
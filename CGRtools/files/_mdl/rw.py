@@ -17,17 +17,28 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from base64 import urlsafe_b64encode
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from io import StringIO, TextIOWrapper
 from itertools import islice
+from mmap import mmap, ACCESS_READ
+from os import cpu_count, fstat, replace
 from os.path import abspath, join
 from pathlib import Path
-from pickle import dump, load, UnpicklingError
-from sys import platform
+from re import compile, MULTILINE
+from struct import Struct
+from sys import byteorder
 from tempfile import gettempdir
-from .parser import parse_error
+from typing import Callable, Collection, Optional
+from .parser import parse_error, meta_record
 from .stereo import MDLStereo
 
 
+# magic, source file size, source file mtime in ns, number of offsets. native byteorder array of uint64 follows.
+index_header = Struct('=4sQqQ')
+index_magic = b'CGI' + byteorder[0].encode()
+
+
 class MDLReadMeta(type):
     def __call__(cls, *args, **kwargs):
         if kwargs.get('indexable'):
@@ -40,18 +51,24 @@ class MDLReadMeta(type):
 
 
 class MDLRead(MDLStereo, metaclass=MDLReadMeta):
-    def __init__(self, file, **kwargs):
+    def __init__(self, file, cache_dir=None, fields: Optional[Collection[str]] = None, structure: bool = True,
+                 predicate: Optional[Callable[[meta_record], bool]] = None, **kwargs):
         if isinstance(file, str):
-            self._file = open(file)
+            self._file = open(file, self._file_mode)
             self._is_buffer = False
         elif isinstance(file, Path):
-            self._file = file.open()
+            self._file = file.open(self._file_mode)
             self._is_buffer = False
-        elif isinstance(file, (TextIOWrapper, StringIO)):
+        elif isinstance(file, self._buffer_types):
             self._file = file
             self._is_buffer = True
         else:
-            raise TypeError('invalid file. TextIOWrapper, StringIO subclasses possible')
+            raise TypeError(f'invalid file. {", ".join(x.__name__ for x in self._buffer_types)} subclasses possible')
+        self.__cache_dir = cache_dir
+        self._fields = None if fields is None else set(fields)
+        self.__structure = structure
+        self.__predicate = predicate
+        self.__kwargs = {'fields': fields, 'structure': structure, 'predicate': predicate, **kwargs}
         super().__init__(**kwargs)
 
     def close(self, force=False):
@@ -62,6 +79,7 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
         """
         if not self._is_buffer or force:
             self._file.close()
+        self.__release_index()
 
     def __enter__(self):
         return self
@@ -71,35 +89,114 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
 
     def _load_cache(self):
         """
-        Load existing cache or create new. Working only for UNIX-like systems and local files (not buffers).
+        Load existing index or create new. Index of files stored on disk is saved into sidecar file and validated by
+        size and modification time of original file. Index of buffers is kept in memory.
         """
-        if platform == 'win32' or self._is_buffer:
+        if self._is_buffer:
+            if self._file.seekable():
+                self.reset_index()
+            return
+
+        stat = fstat(self._file.fileno())
+        for path in self.__cache_paths:
+            try:
+                with open(path, 'rb') as f:
+                    header = f.read(index_header.size)
+                    if len(header) != index_header.size:
+                        continue
+                    magic, size, mtime, length = index_header.unpack(header)
+                    if magic != index_magic or size != stat.st_size or mtime != stat.st_mtime_ns or \
+                            fstat(f.fileno()).st_size != index_header.size + length * 8:
+                        continue
+                    index = mmap(f.fileno(), 0, access=ACCESS_READ)
+            except FileNotFoundError:  # index not found
+                continue
+            except IsADirectoryError as e:
+                raise IsADirectoryError(f'Please delete {path} directory') from e
+            self.__release_index()
+            self.__index = index
+            self._shifts = memoryview(index)[index_header.size:].cast('Q')
             return
-        try:
-            with open(self.__cache_path, 'rb') as f:
-                self._shifts = load(f)
-        except FileNotFoundError:  # cache not found
-            self.reset_index()
-        except IsADirectoryError as e:
-            raise IsADirectoryError(f'Please delete {self.__cache_path} directory') from e
-        except (UnpicklingError, EOFError) as e:  # invalid file. ask user to check it.
-            raise UnpicklingError(f'Invalid cache file {self.__cache_path}. Please delete it') from e
+        self.reset_index()
 
     def reset_index(self):
         """
-        Create (rewrite) indexation table. Implemented only for object that
-        is a real file (the path to the file is specified) because the external grep utility is used.
+        Create (rewrite) indexation table.
         """
-        if platform != 'win32' and not self._is_buffer:
-            self._shifts = self._get_shifts(self._file.name)
-            with open(self.__cache_path, 'wb') as f:
-                dump(self._shifts, f)
-        else:
-            raise self._implement_error
+        if self._is_buffer:
+            if not self._file.seekable():
+                raise self._implement_error
+            current = self._file.tell()
+            self._file.seek(0)
+            try:
+                self._shifts = self._get_shifts(getattr(self._file, 'buffer', self._file))
+            finally:
+                self._file.seek(current)
+            return
+
+        with open(self._file.name, 'rb') as f:
+            stat = fstat(f.fileno())
+            shifts = self._get_shifts(f)
+        self.__release_index()
+        self._shifts = shifts
+
+        header = index_header.pack(index_magic, stat.st_size, stat.st_mtime_ns, len(shifts))
+        for path in self.__cache_paths:
+            try:
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(header)
+                    shifts.tofile(f)
+                replace(path + '.tmp', path)  # atomic. opened by other readers index stay valid.
+            except IsADirectoryError as e:
+                raise IsADirectoryError(f'Please delete {path} directory') from e
+            except OSError:  # directory not writable
+                continue
+            break
 
     @property
-    def __cache_path(self):
-        return abspath(join(gettempdir(), 'cgrtools_' + urlsafe_b64encode(abspath(self._file.name).encode()).decode()))
+    def __cache_paths(self):
+        name = abspath(self._file.name)
+        if self.__cache_dir is None:
+            yield f'{name}.cgrtools'
+            cache_dir = gettempdir()
+        else:
+            cache_dir = self.__cache_dir
+        yield abspath(join(cache_dir, 'cgrtools_' + urlsafe_b64encode(name.encode()).decode()))
+
+    def __release_index(self):
+        if self.__index is not None:
+            self._shifts.release()
+            self._shifts = None
+            self.__index.close()
+            self.__index = None
+
+    @staticmethod
+    def _scan_file(file, pattern, chunk_size=1 << 24):
+        """
+        Find all pattern matches in file. File read by big chunks from current position.
+
+        :param file: opened in binary mode file or StringIO buffer
+        :param pattern: bytes regular expression matching whole line
+        :return: iterator of match start and end positions
+        """
+        tail = None
+        shift = 0
+        while True:
+            data = file.read(chunk_size)
+            if tail is None:  # first chunk
+                if isinstance(data, str):
+                    pattern = compile(pattern.pattern.decode(), MULTILINE)
+                tail = data[:0]
+            if not data:
+                break
+            data = tail + data
+            end = data.rfind(b'\n' if isinstance(data, bytes) else '\n') + 1  # only complete lines
+            for m in pattern.finditer(data, 0, end):
+                yield shift + m.start(), shift + m.end()
+            tail = data[end:]
+            shift += end
+        for m in pattern.finditer(tail):
+            yield shift + m.start(), shift + m.end()
 
     def read(self):
         """
@@ -109,8 +206,67 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
         """
         return list(iter(self))
 
+    def imap(self, workers: Optional[int] = None, *, chunksize: int = 1000, ordered: bool = True,
+             prefetch: int = 2):
+        """
+        Parse records in worker processes. Supported only for indexable readers of files stored on disk.
+        Records with errors skipped.
+
+        :param workers: number of processes. By default equal to number of CPUs.
+        :param chunksize: number of records parsed in worker per task.
+        :param ordered: return records in file order. Otherwise records returned in order of tasks completion.
+        :param prefetch: number of tasks queued per worker. Limits memory usage.
+        :return: iterator of parsed containers
+        """
+        if not self._shifts or self._is_buffer:
+            raise self._implement_error
+        if workers is None:
+            workers = cpu_count() or 1
+        limit = workers * prefetch
+        shifts = self._shifts
+        total = len(shifts) - 1
+        parse = type(self).__bases__[0]._parse_range  # not indexable class
+        args = (self._file.name, self._encoding, self.__kwargs)
+
+        with ProcessPoolExecutor(workers) as executor:
+            if ordered:
+                queue = deque()
+                for i in range(0, total, chunksize):
+                    if len(queue) == limit:
+                        yield from queue.popleft().result()
+                    queue.append(executor.submit(parse, shifts[i], shifts[min(i + chunksize, total)], *args))
+                while queue:
+                    yield from queue.popleft().result()
+            else:
+                queue = set()
+                for i in range(0, total, chunksize):
+                    if len(queue) == limit:
+                        done, queue = wait(queue, return_when=FIRST_COMPLETED)
+                        for x in done:
+                            yield from x.result()
+                    queue.add(executor.submit(parse, shifts[i], shifts[min(i + chunksize, total)], *args))
+                while queue:
+                    done, queue = wait(queue, return_when=FIRST_COMPLETED)
+                    for x in done:
+                        yield from x.result()
+
+    @classmethod
+    def _parse_range(cls, start, end, file, encoding, kwargs):
+        """
+        Parse records block of file. Used in worker processes.
+        """
+        with open(file, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start).decode(encoding)
+        with cls(StringIO(cls._chunk_header + data), **kwargs) as f:
+            return f.read()
+
+    @property
+    def _encoding(self):
+        return self._file.encoding
+
     def __iter__(self):
-        return (x for x in self._data if not isinstance(x, parse_error))
+        return (x for x in self._data if x is not None and not isinstance(x, parse_error))
 
     def __next__(self):
         return next(iter(self))
@@ -119,7 +275,7 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
         """
         Getting the item by index from the original file,
         For slices records with errors skipped.
-        For indexed access records with errors returned as error container.
+        For indexed access records with errors returned as error container and records rejected by predicate as None.
         :return: [Molecule, Reaction]Container or list of [Molecule, Reaction]Containers
         """
         if self._shifts:
@@ -137,13 +293,14 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
                     return []
                 if step == 1:
                     self.seek(start)
-                    records = [x for x in islice(self._data, stop - start) if not isinstance(x, parse_error)]
+                    records = [x for x in islice(self._data, stop - start)
+                               if x is not None and not isinstance(x, parse_error)]
                 else:
                     records = []
                     for index in range(start, stop, step):
                         self.seek(index)
                         record = next(self._data)
-                        if not isinstance(record, parse_error):
+                        if record is not None and not isinstance(record, parse_error):
                             records.append(record)
                 return records
             else:
@@ -171,6 +328,36 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
             return data
         raise self._implement_error
 
+    def _convert_record(self, record, is_reaction=False):
+        """
+        Convert parsed record into container or into MetaRecord if structure parsing disabled.
+
+        :return: None for records rejected by predicate
+        """
+        if self.__structure and self.__predicate is None:
+            if is_reaction:
+                return self._convert_reaction(record)
+            return self._convert_structure(record)
+
+        if 'atoms' in record:
+            atoms_count = len(record['atoms'])
+        elif is_reaction and self.__structure:
+            atoms_count = sum(len(m['atoms']) for x in ('reactants', 'products', 'reagents') for m in record[x])
+        else:
+            atoms_count = record.get('atoms_count')
+        header = meta_record(record.get('title', ''), record['meta'], atoms_count)
+        if self.__predicate is not None and not self.__predicate(header):
+            return
+        elif not self.__structure:
+            return header
+        elif is_reaction:
+            return self._convert_reaction(record)
+        return self._convert_structure(record)
+
+    @property
+    def _structure(self):
+        return self.__structure
+
     def _prepare_meta(self, meta):
         new_meta = {}
         for k, v in meta.items():
@@ -181,7 +368,11 @@ class MDLRead(MDLStereo, metaclass=MDLReadMeta):
         return new_meta
 
     _shifts = None
-    _implement_error = NotImplementedError('Indexable supported in unix-like o.s. and for files stored on disk')
+    _file_mode = 'r'
+    _buffer_types = (TextIOWrapper, StringIO)
+    _chunk_header = ''  # prepended to records block parsed in worker process
+    __index = None
+    _implement_error = NotImplementedError('Indexable supported for files stored on disk and seekable buffers')
 
 
 class _MDLWrite:
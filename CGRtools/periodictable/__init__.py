@@ -41,6 +41,8 @@ from .groupXVIII import *
 
 modules = {v.__name__: v for k, v in globals().items() if k.startswith('group') and k != 'groups'}
 elements = {k: v for k, v in globals().items() if isinstance(v, ABCMeta) and k != 'Element' and issubclass(v, Element)}
+Element._symbols_registry.update(elements)
+Element._numbers_registry.update((v.atomic_number.fget(None), v) for v in elements.values())
 
 __all__ = ['Element', 'DynamicElement', 'QueryElement', 'DynamicQueryElement', 'AnyElement', 'DynamicAnyElement']
 __all__.extend(k for k in globals() if k.startswith('Group'))
@@ -56,5 +58,7 @@ for _class in (DynamicElement, QueryElement, DynamicQueryElement):
                                       'isotopes_distribution': v.isotopes_distribution,
                                       'isotopes_masses': v.isotopes_masses, 'atomic_radius': v.atomic_radius})
         setattr(modules[v.__module__], name, cls)
+        _class._symbols_registry[k] = cls
+        _class._numbers_registry[v.atomic_number.fget(None)] = cls
         modules[v.__module__].__all__.append(name)
         __all__.append(name)
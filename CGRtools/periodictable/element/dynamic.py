@@ -16,7 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from typing import Type
+from typing import Dict, Type
 from .core import Core
 from ...exceptions import IsNotConnectedAtom
 
@@ -29,7 +29,7 @@ class Dynamic(Core):
         try:
             g = self._graph()
             g._charges[self._map] = g._validate_charge(charge)
-            g.flush_cache()
+            g.flush_cache('charges')
         except AttributeError:
             raise IsNotConnectedAtom
 
@@ -38,7 +38,7 @@ class Dynamic(Core):
         try:
             g = self._graph()
             g._radicals[self._map] = g._validate_radical(is_radical)
-            g.flush_cache()
+            g.flush_cache('charges')
         except AttributeError:
             raise IsNotConnectedAtom
 
@@ -54,7 +54,7 @@ class Dynamic(Core):
         try:
             g = self._graph()
             g._p_charges[self._map] = g._validate_charge(charge)
-            g.flush_cache()
+            g.flush_cache('charges')
         except AttributeError:
             raise IsNotConnectedAtom
 
@@ -70,7 +70,7 @@ class Dynamic(Core):
         try:
             g = self._graph()
             g._p_radicals[self._map] = g._validate_radical(is_radical)
-            g.flush_cache()
+            g.flush_cache('charges')
         except AttributeError:
             raise IsNotConnectedAtom
 
@@ -87,6 +87,9 @@ class Dynamic(Core):
 
 class DynamicElement(Dynamic):
     __slots__ = ('__p_charge', '__p_is_radical')
+    # element classes by symbol and atomic number. filled on periodictable import
+    _symbols_registry: Dict[str, Type['DynamicElement']] = {}
+    _numbers_registry: Dict[int, Type['DynamicElement']] = {}
 
     @property
     def atomic_symbol(self) -> str:
@@ -98,8 +101,8 @@ class DynamicElement(Dynamic):
         get DynamicElement class by its symbol
         """
         try:
-            element = next(x for x in DynamicElement.__subclasses__() if x.__name__ == f'Dynamic{symbol}')
-        except StopIteration:
+            element = DynamicElement._symbols_registry[symbol]
+        except KeyError:
             raise ValueError(f'DynamicElement with symbol "{symbol}" not found')
         return element
 
@@ -109,8 +112,8 @@ class DynamicElement(Dynamic):
         get DynamicElement class by its number
         """
         try:
-            element = next(x for x in DynamicElement.__subclasses__() if x.atomic_number.fget(None) == number)
-        except StopIteration:
+            element = DynamicElement._numbers_registry[number]
+        except KeyError:
             raise ValueError(f'DynamicElement with number "{number}" not found')
         return element
 
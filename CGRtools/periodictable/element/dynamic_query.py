@@ -106,6 +106,9 @@ class DynamicQuery(Dynamic):
 
 class DynamicQueryElement(DynamicQuery):
     __slots__ = ()
+    # element classes by symbol and atomic number. filled on periodictable import
+    _symbols_registry: Dict[str, Type['DynamicQueryElement']] = {}
+    _numbers_registry: Dict[int, Type['DynamicQueryElement']] = {}
 
     @property
     def atomic_symbol(self) -> str:
@@ -119,8 +122,8 @@ class DynamicQueryElement(DynamicQuery):
         if symbol == 'A':
             return DynamicAnyElement
         try:
-            element = next(x for x in DynamicQueryElement.__subclasses__() if x.__name__ == f'DynamicQuery{symbol}')
-        except StopIteration:
+            element = DynamicQueryElement._symbols_registry[symbol]
+        except KeyError:
             raise ValueError(f'DynamicQueryElement with symbol "{symbol}" not found')
         return element
 
@@ -132,8 +135,8 @@ class DynamicQueryElement(DynamicQuery):
         if number == 0:
             return DynamicAnyElement
         try:
-            element = next(x for x in DynamicQueryElement.__subclasses__() if x.atomic_number.fget(None) == number)
-        except StopIteration:
+            element = DynamicQueryElement._numbers_registry[number]
+        except KeyError:
             raise ValueError(f'DynamicQueryElement with number "{number}" not found')
         return element
 
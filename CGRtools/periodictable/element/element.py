@@ -26,6 +26,9 @@ from ...exceptions import IsNotConnectedAtom, ValenceError
 
 class Element(Core):
     __slots__ = ()
+    # element classes by symbol and atomic number. filled on periodictable import
+    _symbols_registry: Dict[str, Type['Element']] = {}
+    _numbers_registry: Dict[int, Type['Element']] = {}
     __class_cache__ = {}
 
     @property
@@ -38,7 +41,7 @@ class Element(Core):
             g = self._graph()
             g._charges[self._map] = g._validate_charge(charge)
             g._calc_implicit(self._map)
-            g.flush_cache()
+            g.flush_cache('charges', 'stereo')
             g._fix_stereo()
         except AttributeError:
             raise IsNotConnectedAtom
@@ -49,7 +52,7 @@ class Element(Core):
             g = self._graph()
             g._radicals[self._map] = g._validate_radical(is_radical)
             g._calc_implicit(self._map)
-            g.flush_cache()
+            g.flush_cache('charges', 'stereo')
             g._fix_stereo()
         except AttributeError:
             raise IsNotConnectedAtom
@@ -88,8 +91,8 @@ class Element(Core):
         get Element class by its symbol
         """
         try:
-            element = next(x for x in Element.__subclasses__() if x.__name__ == symbol)
-        except StopIteration:
+            element = Element._symbols_registry[symbol]
+        except KeyError:
             raise ValueError(f'Element with symbol "{symbol}" not found')
         return element
 
@@ -99,8 +102,8 @@ class Element(Core):
         get Element class by its number
         """
         try:
-            element = next(x for x in Element.__subclasses__() if x.atomic_number.fget(None) == number)
-        except StopIteration:
+            element = Element._numbers_registry[number]
+        except KeyError:
             raise ValueError(f'Element with number "{number}" not found')
         return element
 
@@ -178,7 +181,7 @@ class Element(Core):
         dictionary with key = (charge, is_radical, sum_of_bonds) and
         value = list of possible neighbors and implicit H count
         """
-        elements_classes = {x.__name__: x.atomic_number.fget(None) for x in Element.__subclasses__()}
+        elements_classes = {k: x.atomic_number.fget(None) for k, x in Element._symbols_registry.items()}
 
         rules = defaultdict(list)
         if self._common_valences[0] and self.atomic_number != 1:  # atom has implicit hydrogens by default except H.
@@ -60,6 +60,9 @@ class Query(Core):
 
 class QueryElement(Query):
     __slots__ = ()
+    # element classes by symbol and atomic number. filled on periodictable import
+    _symbols_registry: Dict[str, Type['QueryElement']] = {}
+    _numbers_registry: Dict[int, Type['QueryElement']] = {}
 
     @property
     def atomic_symbol(self) -> str:
@@ -73,8 +76,8 @@ class QueryElement(Query):
         if symbol == 'A':
             return AnyElement
         try:
-            element = next(x for x in QueryElement.__subclasses__() if x.__name__ == f'Query{symbol}')
-        except StopIteration:
+            element = QueryElement._symbols_registry[symbol]
+        except KeyError:
             raise ValueError(f'QueryElement with symbol "{symbol}" not found')
         return element
 
@@ -86,8 +89,8 @@ class QueryElement(Query):
         if number == 0:
             return AnyElement
         try:
-            element = next(x for x in QueryElement.__subclasses__() if x.atomic_number.fget(None) == number)
-        except StopIteration:
+            element = QueryElement._numbers_registry[number]
+        except KeyError:
             raise ValueError(f'QueryElement with number "{number}" not found')
         return element
 
@@ -237,7 +240,7 @@ class ListElement(AnyElement):
         """
         super().__init__()
         self._elements = tuple(elements)
-        self._numbers = tuple(x.atomic_number.fget(None) for x in Element.__subclasses__() if x.__name__ in elements)
+        self._numbers = tuple(n for n, x in Element._numbers_registry.items() if x.__name__ in elements)
 
     @property
     def atomic_symbol(self) -> str:
@@ -279,8 +282,7 @@ class ListElement(AnyElement):
 
     def __setstate__(self, state):
         self._elements = state['elements']
-        self._numbers = tuple(x.atomic_number.fget(None) for x in Element.__subclasses__()
-                              if x.__name__ in state['elements'])
+        self._numbers = tuple(n for n, x in Element._numbers_registry.items() if x.__name__ in state['elements'])
         super().__setstate__(state)
 
     def __repr__(self):
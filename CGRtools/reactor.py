@@ -64,8 +64,6 @@ class BaseReactor:
             p_charges = structure._p_charges
             p_radicals = structure._p_radicals
 
-        new = structure.__class__()
-
         to_delete = {mapping[x] for x in self.__to_delete}
         if to_delete:
             # if deleted atoms have another path to remain fragment, the path is preserved
@@ -93,6 +91,10 @@ class BaseReactor:
             to_delete.update(delete)
 
         max_atom = max(charges) + 1
+        if not self.__is_cgr:
+            return self.__patch_molecule(structure, mapping, to_delete, max_atom)
+
+        new = structure.__class__()
         for n, atom in self.__atom_attrs.items():
             if n in mapping:  # add matched atoms
                 m = mapping[n]
@@ -102,15 +104,10 @@ class BaseReactor:
                 max_atom += 1
 
         old_atoms = set(new._atoms)
-        if self.__is_cgr:
-            for n, atom in structure.atoms():  # add unmatched atoms
-                if n not in old_atoms and n not in to_delete:
-                    new.add_atom(atom.copy(), n, charge=charges[n], is_radical=radicals[n], xy=plane[n],
-                                 p_is_radical=p_radicals[n], p_charge=p_charges[n])
-        else:
-            for n, atom in structure.atoms():  # add unmatched atoms
-                if n not in old_atoms and n not in to_delete:
-                    new.add_atom(atom.copy(), n, charge=charges[n], is_radical=radicals[n], xy=plane[n])
+        for n, atom in structure.atoms():  # add unmatched atoms
+            if n not in old_atoms and n not in to_delete:
+                new.add_atom(atom.copy(), n, charge=charges[n], is_radical=radicals[n], xy=plane[n],
+                             p_is_radical=p_radicals[n], p_charge=p_charges[n])
 
         for n, m, bond in self.__bond_attrs:  # add patch bonds
             n = mapping[n]
@@ -129,6 +126,59 @@ class BaseReactor:
         # todo: calculate stereo mark based on new atom order
         return new
 
+    def __patch_molecule(self, structure, mapping, to_delete, max_atom):
+        # collect atoms and bonds in the same order as CGR patcher adds them and build molecule at once
+        elements = self.__elements
+        plane = structure._plane
+        charges = structure._charges
+        radicals = structure._radicals
+
+        numbers, atoms, isotopes, new_charges, new_radicals, xy = [], [], [], [], [], []
+        for n, atom in self.__atom_attrs.items():
+            if n in mapping:  # add matched atoms
+                m = mapping[n]
+                xy.append(plane[m])
+            else:  # new atoms
+                mapping[n] = m = max_atom
+                max_atom += 1
+                xy.append(atom.get('xy', (0., 0.)))
+            e = elements[n]
+            numbers.append(m)
+            atoms.append(e.atomic_number)
+            isotopes.append(e.isotope)
+            new_charges.append(atom['charge'])
+            new_radicals.append(atom['is_radical'])
+
+        old_atoms = set(numbers)
+        for n, atom in structure.atoms():  # add unmatched atoms
+            if n not in old_atoms and n not in to_delete:
+                numbers.append(n)
+                atoms.append(atom.atomic_number)
+                isotopes.append(atom.isotope)
+                new_charges.append(charges[n])
+                new_radicals.append(radicals[n])
+                xy.append(plane[n])
+
+        index = {n: i for i, n in enumerate(numbers)}
+        bonds, orders = [], []
+        for n, m, bond in self.__bond_attrs:  # add patch bonds
+            bonds.append((index[mapping[n]], index[mapping[m]]))
+            orders.append(bond.order)
+
+        for n, m_bond in structure._bonds.items():
+            if n in to_delete:  # atoms for removing
+                continue
+            to_delete.add(n)
+            for m, bond in m_bond.items():
+                if m in to_delete or n in old_atoms and m in old_atoms:
+                    continue
+                bonds.append((index[n], index[m]))
+                orders.append(bond.order)
+
+        # todo: calculate stereo mark based on new atom order
+        return structure.__class__.from_arrays(atoms, bonds, orders, charges=new_charges, radicals=new_radicals,
+                                               xy=xy, isotopes=isotopes, numbers=numbers)
+
     def __getstate__(self):
         return {'elements': self.__elements, 'atom_attrs': self.__atom_attrs, 'bond_attrs': self.__bond_attrs,
                 'is_cgr': self.__is_cgr, 'to_delete': self.__to_delete}
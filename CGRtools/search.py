@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2020 Ramil Nugmanov <nougmanoff@protonmail.com>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from json import dumps, loads
+from numpy import arange, concatenate, flatnonzero, frombuffer, memmap, uint64
+from os import cpu_count, fstat, replace
+from os.path import abspath
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from .algorithms import isomorphism
+from .containers import MoleculeContainer, QueryContainer
+from .files import SDFRead
+
+
+index_version = 1
+screen_block = 1 << 16  # fingerprints rows screened at once. limits memory usage
+
+
+def screen_settings() -> List[int]:
+    """
+    Fingerprints compatibility key: size, paths length, counts limit and tuples hashing check.
+    """
+    return [isomorphism.screen_size, isomorphism.screen_length, isomorphism.screen_counts, hash((1, 2, 3))]
+
+
+class SubstructureIndex:
+    """
+    Persistent substructure search index of SDF file.
+
+    Index is directory of `index.json` header, fingerprints bit-matrix `fingerprints.bin` of little-endian uint64
+    words with one row per record and `records.bin` of uint64 triples: record number in SDF file, start and end
+    offsets of record in file. Records with errors are not indexed.
+
+    Queries are screened by vectorized fingerprints test. Candidates verified by `is_substructure` in worker
+    processes. Index supports SDF files growing by appending records: call `update` for indexing of new records.
+    """
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open existing index.
+
+        :param path: index directory.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        elif not isinstance(path, Path):
+            raise TypeError('invalid path. str or pathlib.Path expected')
+        header = self._load_header(path)
+        if header['screen'] != screen_settings():
+            raise ValueError('index created with incompatible fingerprints settings')
+        self.__path = path
+        self.__header = header
+        self.__fingerprints = self.__records = None
+        self.__load()
+
+    @classmethod
+    def create(cls, file: Union[str, Path], path: Union[str, Path], *, workers: Optional[int] = None,
+               chunksize: int = 1000, encoding: str = 'utf-8', thiele: bool = False, **kwargs) -> 'SubstructureIndex':
+        """
+        Create (rewrite) index of SDF file.
+
+        :param file: SDF file path.
+        :param path: index directory. will be created if not exists.
+        :param workers: number of processes. By default equal to number of CPUs.
+        :param chunksize: number of records parsed in worker per task.
+        :param encoding: encoding of SDF file.
+        :param thiele: aromatize molecules before fingerprinting and matching. Required for aromatic queries.
+        :param kwargs: SDFRead options: ignore, remap, calc_cis_trans, ignore_stereo.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        elif not isinstance(path, Path):
+            raise TypeError('invalid path. str or pathlib.Path expected')
+        file = abspath(str(file))
+        with open(file, 'rb'):  # check file exists
+            pass
+        path.mkdir(parents=True, exist_ok=True)
+        (path / 'fingerprints.bin').write_bytes(b'')
+        (path / 'records.bin').write_bytes(b'')
+        cls._write_header(path, {'version': index_version, 'source': file, 'encoding': encoding, 'thiele': thiele,
+                                 'kwargs': kwargs, 'screen': screen_settings(), 'count': 0, 'records': 0, 'size': 0})
+        index = cls(path)
+        index.update(workers=workers, chunksize=chunksize)
+        return index
+
+    def update(self, *, workers: Optional[int] = None, chunksize: int = 1000) -> int:
+        """
+        Index records appended to SDF file after index creation or last update.
+        Last record without `$$$$` delimiter is not indexed.
+
+        :param workers: number of processes. By default equal to number of CPUs.
+        :param chunksize: number of records parsed in worker per task.
+        :return: number of indexed records
+        """
+        header = self.__header
+        with open(header['source'], 'rb') as f:
+            if fstat(f.fileno()).st_size < header['size']:
+                raise ValueError('SDF file truncated. index should be recreated')
+            f.seek(header['size'])
+            shifts = [header['size'] + x for x in SDFRead._get_shifts(f)]
+
+        total = len(shifts) - 1
+        if not total:
+            return 0
+        args = (header['source'], header['encoding'], header['thiele'], header['kwargs'])
+        tasks = [shifts[i:i + chunksize + 1] for i in range(0, total, chunksize)]
+        if workers is None:
+            workers = cpu_count() or 1
+
+        count = 0
+        with (self.__path / 'fingerprints.bin').open('ab') as fps, (self.__path / 'records.bin').open('ab') as rs:
+            # drop rows written after last header update
+            fps.truncate(header['count'] * isomorphism.screen_size // 8)
+            rs.truncate(header['count'] * 24)
+            number = header['records']
+            for task, result in zip(tasks, self.__map(_fingerprints, tasks, args, workers)):
+                for i, fingerprint in result:
+                    fps.write(fingerprint)
+                    rs.write(uint64([number + i, task[i], task[i + 1]]).astype('<u8').tobytes())
+                count += len(result)
+                number += len(task) - 1
+
+        header['count'] += count
+        header['records'] += total
+        header['size'] = shifts[-1]
+        self._write_header(self.__path, header)
+        self.__load()
+        return count
+
+    def candidates(self, query: Union[MoleculeContainer, QueryContainer]) -> List[int]:
+        """
+        Numbers of SDF records passed fingerprints screening.
+        """
+        return self.__records[self.__screen(query), 0].tolist()
+
+    def search(self, query: Union[MoleculeContainer, QueryContainer], *, workers: Optional[int] = None,
+               chunksize: int = 100, prefetch: int = 2) -> Iterator[Tuple[int, MoleculeContainer]]:
+        """
+        Substructure search. Candidates passed fingerprints screening parsed and tested in worker processes.
+
+        :param workers: number of processes. By default equal to number of CPUs. 1 - search in current process.
+        :param chunksize: number of candidates tested in worker per task.
+        :param prefetch: number of tasks queued per worker. Limits memory usage.
+        :return: iterator of SDF record number and molecule pairs in file order
+        """
+        records = self.__records[self.__screen(query)].tolist()
+        header = self.__header
+        args = (header['source'], header['encoding'], header['thiele'], header['kwargs'], query)
+        tasks = [records[i:i + chunksize] for i in range(0, len(records), chunksize)]
+        if workers is None:
+            workers = cpu_count() or 1
+        for result in self.__map(_verify, tasks, args, workers, prefetch):
+            yield from result
+
+    def __len__(self):
+        return self.__header['count']
+
+    @property
+    def source(self) -> str:
+        """
+        Indexed SDF file path.
+        """
+        return self.__header['source']
+
+    def close(self):
+        """
+        release memory maps
+        """
+        self.__fingerprints = self.__records = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.close()
+
+    def __screen(self, query):
+        if not isinstance(query, (MoleculeContainer, QueryContainer)):
+            raise TypeError('MoleculeContainer or QueryContainer expected')
+        count = self.__header['count']
+        words = frombuffer(query._screen_required.to_bytes(isomorphism.screen_size // 8, 'little'), '<u8')
+        columns = flatnonzero(words)
+        if not count or not len(columns):
+            return arange(count)
+        words = words[columns]
+        fingerprints = self.__fingerprints
+        rows = []
+        for i in range(0, count, screen_block):
+            block = fingerprints[i:i + screen_block][:, columns]
+            rows.append(flatnonzero(((block & words) == words).all(1)) + i)
+        return concatenate(rows)
+
+    def __load(self):
+        count = self.__header['count']
+        if count:
+            self.__fingerprints = memmap(self.__path / 'fingerprints.bin', '<u8', 'r',
+                                         shape=(count, isomorphism.screen_size // 64))
+            self.__records = memmap(self.__path / 'records.bin', '<u8', 'r', shape=(count, 3))
+        else:  # empty file can't be mapped
+            self.__fingerprints = uint64([]).reshape(0, isomorphism.screen_size // 64)
+            self.__records = uint64([]).reshape(0, 3)
+
+    @staticmethod
+    def __map(function, tasks, args, workers, prefetch=2):
+        if workers == 1:
+            for task in tasks:
+                yield function(*args, task)
+            return
+        with ProcessPoolExecutor(workers) as executor:
+            queue = deque()
+            for task in tasks:
+                if len(queue) == workers * prefetch:
+                    yield queue.popleft().result()
+                queue.append(executor.submit(function, *args, task))
+            while queue:
+                yield queue.popleft().result()
+
+    @staticmethod
+    def _load_header(path: Path) -> Dict:
+        try:
+            with (path / 'index.json').open() as f:
+                header = loads(f.read())
+        except FileNotFoundError:
+            raise ValueError('index header not found')
+        if header.get('version') != index_version:
+            raise ValueError(f'unsupported index version: {header.get("version")}')
+        return header
+
+    @staticmethod
+    def _write_header(path: Path, header: Dict):
+        tmp = path / 'index.json.tmp'
+        with tmp.open('w') as f:
+            f.write(dumps(header))
+        replace(str(tmp), str(path / 'index.json'))
+
+
+def _parse(data, encoding, thiele, kwargs) -> Optional[MoleculeContainer]:
+    with SDFRead(StringIO(data.decode(encoding)), **kwargs) as f:
+        molecule = next(iter(f), None)
+    if isinstance(molecule, MoleculeContainer):
+        if thiele:
+            molecule.thiele()
+        return molecule
+
+
+def _fingerprints(file, encoding, thiele, kwargs, shifts) -> List[Tuple[int, bytes]]:
+    """
+    Fingerprints of records block. Used in worker processes.
+    """
+    start = shifts[0]
+    with open(file, 'rb') as f:
+        f.seek(start)
+        data = f.read(shifts[-1] - start)
+    size = isomorphism.screen_size // 8
+    out = []
+    for i, (s, e) in enumerate(zip(shifts, shifts[1:])):
+        molecule = _parse(data[s - start:e - start], encoding, thiele, kwargs)
+        if molecule is not None:
+            out.append((i, molecule._screen_fingerprint.to_bytes(size, 'little')))
+    return out
+
+
+def _verify(file, encoding, thiele, kwargs, query, records) -> List[Tuple[int, MoleculeContainer]]:
+    """
+    Substructure test of records. Used in worker processes.
+    """
+    out = []
+    with open(file, 'rb') as f:
+        for number, start, end in records:
+            f.seek(start)
+            molecule = _parse(f.read(end - start), encoding, thiele, kwargs)
+            if molecule is not None and query.is_substructure(molecule):
+                out.append((number, molecule))
+    return out
+
+
+__all__ = ['SubstructureIndex']
@@ -19,63 +19,51 @@
 from rdkit.Chem import AssignStereochemistry, Atom, BondStereo, BondType, ChiralType, Conformer, RWMol, SanitizeMol
 from ..containers import MoleculeContainer
 from ..exceptions import IsChiral, NotChiral, ValenceError
-from ..periodictable import Element
 
 
 def from_rdkit_molecule(data):
     """
     RDKit molecule object to MoleculeContainer converter
     """
-    mol = MoleculeContainer()
-    parsed_mapping = mol._parsed_mapping
-    mol_conformers = mol._conformers
-    bonds = mol._bonds
-
-    atoms, mapping = [], []
+    atoms, isotopes, charges, radicals, mapping = [], [], [], [], []
     tetrahedron_stereo = []
     for a in data.GetAtoms():
-        e = Element.from_symbol(a.GetSymbol())
-        isotope = a.GetIsotope()
-        if isotope:
-            e = e(isotope)
-        else:
-            e = e()
-        atom = {'atom': e, 'charge': a.GetFormalCharge()}
-
-        radical = a.GetNumRadicalElectrons()
-        if radical:
-            atom['is_radical'] = True
-
-        atoms.append(atom)
+        atoms.append(a.GetAtomicNum())
+        isotopes.append(a.GetIsotope())
+        charges.append(a.GetFormalCharge())
+        radicals.append(bool(a.GetNumRadicalElectrons()))
         mapping.append(a.GetAtomMapNum())
         tetrahedron_stereo.append(a.GetChiralTag())
 
     conformers = []
     c = data.GetConformers()
     if c:
-        for atom, (x, y, _) in zip(atoms, c[0].GetPositions()):
-            atom['xy'] = (x, y)
+        xy = [(x, y) for x, y, _ in c[0].GetPositions()]
         for c in c:
             if c.Is3D():
                 conformers.append(c.GetPositions())
+    else:
+        xy = None
 
-    new_map = []
-    for a, n in zip(atoms, mapping):
-        a = mol.add_atom(**a)
-        new_map.append(a)
-        parsed_mapping[a] = n
-
-    stereo = []
+    bonds, orders, stereo_bonds = [], [], []
     for b in data.GetBonds():
-        n, m = new_map[b.GetBeginAtomIdx()], new_map[b.GetEndAtomIdx()]
-        mol.add_bond(n, m, _rdkit_bond_map[b.GetBondType()])
+        n, m = b.GetBeginAtomIdx(), b.GetEndAtomIdx()
+        bonds.append((n, m))
+        orders.append(_rdkit_bond_map[b.GetBondType()])
         s = b.GetStereo()
         if s == _cis:
-            nn, nm = b.GetStereoAtoms()
-            stereo.append((mol.add_cis_trans_stereo, n, m, new_map[nn], new_map[nm], True))
+            stereo_bonds.append((n, m, *b.GetStereoAtoms(), True))
         elif s == _trans:
-            nn, nm = b.GetStereoAtoms()
-            stereo.append((mol.add_cis_trans_stereo, n, m, new_map[nn], new_map[nm], False))
+            stereo_bonds.append((n, m, *b.GetStereoAtoms(), False))
+
+    mol = MoleculeContainer.from_arrays(atoms, bonds, orders, charges=charges, radicals=radicals, xy=xy,
+                                        isotopes=isotopes)
+    mol._parsed_mapping.update(enumerate(mapping, 1))
+    bonds = mol._bonds
+    new_map = list(mol._atoms)
+
+    stereo = [(mol.add_cis_trans_stereo, new_map[n], new_map[m], new_map[nn], new_map[nm], s)
+              for n, m, nn, nm, s in stereo_bonds]
 
     for n, s in zip(new_map, tetrahedron_stereo):
         if s == _chiral_cw:
@@ -109,7 +97,7 @@ def from_rdkit_molecule(data):
         break
 
     for c in conformers:
-        mol_conformers.append({k: tuple(v) for k, v in zip(new_map, c)})
+        mol._conformers.append({k: tuple(v) for k, v in zip(new_map, c)})
     return mol
 
 
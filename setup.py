@@ -53,7 +53,8 @@ setup(
     python_requires='>=3.6.0',
     cmdclass={'bdist_wheel': _bdist_wheel, 'sdist': _sdist},
     install_requires=['CachedMethods>=0.1.4,<0.2'],
-    extras_require={'mrv': ['lxml>=4.1'], 'clean2d': ['numpy>=1.18'], 'clean2djit': ['numpy>=1.18', 'numba>=0.50']},
+    extras_require={'mrv': ['lxml>=4.1'], 'clean2d': ['numpy>=1.18'], 'clean2djit': ['numpy>=1.18', 'numba>=0.50'],
+                    'search': ['numpy>=1.18']},
     data_files=[],
     zip_safe=False,
     long_description=(Path(__file__).parent / 'README.rst').read_text(),